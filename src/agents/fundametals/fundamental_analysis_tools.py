@@ -1,13 +1,32 @@
 import json
+import logging
 from pathlib import Path
 
-from filelock import FileLock
-
-from agents.fundametals.utils import download_companyfacts, get_latest_filed_date, write_company_facts
+from filelock import Timeout
+
+from agents.fundametals.raw_facts_cache import RawFactsCache
+from agents.fundametals.statement_cache import PERIODS_SUFFIX, StatementCache
+from agents.fundametals.utils import (
+    build_companyfacts_manifest,
+    download_companyfacts_if_modified,
+    load_companyfacts_manifest,
+    write_company_facts,
+    write_companyfacts_validators
+)
 from retrievers.fetch_all_financial_statements import FetchAllFinancialStatements
 from retrievers.run_all_retrievers import RunAllRetrievers
+from storage.fact_store import verify_statement
+from storage.generations import stage_dir
+from storage.raw_store import find_raw
+from storage.ticker_index import get_ticker_index
+from storage.ticker_lock import lock_stats, ticker_lock
 from enum import Enum
 
+logger = logging.getLogger(__name__)
+
+# Longest a request waits for another writer when it has no outputs to serve meanwhile
+WRITER_LOCK_TIMEOUT_SECONDS = 120
+
 class MetadataType(Enum):
     CASHFLOW_STATEMENT = 1
     INCOME_STATEMENT = 2
@@ -15,42 +34,99 @@ class MetadataType(Enum):
 
 class FundamentalsManager:
 
-    def __init__(self):
-        self._raw_facts_cache = {}
+    def __init__(self, raw_facts_cache: RawFactsCache = None):
+        self._raw_facts_cache = raw_facts_cache or RawFactsCache()
     
     def ensure_up_to_date(self, company_ticker: str, metadata_type: MetadataType):
         ticker = company_ticker.upper()
 
         project_root = Path(__file__).parent.parent.parent.parent
         company_dir = project_root / "data" / ticker
-        lock_path = company_dir / ".lock"
 
         company_dir.mkdir(parents=True, exist_ok=True)
-        if ticker in self._raw_facts_cache:
-                company_facts = self._raw_facts_cache.get(ticker)
-        else:
-                company_facts = download_companyfacts(ticker)
-                self._raw_facts_cache[ticker] = company_facts
-
-        lock = FileLock(str(lock_path))
-        with lock:
-            # Re-check freshness INSIDE lock
-            latest_filed = get_latest_filed_date(company_facts)
-            current_company_facts_path = project_root / "data" / ticker / "raw" / "companyfacts.json"
+        validators = None
+        document_manifest = None
+        company_facts = self._raw_facts_cache.get(ticker)
+        if company_facts is None:
+                # Conditional GET: None means SEC answered 304 Not Modified
+                company_facts, validators = download_companyfacts_if_modified(ticker)
+                if company_facts is not None:
+                    self._raw_facts_cache.put(ticker, company_facts)
+                    # The only full scan of a document happens once, when it is downloaded
+                    document_manifest = build_companyfacts_manifest(company_facts)
+
+        # Readers never wait: the current generation is complete, whatever a writer is building
+        metadata = self._load_metadata(ticker, metadata_type)
+        if company_facts is None and metadata:
+            return
+
+        # With outputs to serve, leave a concurrent rebuild to the writer already holding the lock
+        timeout = 0 if metadata else WRITER_LOCK_TIMEOUT_SECONDS
+        try:
+            with ticker_lock(company_dir, timeout):
+                self._refresh(ticker, metadata_type, company_facts, validators, document_manifest)
+        except Timeout:
+            if metadata:
+                logger.info(f"{ticker} is being rebuilt by another writer; serving its current outputs")
+            else:
+                logger.error(f"Timed out after {timeout}s waiting for another writer of {ticker}")
+
+    def _refresh(self, ticker: str, metadata_type, company_facts, validators, document_manifest):
+        """Store a newer companyfacts document and rebuild outputs; call with the ticker lock held"""
+        project_root = Path(__file__).parent.parent.parent.parent
+        raw_dir = project_root / "data" / ticker / "raw"
 
-            metadata = self._load_metadata(ticker, metadata_type)
+        # Another writer may have published while this one waited for the lock
+        metadata = self._load_metadata(ticker, metadata_type)
 
-            if current_company_facts_path.exists() and metadata and metadata.get("processed_date") >= latest_filed:
+        if company_facts is None:
+            # Stored companyfacts are current; only rebuild missing outputs
+            if metadata:
+                return
+        else:
+            # Re-check freshness INSIDE lock
+            # A cached document is either the stored copy or was already no newer than
+            # the outputs when downloaded, so the stored manifest decides for it
+            manifest = document_manifest or load_companyfacts_manifest(ticker)
+            if manifest is None:
+                manifest = document_manifest = build_companyfacts_manifest(company_facts)
+            latest_filed = manifest["latest_filed"]
+
+            if find_raw(raw_dir) is not None and metadata and metadata.get("processed_date") >= latest_filed:
+                if validators:
+                    write_companyfacts_validators(validators, ticker)
                 return
 
-            # Recompute
-            write_company_facts(company_facts, ticker)
+            # Recompute only what the new document changed, if outputs exist to patch
+            previous_manifest = load_companyfacts_manifest(ticker) if metadata else None
+            write_company_facts(company_facts, ticker, validators, document_manifest)
 
             run_all_retrievers = RunAllRetrievers()
-            run_all_retrievers.process_financial_statements(ticker)
+            run_all_retrievers.process_financial_statements(ticker, previous_manifest)
+            return
 
-    
-    def _load_metadata(ticker: str, metadata_type):
+        run_all_retrievers = RunAllRetrievers()
+        run_all_retrievers.process_financial_statements(ticker)
+
+    def ensure_periods(self, company_ticker: str, statement: str):
+        """Backfill the period stage for outputs written before it existed"""
+        ticker = company_ticker.upper()
+        project_root = Path(__file__).parent.parent.parent.parent
+        company_dir = project_root / "data" / ticker
+
+        if verify_statement(stage_dir(company_dir, "periods"), statement):
+            return
+        try:
+            with ticker_lock(company_dir, WRITER_LOCK_TIMEOUT_SECONDS):
+                if verify_statement(stage_dir(company_dir, "periods"), statement):
+                    return
+                if find_raw(company_dir / "raw") is None:
+                    return
+                RunAllRetrievers().process_financial_statements(ticker)
+        except Timeout:
+            logger.error(f"Timed out waiting for another writer of {ticker} to backfill {statement} periods")
+
+    def _load_metadata(self, ticker: str, metadata_type):
         fetch_all_financial_statements = FetchAllFinancialStatements()
         match metadata_type:
             case MetadataType.INCOME_STATEMENT:
@@ -62,28 +138,61 @@ class FundamentalsManager:
 
 class FundamentalAnalysisTools:
     
-    def __init__(self):
+    def __init__(self, statement_cache: StatementCache = None):
         self.fundamentals_manager = FundamentalsManager()
         self.fetch_all_financial_statements = FetchAllFinancialStatements()
+        self.statement_cache = statement_cache or StatementCache()
+
+    def _get_statement(self, ticker: str, metadata_type: MetadataType, statement: str, fetch):
+        # A cache hit skips both the freshness check and the disk read
+        cached = self.statement_cache.get(ticker, statement)
+        if cached is not None:
+            return cached
+
+        self.fundamentals_manager.ensure_up_to_date(ticker, metadata_type)
+        signature = self.statement_cache.signature(ticker, statement)
+        facts = fetch(ticker)
+        self.statement_cache.put(ticker, statement, facts, signature)
+        return facts
 
     def get_cash_flow_statement_facts(self, company_ticker: str):
         ticker = company_ticker.upper()
-        self.fundamentals_manager.ensure_up_to_date(ticker, MetadataType.CASHFLOW_STATEMENT)
-        cash_flow_statement = self.fetch_all_financial_statements.fetch_cash_flow_statement(ticker)
+        cash_flow_statement = self._get_statement(ticker, MetadataType.CASHFLOW_STATEMENT, "cash_flow_statement",
+                                                  self.fetch_all_financial_statements.fetch_cash_flow_statement)
         return cash_flow_statement
 
     def get_income_statement_facts(self, company_ticker: str):
         ticker = company_ticker.upper()
-        self.fundamentals_manager.ensure_up_to_date(ticker, MetadataType.INCOME_STATEMENT)
-        income_statement = self.fetch_all_financial_statements.fetch_income_statement(ticker)
+        income_statement = self._get_statement(ticker, MetadataType.INCOME_STATEMENT, "income_statement",
+                                               self.fetch_all_financial_statements.fetch_income_statement)
         return income_statement
     
     def get_balance_sheet_facts(self, company_ticker: str):
         ticker = company_ticker.upper()
-        self.fundamentals_manager.ensure_up_to_date(ticker, MetadataType.BALANCE_SHEET)
-        balance_sheet_facts = self.fetch_all_financial_statements.fetch_balance_sheet(ticker)
+        balance_sheet_facts = self._get_statement(ticker, MetadataType.BALANCE_SHEET, "balance_sheet",
+                                                  self.fetch_all_financial_statements.fetch_balance_sheet)
         return balance_sheet_facts
 
-
-
-        
\ No newline at end of file
+    def get_period_facts(self, company_ticker: str, statement: str):
+        """Discrete quarterly and TTM facts of a duration statement ("income_statement" or "cash_flow_statement")"""
+        ticker = company_ticker.upper()
+        metadata_type = {
+            "income_statement": MetadataType.INCOME_STATEMENT,
+            "cash_flow_statement": MetadataType.CASHFLOW_STATEMENT
+        }[statement]
+        def fetch(t):
+            self.fundamentals_manager.ensure_periods(t, statement)
+            return self.fetch_all_financial_statements.fetch_periods(t, statement)
+
+        return self._get_statement(ticker, metadata_type, statement + PERIODS_SUFFIX, fetch)
+
+    def search_companies(self, name_prefix: str, limit: int = 10):
+        """Companies whose name starts with name_prefix, as {"ticker", "cik", "title"}"""
+        return get_ticker_index().search(name_prefix, limit)
+
+    def cache_stats(self):
+        return self.statement_cache.stats()
+
+    def lock_stats(self):
+        """Ticker lock acquisitions, contention and timeouts of this process"""
+        return lock_stats()
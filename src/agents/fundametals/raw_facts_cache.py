@@ -0,0 +1,254 @@
+"""
+Raw Facts Cache
+--------------------------
+Bounded cache of downloaded companyfacts documents for FundamentalsManager.
+
+- Memory tier: LRU within a byte budget, charging each document an
+  estimate of its parsed in-memory size
+- Optional disk tier: documents evicted from memory are spilled as
+  gzip-compressed JSON and promoted back on the next lookup
+- Freshness TTL on both tiers, so a long-running agent re-checks SEC
+  and picks up new filings
+"""
+
+import gzip
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from storage import serialization
+from storage.atomic_write import write_bytes_atomic
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+SPILL_COMPRESSION_LEVEL = 6
+
+# Parsed companyfacts take about 4.8x their compact JSON length in
+# CPython (dicts, short strings and floats per fact; measured with
+# tracemalloc on RDDT). Walking the object graph would be exact but
+# costs ten times the serialization.
+MEMORY_PER_SERIALIZED_BYTE = 5
+
+
+def estimate_memory(encoded: bytes) -> int:
+    """Approximate resident bytes of a parsed document from its compact JSON encoding"""
+    return len(encoded) * MEMORY_PER_SERIALIZED_BYTE
+
+
+# =========================
+# CACHE
+# =========================
+
+class RawFactsCache:
+    """
+    Companyfacts cache with a memory budget, LRU eviction, a TTL and an
+    optional compressed spill directory
+
+    Cached documents are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 spill_dir=None, clock=time.time):
+        """
+        Args:
+            max_bytes: Memory budget, in estimated resident bytes of the
+                parsed documents (see estimate_memory)
+            ttl_seconds: Freshness lifetime of a document
+            spill_dir: Directory for the compressed disk tier (None: memory only)
+            clock: Wall-clock time source; spilled files outlive the process
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.clock = clock
+
+        # ticker → {"document", "size", "stored_at"}
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.spills = 0
+
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    def get(self, ticker: str):
+        """
+        Fresh companyfacts for a ticker, or None on a miss
+
+        Args:
+            ticker: Company ticker symbol
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._entries.get(ticker)
+            if entry is not None:
+                if self._is_fresh(entry["stored_at"]):
+                    self._entries.move_to_end(ticker)
+                    self.hits += 1
+                    return entry["document"]
+                self._remove(ticker)
+                self.expirations += 1
+
+            document = self._load_spilled(ticker)
+            if document is None:
+                self.misses += 1
+                return None
+
+            self.spill_hits += 1
+            return document
+
+    def put(self, ticker: str, document: dict, stored_at: float = None):
+        """
+        Cache a freshly downloaded companyfacts document
+
+        Args:
+            ticker: Company ticker symbol
+            document: Companyfacts dictionary
+            stored_at: When the document was fetched (default: now)
+        """
+        ticker = ticker.upper()
+        encoded = serialization.dumps(document)
+        size = estimate_memory(encoded)
+        stored_at = self.clock() if stored_at is None else stored_at
+
+        with self._lock:
+            self._remove(ticker)
+            self._discard_spilled(ticker)
+
+            if size > self.max_bytes:
+                # Never fits in memory; keep it on disk only
+                self._spill(ticker, encoded, stored_at)
+                return
+
+            self._entries[ticker] = {"document": document, "size": size, "stored_at": stored_at}
+            self._size += size
+            self._evict()
+
+    def invalidate(self, ticker: str = None):
+        """Drop one ticker, or everything, from both tiers"""
+        with self._lock:
+            tickers = [ticker.upper()] if ticker else list(self._entries)
+            for t in tickers:
+                self._remove(t)
+                self._discard_spilled(t)
+            if ticker is None and self.spill_dir:
+                for path in self.spill_dir.glob("*.json.gz"):
+                    path.unlink(missing_ok=True)
+
+    # -------------------------
+    # Internals (lock held)
+    # -------------------------
+
+    def _is_fresh(self, stored_at: float):
+        return self.clock() - stored_at < self.ttl_seconds
+
+    def _remove(self, ticker: str):
+        entry = self._entries.pop(ticker, None)
+        if entry is not None:
+            self._size -= entry["size"]
+        return entry
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            ticker, entry = self._entries.popitem(last=False)
+            self._size -= entry["size"]
+            self.evictions += 1
+            if self.spill_dir and self._is_fresh(entry["stored_at"]):
+                self._spill(ticker, serialization.dumps(entry["document"]), entry["stored_at"])
+
+    def _spill_path(self, ticker: str) -> Path:
+        return self.spill_dir / f"{ticker}.json.gz"
+
+    def _spill(self, ticker: str, encoded: bytes, stored_at: float):
+        if not self.spill_dir:
+            return
+        # Unique temporary name per writer, so processes sharing spill_dir cannot
+        # interleave writes; a spill file is a cache entry, so no fsync
+        path = write_bytes_atomic(self._spill_path(ticker),
+                                  gzip.compress(encoded, compresslevel=SPILL_COMPRESSION_LEVEL), durable=False)
+        # The file's mtime carries the fetch time across processes
+        os.utime(path, (stored_at, stored_at))
+        self.spills += 1
+
+    def _load_spilled(self, ticker: str):
+        if not self.spill_dir:
+            return None
+        path = self._spill_path(ticker)
+        try:
+            stored_at = path.stat().st_mtime
+            if not self._is_fresh(stored_at):
+                path.unlink(missing_ok=True)
+                self.expirations += 1
+                return None
+            with open(path, "rb") as f:
+                encoded = gzip.decompress(f.read())
+            document = serialization.loads(encoded)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Discarding unreadable spilled companyfacts {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # Promote back into memory unless it can never fit
+        size = estimate_memory(encoded)
+        if size <= self.max_bytes:
+            path.unlink(missing_ok=True)
+            self._entries[ticker] = {"document": document, "size": size, "stored_at": stored_at}
+            self._size += size
+            self._evict()
+        return document
+
+    def _discard_spilled(self, ticker: str):
+        if self.spill_dir:
+            self._spill_path(ticker).unlink(missing_ok=True)
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+
+    def stats(self):
+        """Hit/miss counters and current memory occupancy"""
+        with self._lock:
+            lookups = self.hits + self.spill_hits + self.misses
+            return {
+                "hits": self.hits,
+                "spill_hits": self.spill_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "spills": self.spills,
+                "entries": len(self._entries),
+                "bytes": self._size
+            }
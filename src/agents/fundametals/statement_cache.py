@@ -0,0 +1,231 @@
+"""
+Statement Cache
+--------------------------
+Bounded in-process cache of parsed statements for the fundamentals tools.
+
+Entries are keyed by (ticker, statement, processed_date) and evicted
+least-recently-used once the total fact count exceeds the budget.
+
+An entry is served only while:
+- its TTL has not expired (the TTL also bounds how long a cached
+  statement skips the SEC freshness check)
+- the statement files it was read from, and the ticker's CURRENT
+  generation pointer, are unchanged on disk, so a rewrite by the
+  retrievers, from any process, invalidates it
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from storage.fact_store import FILE_EXTENSIONS
+from storage.generations import CURRENT_FILE, current_dir
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_FACTS = 200_000
+
+# Stages each statement is assembled from by FetchAllFinancialStatements
+STATEMENT_STAGES = {
+    "income_statement": ("normalized",),
+    "balance_sheet": ("normalized",),
+    "cash_flow_statement": ("normalized", "derived")
+}
+
+# Cache keys of period-stage payloads: statement + suffix, read from the periods stage
+PERIODS_SUFFIX = ":periods"
+
+
+# =========================
+# FILE SIGNATURES
+# =========================
+
+def statement_files(ticker: str, statement: str, data_root: Path = PROJECT_ROOT / "data"):
+    """
+    Every file a statement (or a "<statement>:periods" key) may be read
+    from, in every storage format, in the current generation, followed by
+    the generation pointer itself (replaced whenever a generation is published)
+    """
+    if statement.endswith(PERIODS_SUFFIX):
+        statement = statement[:-len(PERIODS_SUFFIX)]
+        stages = ("periods",)
+    else:
+        stages = STATEMENT_STAGES.get(statement, ("normalized",))
+    company_dir = os.path.join(data_root, ticker)
+    generation_dir = current_dir(company_dir)
+    files = [
+        os.path.join(generation_dir, stage, statement + extension)
+        for stage in stages
+        for extension in FILE_EXTENSIONS.values()
+    ]
+    files.append(os.path.join(company_dir, CURRENT_FILE))
+    return files
+
+
+def file_signature(paths):
+    """(mtime_ns, size) per path, None for missing files"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+# =========================
+# CACHE
+# =========================
+
+class StatementCache:
+    """
+    LRU + TTL cache of parsed statement payloads
+
+    Cached payloads are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_facts: int = DEFAULT_MAX_FACTS,
+                 data_root: Path = PROJECT_ROOT / "data", clock=time.monotonic):
+        """
+        Args:
+            ttl_seconds: Lifetime of an entry
+            max_facts: Total facts held before least-recently-used entries are evicted
+            data_root: Root of the per-ticker data directories
+            clock: Time source (injectable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_facts = max_facts
+        self.data_root = Path(data_root)
+        self.clock = clock
+
+        # (ticker, statement, processed_date) → entry dict
+        self._entries = OrderedDict()
+        # (ticker, statement) → processed_date of the cached entry
+        self._latest = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, ticker: str, statement: str):
+        """
+        Cached payload for a statement, or None on a miss
+
+        Args:
+            ticker: Company ticker symbol
+            statement: Statement type value (e.g. "income_statement")
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            key = (ticker, statement, self._latest.get((ticker, statement)))
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if self.clock() >= entry["expires_at"]:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if file_signature(entry["files"]) != entry["signature"]:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["payload"]
+
+    def signature(self, ticker: str, statement: str):
+        """Current on-disk signature of a statement's files"""
+        return file_signature(statement_files(ticker.upper(), statement, self.data_root))
+
+    def put(self, ticker: str, statement: str, payload: dict, signature=None):
+        """
+        Cache a freshly read statement payload
+
+        Args:
+            ticker: Company ticker symbol
+            statement: Statement type value
+            payload: Statement payload as returned by FetchAllFinancialStatements
+            signature: signature() taken before the payload was read, so a
+                rewrite racing the read invalidates the entry (default: now)
+        """
+        if payload is None:
+            return
+
+        ticker = ticker.upper()
+        files = statement_files(ticker, statement, self.data_root)
+        if signature is None:
+            signature = file_signature(files)
+        size = max(1, len(payload.get("facts", [])))
+        key = (ticker, statement, payload.get("processed_date"))
+
+        with self._lock:
+            if (ticker, statement) in self._latest:
+                self._remove((ticker, statement, self._latest[(ticker, statement)]))
+
+            self._entries[key] = {
+                "payload": payload,
+                "size": size,
+                "files": files,
+                "signature": signature,
+                "expires_at": self.clock() + self.ttl_seconds
+            }
+            self._latest[(ticker, statement)] = key[2]
+            self._size += size
+
+            while self._size > self.max_facts and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, ticker: str = None):
+        """Drop every entry, or every entry of one ticker"""
+        with self._lock:
+            for key in list(self._entries):
+                if ticker is None or key[0] == ticker.upper():
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry["size"]
+        if key[:2] in self._latest and self._latest[key[:2]] == key[2]:
+            del self._latest[key[:2]]
+
+    def stats(self):
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "facts": self._size
+            }
@@ -1,6 +1,10 @@
+import hashlib
 import json
 from pathlib import Path
-import requests
+from sec_client import get_default_client
+from storage import serialization
+from storage.raw_store import find_raw, write_raw
+from storage.ticker_index import get_ticker_index
 
 SEC_HEADERS = {
     "User-Agent": "FundamentalsAgent/1.0 (your_email@example.com)"
@@ -34,27 +38,161 @@ def get_latest_filed_date(companyfacts: dict) -> str | None:
 
     return latest_filed
 
+def build_companyfacts_manifest(companyfacts: dict) -> dict:
+    """
+    Summarize companyfacts in a single traversal.
+
+    Returns:
+        Manifest with the latest `filed` date, sorted accession numbers
+        and fact counts per taxonomy and tag.
+    """
+
+    latest_filed = None
+    accessions = set()
+    tag_fact_counts = {}
+
+    for taxonomy_name, taxonomy in companyfacts.get("facts", {}).items():
+        counts = tag_fact_counts.setdefault(taxonomy_name, {})
+        for tag, tag_data in taxonomy.items():
+            count = 0
+            for unit_facts in tag_data.get("units", {}).values():
+                count += len(unit_facts)
+                for fact in unit_facts:
+                    filed = fact.get("filed")
+                    if filed and (latest_filed is None or filed > latest_filed):
+                        latest_filed = filed
+                    accession = fact.get("accn")
+                    if accession:
+                        accessions.add(accession)
+            counts[tag] = count
+
+    return {
+        "cik": companyfacts.get("cik"),
+        "latest_filed": latest_filed,
+        "accessions": sorted(accessions),
+        "tag_fact_counts": tag_fact_counts
+    }
+
 def get_cik_for_ticker(company_ticker: str):
-    project_root = Path(__file__).parent.parent.parent.parent
-    ticker_cik_path = project_root / "data" / "ticker_cik_map.json"
-    with open(ticker_cik_path, "r") as f:
-        ticker_cik_map = json.load(f)
-    cik = ticker_cik_map.get(company_ticker.upper())
+    """
+    CIK of a ticker from the process-wide ticker index (no file I/O after
+    the first call).
+    """
+    cik = get_ticker_index().cik_for(company_ticker)
     if not cik:
         raise ValueError(f"CIK not found for ticker: {company_ticker}")
     return cik
 
-def download_companyfacts(company_ticker: str) -> dict:
+def download_companyfacts(company_ticker: str, client=None) -> dict:
+    client = client or get_default_client()
     cik = get_cik_for_ticker(company_ticker)
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik}.json"
-    resp = requests.get(url, headers=SEC_HEADERS)
-    resp.raise_for_status()
-    return resp.json()
+    url = client.companyfacts_url(cik)
+    return client.get_json(url, headers=SEC_HEADERS)
 
-def write_company_facts(company_facts: dict, company_ticker: str):
+def download_companyfacts_bulk(company_tickers: list[str], client=None, max_workers: int = None):
+    """
+    Download companyfacts for many tickers over the shared pooled client.
+
+    Share classes of one company (e.g. GOOG and GOOGL) have the same CIK:
+    its document is downloaded once and yielded for each of them.
+
+    Yields:
+        Tuples of (ticker, companyfacts or None, error or None)
+    """
+    client = client or get_default_client()
+    urls = {}
+    for ticker in company_tickers:
+        ticker = ticker.upper()
+        try:
+            url = client.companyfacts_url(get_cik_for_ticker(ticker))
+        except ValueError as e:
+            yield ticker, None, e
+            continue
+        tickers = urls.setdefault(url, [])
+        if ticker not in tickers:
+            tickers.append(ticker)
+
+    for url, company_facts, error in client.get_many_json(list(urls), max_workers=max_workers):
+        for ticker in urls[url]:
+            yield ticker, company_facts, error
+
+def get_raw_dir(company_ticker: str) -> Path:
     project_root = Path(__file__).parent.parent.parent.parent
-    write_path = f"{project_root}/data/{company_ticker}/raw/company_facts.json"
+    return project_root / "data" / company_ticker.upper() / "raw"
+
+def load_companyfacts_validators(company_ticker: str) -> dict:
+    """
+    Return the stored ETag / Last-Modified for a ticker's companyfacts,
+    or an empty dict when there is no stored copy to revalidate.
+    """
+    raw_dir = get_raw_dir(company_ticker)
+    validators_path = raw_dir / "company_facts.validators.json"
+    if find_raw(raw_dir) is None or not validators_path.exists():
+        return {}
+    try:
+        return serialization.load_file(validators_path)
+    except json.JSONDecodeError:
+        return {}
+
+def download_companyfacts_if_modified(company_ticker: str, client=None) -> tuple[dict | None, dict]:
+    """
+    Conditional companyfacts download.
+
+    Returns:
+        (companyfacts, validators); companyfacts is None when SEC answered
+        304 Not Modified and the stored copy is still current.
+    """
+    client = client or get_default_client()
+    cik = get_cik_for_ticker(company_ticker)
+    stored = load_companyfacts_validators(company_ticker)
+    company_facts, validators = client.get_json_if_modified(
+        client.companyfacts_url(cik),
+        etag=stored.get("etag"),
+        last_modified=stored.get("last_modified"),
+        headers=SEC_HEADERS
+    )
+    validators["cik"] = str(cik)
+    return company_facts, validators
+
+def load_companyfacts_manifest(company_ticker: str) -> dict | None:
+    """
+    Return the manifest describing the stored companyfacts, or None when
+    there is no stored copy or no readable manifest.
+    """
+    raw_dir = get_raw_dir(company_ticker)
+    manifest_path = raw_dir / "company_facts.manifest.json"
+    stored = find_raw(raw_dir)
+    if stored is None or not manifest_path.exists():
+        return None
+    try:
+        manifest = serialization.load_file(manifest_path)
+    except json.JSONDecodeError:
+        return None
+    # A document that is not the one described (e.g. replaced by hand) has no manifest
+    stored_length = manifest.get("stored_length")
+    if stored_length is not None and stored[0].stat().st_size != stored_length:
+        return None
+    return manifest
+
+def write_company_facts(company_facts: dict, company_ticker: str, validators: dict = None, manifest: dict = None):
+    raw_dir = get_raw_dir(company_ticker)
+    raw_dir.mkdir(parents=True, exist_ok=True)
+
+    # Raw SEC document is only read by the retrievers: store it compact and compressed
+    content = serialization.dumps(company_facts)
+    write_path = write_raw(raw_dir, content)
+
+    # Manifest and validators are written after the document so they never describe a missing one
+    manifest = dict(manifest or build_companyfacts_manifest(company_facts))
+    manifest["content_hash"] = "sha256:" + hashlib.sha256(content).hexdigest()
+    manifest["content_length"] = len(content)
+    manifest["stored_length"] = write_path.stat().st_size
+    serialization.dump_file(manifest, raw_dir / "company_facts.manifest.json")
+
+    if validators:
+        write_companyfacts_validators(validators, company_ticker)
 
-    with open(write_path, "w") as f:
-        json.dump(company_facts, f, indent=2)
+def write_companyfacts_validators(validators: dict, company_ticker: str):
+    validators_path = get_raw_dir(company_ticker) / "company_facts.validators.json"
+    serialization.dump_file(validators, validators_path)
 
@@ -0,0 +1,102 @@
+"""
+Columnar Store Benchmark
+--------------------------
+Disk footprint and load time of JSON vs columnar (.colz) statement
+files for a synthetic universe built from one ticker's outputs.
+
+Each synthetic ticker gets the source ticker's normalized and derived
+statements; HISTORY_SCALE repeats every fact under earlier fiscal
+years to mimic a filer with a longer history than the source.
+
+"load" reads full payloads (one dict per fact); "columns" reads
+per-field value lists through read_statement_columns, as
+FetchAllFinancialStatements.fetch_columns does, for every field and
+for a three-field scan.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_columnar_store [TICKER] [UNIVERSE] [HISTORY_SCALE]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from retrievers.extraction_engine import PROJECT_ROOT, ExtractionEngine
+from storage.fact_store import (STORAGE_FORMAT_COLUMNAR, STORAGE_FORMAT_JSON, read_statement,
+                                read_statement_columns, write_statement)
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+SCAN_FIELDS = ("concept", "period", "value")
+
+
+def synthetic_payloads(ticker, history_scale):
+    from storage import serialization
+
+    companyfacts = serialization.load_file(PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json")
+    results = ExtractionEngine(REGISTRY_PATH).extract(ticker, companyfacts)
+
+    payloads = []
+    for statement_type, facts in results.items():
+        for stage in ("normalized", "derived"):
+            rows = []
+            for years_back in range(history_scale):
+                for fact in facts[stage]:
+                    label, year = fact.period.rsplit("-", 1)
+                    rows.append(dict(fact.to_dict(), period=f"{label}-{int(year) - years_back}"))
+            if rows:
+                payloads.append((stage, {"company": ticker, "statement": statement_type.value,
+                                         "processed_date": "2026-01-01", "facts": rows}))
+    return payloads
+
+
+def write_universe(root, payloads, universe, storage_format):
+    for i in range(universe):
+        company = f"T{i:04d}"
+        for stage, payload in payloads:
+            directory = root / company / stage
+            directory.mkdir(parents=True, exist_ok=True)
+            facts = [dict(fact, company=company) for fact in payload["facts"]]
+            write_statement(dict(payload, company=company, facts=facts), directory, storage_format)
+
+
+def measure(root, payloads, universe):
+    size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    start = time.perf_counter()
+    for i in range(universe):
+        for stage, payload in payloads:
+            read_statement(root / f"T{i:04d}" / stage, payload["statement"])
+    return size, time.perf_counter() - start
+
+
+def measure_columns(root, payloads, universe, fields=None):
+    start = time.perf_counter()
+    for i in range(universe):
+        for stage, payload in payloads:
+            read_statement_columns(root / f"T{i:04d}" / stage, payload["statement"], fields)
+    return time.perf_counter() - start
+
+
+def main(ticker="RDDT", universe=500, history_scale=1):
+    logging.disable(logging.CRITICAL)
+    payloads = synthetic_payloads(ticker, history_scale)
+    rows = sum(len(p["facts"]) for _, p in payloads)
+
+    print(f"{universe} tickers x {len(payloads)} files, {rows} facts per ticker")
+    for storage_format in (STORAGE_FORMAT_JSON, STORAGE_FORMAT_COLUMNAR):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            write_universe(root, payloads, universe, storage_format)
+            size, elapsed = measure(root, payloads, universe)
+            all_fields = measure_columns(root, payloads, universe)
+            scan = measure_columns(root, payloads, universe, SCAN_FIELDS)
+            print(f"  {storage_format:<5} {size / 1e6:8.2f} MB  load {elapsed * 1000:8.1f} ms  "
+                  f"columns {all_fields * 1000:8.1f} ms  {len(SCAN_FIELDS)} fields {scan * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT",
+         int(args[1]) if len(args) > 1 else 500,
+         int(args[2]) if len(args) > 2 else 1)
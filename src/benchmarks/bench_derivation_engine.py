@@ -0,0 +1,100 @@
+"""
+Derivation Engine Benchmark
+--------------------------
+Cost of evaluating many derived metrics over one ticker's facts with a
+single compiled DerivationPlan, versus rebuilding the period index for
+every derived concept (how derivations used to run).
+
+The synthetic registry chains sums, differences, ratios, TTM and YoY
+growth over TICKER's income and cash flow concepts, including
+derived-from-derived metrics.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_derivation_engine [TICKER] [METRICS] [REPEATS]
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+from retrievers.derivation_engine import DERIVATION_OPERATORS, DerivationPlan, PeriodIndex
+from retrievers.extraction_engine import ExtractionEngine
+from storage import serialization
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+BASE_CONCEPTS = ("revenue", "gross_profit", "operating_income", "net_income",
+                 "operating_cash_flow", "capital_expenditure")
+
+
+def synthetic_registry(metrics):
+    def spec(derivation_type, derived_from):
+        return {"statement": "derived_metrics", "retrieval": "derived", "derivation_type": derivation_type,
+                "derived_from": derived_from, "constraints": {"same_currency": True}}
+
+    registry = {}
+    for i in range(metrics):
+        a = BASE_CONCEPTS[i % len(BASE_CONCEPTS)]
+        b = BASE_CONCEPTS[(i + 1) % len(BASE_CONCEPTS)]
+        step = i % 5
+        if step == 0:
+            registry[f"m{i}"] = spec("binary_subtraction", [a, b])
+        elif step == 1:
+            registry[f"m{i}"] = spec("ratio", [f"m{i - 1}", b])
+        elif step == 2:
+            registry[f"m{i}"] = spec("sum", [a, b, f"m{i - 2}"])
+        elif step == 3:
+            registry[f"m{i}"] = spec("ttm", [a])
+        else:
+            registry[f"m{i}"] = spec("yoy_growth", [f"m{i - 2}"])
+    return registry
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(ticker="RDDT", metrics=50, repeats=20):
+    logging.disable(logging.CRITICAL)
+    companyfacts = serialization.load_file(PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json")
+    results = ExtractionEngine(REGISTRY_PATH).extract(ticker, companyfacts)
+    facts = [fact for statement in results.values() for fact in statement["normalized"]]
+    periods = [fact for statement in results.values() for fact in statement["periods"]]
+
+    registry = synthetic_registry(metrics)
+    plan = DerivationPlan(registry)
+    single = DerivationPlan(dict(list(registry.items())[:1]))
+
+    def index_per_metric():
+        # The old handlers rebuilt the period index from the reported facts for every concept
+        computed = {}
+        for concept in plan.order:
+            spec = plan.specs[concept]
+            index = PeriodIndex(facts + periods)
+            index.columns.update(computed)
+            inputs = [index.column(name) for name in spec["derived_from"]]
+            computed[concept] = DERIVATION_OPERATORS[spec["derivation_type"]](index, inputs, spec)
+        return computed
+
+    single_time, _ = best_of(lambda: single.evaluate(ticker, facts, periods), repeats)
+    plan_time, derived = best_of(lambda: plan.evaluate(ticker, facts, periods), repeats)
+    per_concept_time, _ = best_of(index_per_metric, repeats)
+
+    print(f"{ticker}: {len(facts)} reported and {len(periods)} period facts, {metrics} derived metrics → {len(derived)} derived facts")
+    print(f"  1 metric:                     {single_time * 1000:8.3f} ms")
+    print(f"  {metrics} metrics, one plan:        {plan_time * 1000:8.3f} ms")
+    print(f"  {metrics} metrics, index per metric: {per_concept_time * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT",
+         int(args[1]) if len(args) > 1 else 50,
+         int(args[2]) if len(args) > 2 else 20)
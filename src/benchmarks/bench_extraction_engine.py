@@ -0,0 +1,66 @@
+"""
+Extraction Engine Benchmark
+--------------------------
+Compares the per-statement run() functions (three companyfacts loads)
+against the single-pass ExtractionEngine for one ticker.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_extraction_engine [TICKER] [REPEATS]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from retrievers.balance_sheet.balance_sheet_retriever import run as run_balance_sheet
+from retrievers.cash_flow_statement.cash_flow_statement_retriever import run as run_cash_flow_statement
+from retrievers.income_statement.income_statement_retriever import run as run_income_statement
+from retrievers.extraction_engine import ExtractionEngine
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+def bench_per_statement(ticker, raw_path, out_dir):
+    normalized = out_dir / "normalized"
+    derived = out_dir / "derived"
+    run_balance_sheet(ticker, raw_path, REGISTRY_PATH, normalized)
+    run_cash_flow_statement(ticker, raw_path, REGISTRY_PATH, normalized, derived)
+    run_income_statement(ticker, raw_path, REGISTRY_PATH, normalized)
+
+
+def bench_engine(ticker, raw_path, out_dir):
+    engine = ExtractionEngine(REGISTRY_PATH)
+    engine.run(ticker, raw_path, out_dir / "normalized", out_dir / "derived")
+
+
+def timed(fn, repeats, *args):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(ticker="RDDT", repeats=5):
+    logging.disable(logging.CRITICAL)
+    raw_path = f"data/{ticker}/raw/company_facts.json"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_statement = timed(bench_per_statement, repeats, ticker, raw_path, Path(tmp) / "per_statement")
+        engine = timed(bench_engine, repeats, ticker, raw_path, Path(tmp) / "engine")
+
+    print(f"{ticker}: best of {repeats}")
+    print(f"  per-statement run(): {per_statement * 1000:8.1f} ms")
+    print(f"  ExtractionEngine:    {engine * 1000:8.1f} ms")
+    print(f"  speedup:             {per_statement / engine:8.2f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT", int(args[1]) if len(args) > 1 else 5)
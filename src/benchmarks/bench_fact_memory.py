@@ -0,0 +1,75 @@
+"""
+Fact Memory Benchmark
+--------------------------
+Memory held by a universe of extracted facts as Fact records versus
+the fact dictionaries the retrievers used to pass around.
+
+The universe is TICKER's extraction output repeated under UNIVERSE
+synthetic tickers. As with a real per-ticker extraction, every ticker
+gets its own period, form and filed-date strings; the dict variant
+keeps them, Fact records intern them.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_fact_memory [TICKER] [UNIVERSE]
+"""
+
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+
+from models.fact import Fact
+from retrievers.extraction_engine import ExtractionEngine
+from storage import serialization
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+def held_bytes(build):
+    tracemalloc.start()
+    held = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, held
+
+
+def main(ticker="RDDT", universe=500):
+    logging.disable(logging.CRITICAL)
+    companyfacts = serialization.load_file(PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json")
+    results = ExtractionEngine(REGISTRY_PATH).extract(ticker, companyfacts)
+    facts = [fact for statement in results.values() for fact in statement["normalized"] + statement["derived"]]
+    companies = [f"T{i:04d}" for i in range(universe)]
+
+    def ticker_rows(company):
+        # Fresh string objects per ticker, as parsing that ticker's companyfacts would give
+        rows = []
+        for fact in facts:
+            row = fact.to_dict()
+            row["company"] = company
+            for key in ("period", "source_form", "filed_date"):
+                if key in row:
+                    row[key] = "".join(list(row[key]))
+            rows.append(row)
+        return rows
+
+    def as_records():
+        return [Fact.from_dict(row) for company in companies for row in ticker_rows(company)]
+
+    def as_dicts():
+        return [row for company in companies for row in ticker_rows(company)]
+
+    record_bytes, records = held_bytes(as_records)
+    dict_bytes, dicts = held_bytes(as_dicts)
+    n = len(records)
+
+    print(f"{n} facts ({len(facts)} per ticker x {universe} tickers)")
+    print(f"  dicts:        {dict_bytes / 2 ** 20:8.1f} MiB  {dict_bytes / n:6.0f} B/fact")
+    print(f"  Fact records: {record_bytes / 2 ** 20:8.1f} MiB  {record_bytes / n:6.0f} B/fact")
+    print(f"  reduction:    {dict_bytes / record_bytes:8.2f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT",
+         int(args[1]) if len(args) > 1 else 500)
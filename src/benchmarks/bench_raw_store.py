@@ -0,0 +1,59 @@
+"""
+Raw Store Benchmark
+--------------------------
+Disk footprint and cold load time of the stored companyfacts document
+in every available raw codec, for a synthetic universe of copies of
+one ticker's document.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_raw_store [TICKER] [UNIVERSE]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from retrievers.extraction_engine import PROJECT_ROOT
+from storage import serialization
+from storage.raw_store import available_codecs, load_raw, raw_path, write_raw
+
+
+def write_universe(root, content, universe, codec):
+    for i in range(universe):
+        raw_dir = root / f"T{i:04d}" / "raw"
+        raw_dir.mkdir(parents=True)
+        write_raw(raw_dir, content, codec)
+
+
+def measure(root, universe):
+    size = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+    start = time.perf_counter()
+    for i in range(universe):
+        load_raw(raw_path(root / f"T{i:04d}" / "raw", "json"))
+    return size, time.perf_counter() - start
+
+
+def main(ticker="RDDT", universe=100):
+    logging.disable(logging.CRITICAL)
+    source = PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json"
+    content = serialization.dumps(load_raw(source))
+
+    print(f"{universe} copies of {ticker} companyfacts ({len(content) / 1e6:.2f} MB compact JSON)")
+    baseline = None
+    for codec in reversed(available_codecs()):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            start = time.perf_counter()
+            write_universe(root, content, universe, codec)
+            written = time.perf_counter() - start
+            size, elapsed = measure(root, universe)
+            baseline = baseline or size
+            print(f"  {codec:<5} {size / 1e6:8.2f} MB ({baseline / size:5.1f}x)  "
+                  f"write {written * 1000:8.1f} ms  load {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT", int(args[1]) if len(args) > 1 else 100)
@@ -0,0 +1,96 @@
+"""
+Serialization Benchmark
+--------------------------
+Per-stage timings of the extraction pipeline for every installed JSON
+backend, against the pre-serialization-layer baseline (stdlib json,
+text mode, indent=2 everywhere).
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_serialization [TICKER] [REPEATS]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from retrievers.extraction_engine import PROJECT_ROOT, ExtractionEngine
+from storage import serialization
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def baseline_stages(raw_path, registry_path, out_dir, companyfacts, payload):
+    def load_registry():
+        with open(registry_path, "r") as f:
+            json.load(f)
+
+    def load_companyfacts():
+        with open(raw_path, "r") as f:
+            json.load(f)
+
+    def write_raw():
+        with open(out_dir / "raw.json", "w") as f:
+            json.dump(companyfacts, f, indent=2)
+
+    def write_statement():
+        with open(out_dir / "statement.json", "w") as f:
+            json.dump(payload, f, indent=2)
+
+    return {"load registry": load_registry, "load companyfacts": load_companyfacts,
+            "write raw companyfacts": write_raw, "write statement": write_statement}
+
+
+def backend_stages(raw_path, registry_path, out_dir, companyfacts, payload):
+    return {
+        "load registry": lambda: serialization.load_file(registry_path),
+        "load companyfacts": lambda: serialization.load_file(raw_path),
+        "write raw companyfacts": lambda: serialization.dump_file(companyfacts, out_dir / "raw.json"),
+        "write statement": lambda: serialization.dump_file(payload, out_dir / "statement.json", pretty=True)
+    }
+
+
+def main(ticker="RDDT", repeats=20):
+    logging.disable(logging.CRITICAL)
+    raw_path = PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json"
+    registry_path = PROJECT_ROOT / REGISTRY_PATH
+
+    companyfacts = serialization.load_file(raw_path)
+    results = ExtractionEngine(REGISTRY_PATH).extract(ticker, companyfacts)
+    facts = [fact.to_dict() for statement in results.values() for fact in statement["normalized"] + statement["derived"]]
+    payload = {"company": ticker, "facts": facts}
+
+    columns = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        columns["baseline"] = {
+            stage: best_of(fn, repeats)
+            for stage, fn in baseline_stages(raw_path, registry_path, out_dir, companyfacts, payload).items()
+        }
+        for backend in serialization.available_backends():
+            serialization.set_backend(backend)
+            columns[backend] = {
+                stage: best_of(fn, repeats)
+                for stage, fn in backend_stages(raw_path, registry_path, out_dir, companyfacts, payload).items()
+            }
+
+    print(f"{ticker}: best of {repeats}, milliseconds")
+    print(f"{'stage':<24}" + "".join(f"{name:>10}" for name in columns))
+    for stage in columns["baseline"]:
+        print(f"{stage:<24}" + "".join(f"{columns[name][stage] * 1000:>10.2f}" for name in columns))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT", int(args[1]) if len(args) > 1 else 20)
@@ -0,0 +1,84 @@
+"""
+Streaming Parser Benchmark
+--------------------------
+Compares json.load of the whole companyfacts document against the
+selective loader that only decodes registry tags. Reports parse time
+and tracemalloc peak memory.
+
+Besides the real file, a synthetic large filer is built by cloning
+every us-gaap tag under new names, so the registry stays the same size
+while the document grows.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_streaming_parser [TICKER] [SCALE]
+"""
+
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from retrievers.extraction_engine import PROJECT_ROOT, ExtractionEngine
+from retrievers.streaming_companyfacts_parser import load_companyfacts_selective
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+def load_full(path, tags):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def measure(fn, *args, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def build_large_filer(source_path, scale, out_path):
+    with open(source_path, "r") as f:
+        companyfacts = json.load(f)
+    us_gaap = companyfacts["facts"]["us-gaap"]
+    for i in range(1, scale):
+        for tag, data in list(us_gaap.items())[:len(us_gaap) // scale + 200]:
+            us_gaap[f"{tag}Synthetic{i}"] = data
+    with open(out_path, "w") as f:
+        json.dump(companyfacts, f, indent=2)
+
+
+def report(label, path, tags):
+    size_mb = Path(path).stat().st_size / 1e6
+    full_time, full_peak = measure(load_full, path, tags)
+    sel_time, sel_peak = measure(load_companyfacts_selective, path, tags)
+    print(f"{label} ({size_mb:.1f} MB, {len(tags)} registry tags)")
+    print(f"  json.load:  {full_time * 1000:8.1f} ms  peak {full_peak / 1e6:8.1f} MB")
+    print(f"  selective:  {sel_time * 1000:8.1f} ms  peak {sel_peak / 1e6:8.1f} MB")
+    print(f"  speedup {full_time / sel_time:.1f}x, memory {full_peak / max(sel_peak, 1):.1f}x lower")
+
+
+def main(ticker="RDDT", scale=40):
+    logging.disable(logging.CRITICAL)
+    tags = ExtractionEngine(REGISTRY_PATH).direct_tags
+    path = PROJECT_ROOT / "data" / ticker / "raw" / "company_facts.json"
+    report(ticker, path, tags)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        large_path = Path(tmp) / "company_facts.json"
+        build_large_filer(path, scale, large_path)
+        report(f"synthetic {scale}x {ticker}", large_path, tags)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else "RDDT", int(args[1]) if len(args) > 1 else 40)
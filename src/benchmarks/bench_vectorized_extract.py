@@ -0,0 +1,90 @@
+"""
+Vectorized Extraction Benchmark
+--------------------------
+Python vs NumPy extraction backends on a synthetic large filer,
+checking that both produce identical output.
+
+The synthetic filer gives every registry tag YEARS fiscal years of
+10-K/10-Q history: quarterly, YTD and annual durations, prior-year
+comparatives re-reported by later filings, and occasional amendments.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.bench_vectorized_extract [YEARS] [REPEATS]
+"""
+
+import logging
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from retrievers.extraction_engine import EXTRACT_BACKEND_NUMPY, EXTRACT_BACKEND_PYTHON, ExtractionEngine
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+def synthetic_tag_facts(years, rng):
+    facts = []
+    for fy in range(2000, 2000 + years):
+        year_start = date(fy, 1, 1)
+        for quarter in range(1, 5):
+            end = year_start + timedelta(days=91 * quarter - 1)
+            fp = "FY" if quarter == 4 else f"Q{quarter}"
+            form = "10-K" if quarter == 4 else "10-Q"
+            filed = (end + timedelta(days=40)).isoformat()
+            accn = f"0000000000-{fy % 100:02d}-{quarter:06d}"
+            spans = [end - timedelta(days=90), year_start]  # discrete quarter, YTD
+            # Each filing re-reports the prior year's comparatives
+            spans += [span.replace(year=span.year - 1) for span in spans]
+            for span_start in spans:
+                span_end = end if span_start.year == fy else end.replace(year=fy - 1)
+                fact = {"start": span_start.isoformat(), "end": span_end.isoformat(),
+                        "val": rng.randrange(10 ** 9), "accn": accn, "fy": fy, "fp": fp,
+                        "form": form, "filed": filed}
+                facts.append(fact)
+                if rng.random() < 0.05:
+                    facts.append(dict(fact, val=rng.randrange(10 ** 9), form=form + "/A",
+                                      filed=(end + timedelta(days=200)).isoformat()))
+    rng.shuffle(facts)
+    return facts
+
+
+def synthetic_companyfacts(engine, years, seed=0):
+    rng = random.Random(seed)
+    return {"cik": 1, "entityName": "SYNTHETIC",
+            "facts": {"us-gaap": {tag: {"units": {"USD": synthetic_tag_facts(years, rng)}}
+                                  for tag in sorted(engine.direct_tags)}}}
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(years=40, repeats=3):
+    logging.disable(logging.CRITICAL)
+    engines = {backend: ExtractionEngine(REGISTRY_PATH, backend=backend)
+               for backend in (EXTRACT_BACKEND_PYTHON, EXTRACT_BACKEND_NUMPY)}
+    companyfacts = synthetic_companyfacts(engines[EXTRACT_BACKEND_PYTHON], years)
+    n_facts = sum(len(t["units"]["USD"]) for t in companyfacts["facts"]["us-gaap"].values())
+
+    print(f"synthetic filer: {len(engines[EXTRACT_BACKEND_PYTHON].direct_tags)} tags, {n_facts} facts")
+    outputs = {}
+    for backend, engine in engines.items():
+        elapsed, outputs[backend] = best_of(lambda: engine.extract("SYN", companyfacts), repeats)
+        print(f"  {backend:<6} {elapsed * 1000:8.1f} ms")
+
+    identical = outputs[EXTRACT_BACKEND_PYTHON] == outputs[EXTRACT_BACKEND_NUMPY]
+    print(f"  identical output: {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 40,
+         int(args[1]) if len(args) > 1 else 3)
@@ -0,0 +1,144 @@
+"""
+Fact Records
+--------------------------
+Compact in-memory representation of normalized and derived facts.
+
+Facts are held as __slots__ objects instead of 9-10 key dicts, and
+their repeated strings (company, statement, concept, currency, period,
+source form, filed date) are interned so every fact of a universe
+shares one copy of each.
+
+Retrievers, the extraction engine and the derivation handlers pass
+Fact objects around; they become the JSON dictionary shape only at the
+storage boundary (to_dict / from_dict).
+"""
+
+import sys
+
+
+# =========================
+# FACT
+# =========================
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Fact:
+    """
+    A single normalized (reported) or derived fact
+
+    Normalized facts carry source_form and filed_date; derived facts
+    carry derived_from, derivation_type and confidence; period-stage
+    facts also carry their start and end dates. Unset fields are None
+    and are left out of to_dict().
+    """
+
+    __slots__ = (
+        "company", "statement", "concept", "value", "currency", "period", "reported",
+        "source_form", "filed_date", "derived_from", "derivation_type", "confidence", "start", "end", "extra"
+    )
+
+    def __init__(self, company, statement, concept, value, currency, period, reported,
+                 source_form=None, filed_date=None, derived_from=None, derivation_type=None,
+                 confidence=None, start=None, end=None, extra=None):
+        """
+        Args:
+            company: Company ticker symbol
+            statement: Statement type value (e.g. "income_statement")
+            concept: Canonical concept name
+            value: Reported or derived value
+            currency: Currency code
+            period: Period label (e.g. "FY-2024", "Q1-2024")
+            reported: True for facts taken from filings, False for derived
+            source_form: Form the value was taken from (normalized only)
+            filed_date: Filing date of that form (normalized only)
+            derived_from: Input concepts (derived only)
+            derivation_type: Registry derivation type (derived only)
+            confidence: Derivation confidence (derived only)
+            start: Period start date (period-stage facts only)
+            end: Period end date (period-stage facts only)
+            extra: Any other keys of the stored dictionary, kept for round-trips
+        """
+        self.company = _intern(company)
+        self.statement = _intern(statement)
+        self.concept = _intern(concept)
+        self.value = value
+        self.currency = _intern(currency)
+        self.period = _intern(period)
+        self.reported = reported
+        self.source_form = _intern(source_form)
+        self.filed_date = _intern(filed_date)
+        self.derived_from = derived_from
+        self.derivation_type = _intern(derivation_type)
+        self.confidence = _intern(confidence)
+        self.start = _intern(start)
+        self.end = _intern(end)
+        self.extra = extra
+
+    def to_dict(self) -> dict:
+        """Stored JSON shape of the fact, keys in the order the retrievers always wrote them"""
+        fact = {
+            "company": self.company,
+            "statement": self.statement,
+            "concept": self.concept,
+            "value": self.value,
+            "currency": self.currency,
+            "period": self.period,
+            "reported": self.reported
+        }
+        if self.source_form is not None:
+            fact["source_form"] = self.source_form
+        if self.filed_date is not None:
+            fact["filed_date"] = self.filed_date
+        if self.derived_from is not None:
+            fact["derived_from"] = self.derived_from
+        if self.derivation_type is not None:
+            fact["derivation_type"] = self.derivation_type
+        if self.confidence is not None:
+            fact["confidence"] = self.confidence
+        if self.start is not None:
+            fact["start"] = self.start
+        if self.end is not None:
+            fact["end"] = self.end
+        if self.extra:
+            fact.update(self.extra)
+        return fact
+
+    @classmethod
+    def from_dict(cls, fact: dict):
+        """Build a Fact from its stored JSON shape"""
+        extra = {key: value for key, value in fact.items() if key not in FACT_KEYS} or None
+        return cls(
+            fact.get("company"), fact.get("statement"), fact["concept"], fact.get("value"),
+            fact.get("currency"), fact["period"], fact.get("reported"),
+            fact.get("source_form"), fact.get("filed_date"), fact.get("derived_from"),
+            fact.get("derivation_type"), fact.get("confidence"), fact.get("start"), fact.get("end"), extra
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Fact):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Fact({self.company} {self.statement} {self.concept} {self.period} = {self.value!r})"
+
+
+FACT_KEYS = frozenset(Fact.__slots__) - {"extra"}
+
+
+# =========================
+# BOUNDARY HELPERS
+# =========================
+
+def facts_to_dicts(facts):
+    """Serialize a list of Facts to the stored JSON shape"""
+    return [fact.to_dict() for fact in facts]
+
+
+def facts_from_dicts(rows):
+    """Rebuild Facts from stored JSON dictionaries"""
+    return [Fact.from_dict(row) for row in rows]
@@ -10,7 +10,9 @@ import json
 from datetime import date
 import logging
 from pathlib import Path
-from retrievers.generic_direct_fact_retriever import GenericDirectFactRetriever, FactType, load_registry
+from storage.raw_store import load_raw
+from retrievers.compiled_registry import CompiledRegistry, get_compiled_registry
+from retrievers.generic_direct_fact_retriever import GenericDirectFactRetriever, FactType
 
 
 # =========================
@@ -34,23 +36,19 @@ class BalanceSheetRetriever:
     from SEC companyfacts JSON
     """
     
-    def __init__(self, company_ticker: str, registry: dict = None):
+    def __init__(self, company_ticker: str, registry: CompiledRegistry):
         """
         Initialize balance sheet retriever with FactType.BALANCE_SHEET
         
         Args:
             company_ticker: Company ticker symbol
+            registry: Compiled canonical mappings registry
         """
         self.company_ticker = company_ticker
-        self.direct_fact_registry = {}
-        self.derived_fact_registry = {}
+        self.registry = registry
+        self.direct_fact_registry = registry.direct(FactType.BALANCE_SHEET)
+        self.derived_fact_registry = registry.derived(FactType.BALANCE_SHEET)
         self.current_date = date.today().isoformat()
-        for section, facts in registry.items():
-            if facts:
-                if facts.get("retrieval") == "direct":
-                    self.direct_fact_registry[section] = facts
-                elif facts.get("retrieval") == "derived":
-                    self.derived_fact_registry[section] = facts
         self.retriever = GenericDirectFactRetriever(company_ticker, FactType.BALANCE_SHEET, self.direct_fact_registry)
 
     def extract(self, companyfacts):
@@ -90,7 +88,7 @@ def run(company_ticker, companyfacts_path, registry_path, write_dir):
     """
     project_root = Path(__file__).parent.parent.parent.parent
     registry_final_path = project_root / registry_path
-    registry = load_registry(FactType.BALANCE_SHEET, registry_final_path)
+    registry = get_compiled_registry(registry_final_path)
     companyfacts_file_path = project_root / companyfacts_path
     write_dir = project_root / write_dir
     write_dir.mkdir(parents=True, exist_ok=True)
@@ -98,8 +96,7 @@ def run(company_ticker, companyfacts_path, registry_path, write_dir):
     logger.info(f"Loading companyfacts from {companyfacts_file_path}")
     
     try:
-        with open(companyfacts_file_path, "r") as f:
-            companyfacts = json.load(f)
+        companyfacts = load_raw(companyfacts_file_path)
     except FileNotFoundError:
         logger.error(f"Company facts file not found: {companyfacts_file_path}")
         return
@@ -0,0 +1,239 @@
+"""
+Batch Pipeline
+--------------------------
+Runs extraction and derivation for many tickers across a process pool.
+
+Inputs:
+- List of tickers, or every ticker in data/company_tickers.json
+- Raw companyfacts already downloaded to data/<TICKER>/raw/
+
+Outputs:
+- Normalized and derived facts per ticker
+- Per-ticker timing and status report
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from retrievers.extraction_engine import (
+    EXTRACT_BACKEND_NUMPY,
+    EXTRACT_BACKEND_PYTHON,
+    PARSE_MODE_FULL,
+    PARSE_MODE_SELECTIVE,
+    ExtractionEngine
+)
+from storage.fact_store import STORAGE_FORMAT_COLUMNAR, STORAGE_FORMAT_JSON
+from storage.fact_warehouse import DEFAULT_WAREHOUSE_PATH
+from storage.generations import build_generation
+from storage.raw_store import find_raw
+from storage.ticker_index import get_ticker_index
+from storage.ticker_lock import ticker_lock
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+COMPANY_TICKERS_PATH = PROJECT_ROOT / "data" / "company_tickers.json"
+
+STATUS_OK = "ok"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+
+
+# =========================
+# UNIVERSE
+# =========================
+
+def load_universe(tickers_path: Path = COMPANY_TICKERS_PATH):
+    """
+    Load every ticker from the SEC company_tickers.json file
+
+    Args:
+        tickers_path: Path to company_tickers.json
+
+    Returns:
+        List of unique upper-case tickers in file order
+    """
+    return get_ticker_index(tickers_path).tickers()
+
+
+# =========================
+# WORKER
+# =========================
+
+_engine = None
+
+
+def _init_worker(registry_path, parse_mode=PARSE_MODE_FULL, storage_format=STORAGE_FORMAT_JSON,
+                 warehouse_path=None, backend=EXTRACT_BACKEND_PYTHON):
+    """Load the registry once per worker process"""
+    global _engine
+    _engine = ExtractionEngine(registry_path, parse_mode=parse_mode, storage_format=storage_format,
+                               warehouse_path=warehouse_path, backend=backend)
+
+
+def process_ticker(company_ticker: str):
+    """
+    Extract and derive all statements for a single ticker
+
+    Args:
+        company_ticker: Company ticker symbol
+
+    Returns:
+        Dictionary with ticker, status, elapsed seconds, fact count and error
+    """
+    global _engine
+    if _engine is None:
+        _engine = ExtractionEngine(REGISTRY_PATH)
+
+    ticker = company_ticker.upper()
+    company_dir = PROJECT_ROOT / "data" / ticker
+    start = time.perf_counter()
+    result = {"ticker": ticker, "status": STATUS_OK, "elapsed": 0.0, "facts": 0, "error": None}
+
+    try:
+        # Tickers never downloaded are skipped without creating anything under data/
+        extracted = None
+        if find_raw(company_dir / "raw") is not None:
+            with ticker_lock(company_dir):
+                extracted = build_generation(company_dir, lambda staging: _engine.run(
+                    ticker,
+                    f"data/{ticker}/raw/company_facts.json",
+                    staging / "normalized",
+                    staging / "derived"
+                ))
+        if extracted is None:
+            result["status"] = STATUS_SKIPPED
+            result["error"] = "companyfacts not available"
+        else:
+            result["facts"] = sum(len(f["normalized"]) + len(f["derived"]) for f in extracted.values())
+    except Exception as e:
+        result["status"] = STATUS_FAILED
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+# =========================
+# BATCH RUNNER
+# =========================
+
+def run_batch(tickers,
+              max_workers: int = None,
+              registry_path: str = REGISTRY_PATH,
+              parse_mode: str = PARSE_MODE_FULL,
+              storage_format: str = STORAGE_FORMAT_JSON,
+              warehouse_path=None,
+              backend: str = EXTRACT_BACKEND_PYTHON):
+    """
+    Process tickers across a process pool, streaming results as they finish
+
+    A failing ticker is recorded and does not stop the batch.
+
+    Args:
+        tickers: Iterable of ticker symbols
+        max_workers: Pool size (default: os.cpu_count())
+        registry_path: Path to canonical mappings file
+        parse_mode: Companyfacts parse mode for the extraction engine
+        storage_format: Output format for normalized and derived facts
+        warehouse_path: SQLite fact warehouse to load as tickers are written
+        backend: Extraction backend for the engine
+
+    Returns:
+        List of per-ticker result dictionaries in completion order
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    max_workers = max_workers or os.cpu_count() or 1
+    results = []
+
+    logger.info(f"Processing {len(tickers)} tickers with {max_workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(registry_path, parse_mode, storage_format, warehouse_path, backend)
+    ) as pool:
+        futures = {pool.submit(process_ticker, ticker): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Worker process died; record and keep going
+                result = {"ticker": ticker, "status": STATUS_FAILED, "elapsed": 0.0,
+                          "facts": 0, "error": f"{type(e).__name__}: {e}"}
+
+            results.append(result)
+            done = len(results)
+            if result["status"] == STATUS_FAILED:
+                logger.error(f"[{done}/{len(tickers)}] {ticker} failed: {result['error']}")
+            else:
+                logger.info(f"[{done}/{len(tickers)}] {ticker} {result['status']} in {result['elapsed']:.2f}s")
+
+    return results
+
+
+def print_report(results):
+    """
+    Print a per-ticker timing and status report
+
+    Args:
+        results: Output of run_batch()
+    """
+    print(f"{'TICKER':<10} {'STATUS':<8} {'SECONDS':>8} {'FACTS':>6}  ERROR")
+    for result in sorted(results, key=lambda r: r["ticker"]):
+        print(f"{result['ticker']:<10} {result['status']:<8} {result['elapsed']:>8.2f} "
+              f"{result['facts']:>6}  {result['error'] or ''}")
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    total = sum(r["elapsed"] for r in results)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\n{len(results)} tickers: {summary} ({total:.2f}s cumulative worker time)")
+
+
+# =========================
+# USAGE
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all retrievers for a batch of tickers")
+    parser.add_argument("tickers", nargs="*", help="Tickers to process")
+    parser.add_argument("--all", action="store_true", help="Process every ticker in company_tickers.json")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--parse-mode", choices=[PARSE_MODE_FULL, PARSE_MODE_SELECTIVE], default=PARSE_MODE_FULL,
+                        help="Parse the whole companyfacts document or only registry tags")
+    parser.add_argument("--storage-format", choices=[STORAGE_FORMAT_JSON, STORAGE_FORMAT_COLUMNAR],
+                        default=STORAGE_FORMAT_JSON, help="Output format for normalized and derived facts")
+    parser.add_argument("--warehouse", nargs="?", const=str(DEFAULT_WAREHOUSE_PATH), default=None,
+                        help="Also load facts into the SQLite warehouse (default path: data/facts.db)")
+    parser.add_argument("--backend", choices=[EXTRACT_BACKEND_PYTHON, EXTRACT_BACKEND_NUMPY],
+                        default=EXTRACT_BACKEND_PYTHON, help="Extraction backend")
+    args = parser.parse_args()
+
+    tickers = load_universe() if args.all else args.tickers
+    if not tickers:
+        parser.error("pass tickers or --all")
+
+    print_report(run_batch(tickers, max_workers=args.workers, parse_mode=args.parse_mode,
+                           storage_format=args.storage_format, warehouse_path=args.warehouse,
+                           backend=args.backend))
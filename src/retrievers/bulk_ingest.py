@@ -0,0 +1,241 @@
+"""
+Bulk Ingest
+--------------------------
+Backfills every company from SEC's companyfacts.zip bulk archive.
+
+Inputs:
+- Locally downloaded companyfacts.zip (one CIK##########.json per company)
+- data/company_tickers.json for CIK → ticker mapping
+
+Outputs:
+- Normalized and derived facts under data/<TICKER>/
+- Per-company timing and status report
+
+Members are read straight out of the archive; nothing is extracted
+to disk. Only the registry's tags are decoded from each member
+(streaming_companyfacts_parser), and every share class listed for a
+CIK gets its own outputs.
+"""
+
+import argparse
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from retrievers.batch_pipeline import STATUS_FAILED, STATUS_OK, STATUS_SKIPPED, print_report
+from retrievers.extraction_engine import ExtractionEngine
+from retrievers.streaming_companyfacts_parser import parse_companyfacts_selective
+from storage.fact_warehouse import DEFAULT_WAREHOUSE_PATH
+from storage.generations import build_generation
+from storage.ticker_index import get_ticker_index
+from storage.ticker_lock import ticker_lock
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+COMPANY_TICKERS_PATH = PROJECT_ROOT / "data" / "company_tickers.json"
+DATA_ROOT = PROJECT_ROOT / "data"
+
+
+# =========================
+# CIK MAPPING
+# =========================
+
+def load_cik_ticker_map(tickers_path: Path = COMPANY_TICKERS_PATH):
+    """
+    Map CIK to ticker from company_tickers.json
+
+    The first ticker listed for a CIK wins (SEC lists the primary
+    share class first).
+
+    Returns:
+        Dictionary of int CIK → upper-case ticker
+    """
+    return dict(get_ticker_index(tickers_path).cik_to_ticker)
+
+
+def load_cik_tickers_map(tickers_path: Path = COMPANY_TICKERS_PATH):
+    """
+    Map CIK to every ticker listed for it in company_tickers.json
+
+    Returns:
+        Dictionary of int CIK → list of upper-case tickers, primary first
+    """
+    cik_tickers = {}
+    for ticker, cik in get_ticker_index(tickers_path).ticker_to_cik.items():
+        cik_tickers.setdefault(cik, []).append(ticker)
+    return cik_tickers
+
+
+def cik_from_member_name(member_name: str):
+    """Parse CIK from an archive member name like CIK0000320193.json"""
+    stem = Path(member_name).stem
+    if not stem.upper().startswith("CIK"):
+        return None
+    try:
+        return int(stem[3:])
+    except ValueError:
+        return None
+
+
+# =========================
+# WORKER
+# =========================
+
+_archive = None
+_engine = None
+_cik_tickers_map = None
+_data_root = None
+
+
+def _init_worker(archive_path, registry_path, cik_tickers_map, data_root, warehouse_path=None):
+    """Open the archive and load the registry once per worker process"""
+    global _archive, _engine, _cik_tickers_map, _data_root
+    _archive = zipfile.ZipFile(archive_path)
+    _engine = ExtractionEngine(registry_path, warehouse_path=warehouse_path)
+    _cik_tickers_map = cik_tickers_map
+    _data_root = Path(data_root)
+
+
+def ingest_member(member_name: str):
+    """
+    Read one archive member and run the retrievers over it for each of its tickers
+
+    The member is parsed once, decoding only the registry's tags; each
+    share class then gets its own extraction and published generation.
+
+    Args:
+        member_name: Name of the CIK JSON inside the archive
+
+    Returns:
+        List of dictionaries with ticker, status, elapsed seconds, fact
+        count and error, one per ticker (one for the member if it has none)
+    """
+    start = time.perf_counter()
+    cik = cik_from_member_name(member_name)
+    tickers = _cik_tickers_map.get(cik, []) if cik is not None else []
+
+    if not tickers:
+        return [{"ticker": member_name, "status": STATUS_SKIPPED, "elapsed": time.perf_counter() - start,
+                 "facts": 0, "error": "no ticker for CIK"}]
+
+    results = []
+    try:
+        with _archive.open(member_name) as f:
+            companyfacts = parse_companyfacts_selective(f.read(), _engine.direct_tags)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start
+        return [{"ticker": ticker, "status": STATUS_FAILED, "elapsed": elapsed, "facts": 0, "error": error}
+                for ticker in tickers]
+    parsed = time.perf_counter()
+
+    for ticker in tickers:
+        ticker_start = time.perf_counter()
+        result = {"ticker": ticker, "status": STATUS_OK, "elapsed": 0.0, "facts": 0, "error": None}
+
+        def build(staging):
+            extracted = _engine.extract(ticker, companyfacts)
+            _engine.write(ticker, extracted, staging / "normalized", staging / "derived")
+            return extracted
+
+        try:
+            with ticker_lock(_data_root / ticker):
+                extracted = build_generation(_data_root / ticker, build)
+            result["facts"] = sum(len(f["normalized"]) + len(f["derived"]) for f in extracted.values())
+        except Exception as e:
+            result["status"] = STATUS_FAILED
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        # The shared parse is charged to every share class
+        result["elapsed"] = (parsed - start) + (time.perf_counter() - ticker_start)
+        results.append(result)
+
+    return results
+
+
+# =========================
+# BULK RUNNER
+# =========================
+
+def run_bulk_ingest(archive_path,
+                    max_workers: int = None,
+                    tickers_path: Path = COMPANY_TICKERS_PATH,
+                    data_root: Path = DATA_ROOT,
+                    registry_path: str = REGISTRY_PATH,
+                    only_mapped: bool = True,
+                    warehouse_path=None):
+    """
+    Ingest every company in a companyfacts.zip archive in parallel
+
+    Args:
+        archive_path: Path to companyfacts.zip
+        max_workers: Pool size (default: os.cpu_count())
+        tickers_path: Path to company_tickers.json
+        data_root: Root directory for per-ticker outputs
+        registry_path: Path to canonical mappings file
+        only_mapped: Skip members whose CIK has no ticker before dispatch
+        warehouse_path: SQLite fact warehouse to load as companies are written
+
+    Returns:
+        List of per-ticker result dictionaries
+    """
+    cik_tickers_map = load_cik_tickers_map(tickers_path)
+
+    with zipfile.ZipFile(archive_path) as archive:
+        member_names = [name for name in archive.namelist() if name.lower().endswith(".json")]
+
+    if only_mapped:
+        member_names = [name for name in member_names if cik_from_member_name(name) in cik_tickers_map]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(member_names) // (max_workers * 16))
+    results = []
+
+    logger.info(f"Ingesting {len(member_names)} companies from {archive_path} with {max_workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(str(archive_path), registry_path, cik_tickers_map, str(data_root), warehouse_path)
+    ) as pool:
+        for done, member_results in enumerate(pool.map(ingest_member, member_names, chunksize=chunksize), 1):
+            results.extend(member_results)
+            for result in member_results:
+                if result["status"] == STATUS_FAILED:
+                    logger.error(f"[{done}/{len(member_names)}] {result['ticker']} failed: {result['error']}")
+
+    return results
+
+
+# =========================
+# USAGE
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill all companies from SEC companyfacts.zip")
+    parser.add_argument("archive", help="Path to companyfacts.zip")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size")
+    parser.add_argument("--warehouse", nargs="?", const=str(DEFAULT_WAREHOUSE_PATH), default=None,
+                        help="Also load facts into the SQLite warehouse (default path: data/facts.db)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print_report(run_bulk_ingest(args.archive, max_workers=args.workers, warehouse_path=args.warehouse))
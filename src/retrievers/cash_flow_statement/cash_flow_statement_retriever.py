@@ -8,8 +8,10 @@ import json
 import logging
 from datetime import date
 from pathlib import Path
+from storage.raw_store import load_raw
 from retrievers.generic_derived_fact_retriever import GenericDerivedFactRetriever
-from retrievers.generic_direct_fact_retriever import GenericDirectFactRetriever, FactType, load_registry
+from retrievers.compiled_registry import CompiledRegistry, get_compiled_registry
+from retrievers.generic_direct_fact_retriever import GenericDirectFactRetriever, FactType
 
 
 # =========================
@@ -33,30 +35,29 @@ class CashflowStatementRetriever:
     from SEC companyfacts JSON
     """
     
-    def __init__(self, company_ticker: str, registry: dict = None):
+    def __init__(self, company_ticker: str, registry: CompiledRegistry):
         """
         Initialize cash flow statement retriever with FactType.CASH_FLOW_STATEMENT
         
         Args:
             company_ticker: Company ticker symbol
+            registry: Compiled canonical mappings registry
         """
         
         self.company_ticker = company_ticker
-        self.direct_fact_registry = {}
-        self.derived_fact_registry = {}
+        self.registry = registry
+        self.direct_fact_registry = registry.direct(FactType.CASH_FLOW_STATEMENT)
+        self.derived_fact_registry = registry.derived(FactType.CASH_FLOW_STATEMENT)
         self.current_date = date.today().isoformat()
-        for section, facts in registry.items():
-            if facts:
-                if facts.get("retrieval") == "direct":
-                    self.direct_fact_registry[section] = facts
-                elif facts.get("retrieval") == "derived":
-                    self.derived_fact_registry[section] = facts
 
         if self.direct_fact_registry:
             self.direct_fact_retriever = GenericDirectFactRetriever(company_ticker, FactType.CASH_FLOW_STATEMENT, self.direct_fact_registry)
         
         if self.derived_fact_registry:
-            self.derived_fact_retriever = GenericDerivedFactRetriever(company_ticker, FactType.CASH_FLOW_STATEMENT, self.derived_fact_registry)
+            self.derived_fact_retriever = GenericDerivedFactRetriever(
+                company_ticker, FactType.CASH_FLOW_STATEMENT, self.derived_fact_registry,
+                registry.plan(FactType.CASH_FLOW_STATEMENT)
+            )
 
     def extract(self, companyfacts):
         """
@@ -126,7 +127,7 @@ def run(company_ticker, companyfacts_path, registry_path, write_dir_normalized,
     """
     project_root = Path(__file__).parent.parent.parent.parent
     registry_final_path = project_root / registry_path
-    registry = load_registry(FactType.CASH_FLOW_STATEMENT, registry_final_path)
+    registry = get_compiled_registry(registry_final_path)
     companyfacts_file_path = project_root / companyfacts_path
     write_dir_normalized = project_root / write_dir_normalized
     write_dir_normalized.mkdir(parents=True, exist_ok=True)
@@ -137,8 +138,7 @@ def run(company_ticker, companyfacts_path, registry_path, write_dir_normalized,
     logger.info(f"Loading companyfacts from {companyfacts_file_path}")
     
     try:
-        with open(companyfacts_file_path, "r") as f:
-            companyfacts = json.load(f)
+        companyfacts = load_raw(companyfacts_file_path)
     except FileNotFoundError:
         logger.error(f"Company facts file not found: {companyfacts_file_path}")
         return
@@ -0,0 +1,205 @@
+"""
+Compiled Registry
+--------------------------
+The canonical mappings file, parsed and indexed once per process.
+
+Inputs:
+- canonical mappings file (sec_facts_canonical_mappings_v1.json)
+
+Outputs:
+- direct and derived partitions of every statement registry
+- compiled DerivationPlan of every statement
+- reverse index from XBRL tag to the (statement, concept) pairs it feeds
+
+A direct concept may list "fallback_tags" after its primary "tag". The
+first tag of that chain the filer reports in USD supplies the concept.
+Concepts marked "sometimes_missing" are extracted like direct ones and
+are simply absent when no tag of their chain is reported.
+
+Compiled registries are cached per resolved path and reloaded only
+when the file's modification time changes, so every engine, worker and
+per-statement retriever of a process shares one parse.
+"""
+
+import json
+import logging
+from pathlib import Path
+from retrievers.derivation_engine import DerivationPlan
+from retrievers.generic_direct_fact_retriever import FactType, tag_chain
+from storage import serialization
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+RETRIEVAL_DIRECT = "direct"
+RETRIEVAL_SOMETIMES_MISSING = "sometimes_missing"
+RETRIEVAL_DERIVED = "derived"
+
+# Retrieval kinds extracted from companyfacts tags
+DIRECT_RETRIEVALS = (RETRIEVAL_DIRECT, RETRIEVAL_SOMETIMES_MISSING)
+
+# resolved path -> (mtime_ns, CompiledRegistry)
+_COMPILED_REGISTRIES = {}
+
+
+# =========================
+# COMPILED REGISTRY
+# =========================
+
+class CompiledRegistry:
+    """
+    Every statement registry of a mappings file, split and indexed
+    """
+
+    def __init__(self, mappings: dict):
+        """
+        Args:
+            mappings: Parsed canonical mappings ({statement: {concept: meta}})
+        """
+        self.statements = {}
+        self.direct_registries = {}
+        self.derived_registries = {}
+        self.derivation_plans = {}
+        self.tag_chains = {}
+        self.tag_index = {}
+
+        for statement_type in FactType:
+            registry = mappings.get(statement_type.value, {})
+            direct = {}
+            derived = {}
+            for concept, meta in registry.items():
+                if not meta:
+                    continue
+                if meta.get("retrieval") in DIRECT_RETRIEVALS:
+                    direct[concept] = meta
+                elif meta.get("retrieval") == RETRIEVAL_DERIVED:
+                    derived[concept] = meta
+
+            for concept, meta in direct.items():
+                chain = tag_chain(meta)
+                self.tag_chains[(statement_type, concept)] = chain
+                for rank, tag in enumerate(chain):
+                    self.tag_index.setdefault(tag, []).append((statement_type, concept, rank))
+
+            self.statements[statement_type] = registry
+            self.direct_registries[statement_type] = direct
+            self.derived_registries[statement_type] = derived
+            self.derivation_plans[statement_type] = DerivationPlan(derived)
+
+        self.tags = frozenset(self.tag_index)
+
+    def statement(self, statement_type: FactType):
+        """Full registry of a statement, as stored in the mappings file"""
+        return self.statements[statement_type]
+
+    def direct(self, statement_type: FactType):
+        """Concepts of a statement extracted from companyfacts tags"""
+        return self.direct_registries[statement_type]
+
+    def derived(self, statement_type: FactType):
+        """Concepts of a statement computed from other concepts"""
+        return self.derived_registries[statement_type]
+
+    def plan(self, statement_type: FactType):
+        """Compiled DerivationPlan of a statement's derived concepts"""
+        return self.derivation_plans[statement_type]
+
+    def resolve(self, tag):
+        """
+        Direct concepts an XBRL tag feeds
+
+        Returns:
+            List of (statement_type, concept, rank) where rank is the tag's
+            position in the concept's tag chain (0 for the primary tag)
+        """
+        return self.tag_index.get(tag, [])
+
+    def tag_index_for(self, statement_types):
+        """Reverse tag index restricted to some statement types"""
+        wanted = set(statement_types)
+        index = {}
+        for tag, targets in self.tag_index.items():
+            kept = [target for target in targets if target[0] in wanted]
+            if kept:
+                index[tag] = kept
+        return index
+
+
+# =========================
+# LOADING
+# =========================
+
+def get_compiled_registry(registry_path):
+    """
+    Compiled registry of a mappings file, parsed once per process
+
+    Args:
+        registry_path: Path to canonical mappings file
+
+    Returns:
+        CompiledRegistry (empty if the file is missing or unreadable)
+    """
+    path = Path(registry_path).resolve()
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.error(f"Registry file not found at {registry_path}")
+        return CompiledRegistry({})
+
+    cached = _COMPILED_REGISTRIES.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+
+    try:
+        mappings = serialization.load_file(path)
+    except FileNotFoundError:
+        logger.error(f"Registry file not found at {registry_path}")
+        return CompiledRegistry({})
+    except json.JSONDecodeError as e:
+        logger.error(f"Error parsing registry file: {e}")
+        return CompiledRegistry({})
+
+    compiled = CompiledRegistry(mappings)
+    _COMPILED_REGISTRIES[path] = (mtime_ns, compiled)
+    logger.info(f"Loaded registry from {registry_path}")
+    return compiled
+
+
+def load_registry(statement_type: FactType, registry_path: str):
+    """
+    Load registry for a specific statement type from canonical mappings file
+
+    Args:
+        statement_type: StatementType enum value
+        registry_path: Path to canonical mappings file
+
+    Returns:
+        Dictionary mapping canonical fields to XBRL metadata
+    """
+    return get_compiled_registry(registry_path).statement(statement_type)
+
+
+def load_all_registries(registry_path: str):
+    """
+    Load the registries of every statement type in a single read
+
+    Args:
+        registry_path: Path to canonical mappings file
+
+    Returns:
+        Dictionary mapping each FactType to its registry
+    """
+    return dict(get_compiled_registry(registry_path).statements)
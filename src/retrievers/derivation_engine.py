@@ -0,0 +1,390 @@
+"""
+Derivation Engine
+--------------------------
+Evaluates a statement's derived concepts as a dependency DAG.
+
+Inputs:
+- derived-concept registry, compiled once into a DerivationPlan
+- normalized facts of the statement
+- period-stage facts of the statement (dated discrete quarters and TTM)
+
+Outputs:
+- derived Facts, in registry order and, within a concept, in the
+  order periods first appear in the input facts
+
+The period x concept index is built once per evaluation. Every concept,
+reported or derived, is a column aligned on that index, and each
+derivation computes its whole column in one pass over the periods.
+Derived concepts may depend on other derived concepts; the plan orders
+them topologically, so every intermediate column is computed once and
+reused by all its dependents.
+
+Supported derivation types (registry "derivation_type"):
+- binary_subtraction: derived_from [a, b] → a - b
+- sum: derived_from [a, b, ...] → a + b + ...
+- ratio: derived_from [numerator, denominator] → numerator / denominator
+- ttm: derived_from [concept] → sum of the four trailing quarters
+- yoy_growth: derived_from [concept] → change versus the same period a
+  year earlier, relative to the earlier value's magnitude
+
+TTM and YoY are computed on the period stage, whose rows carry their
+start and end dates (Q4 decomposed from the annual value), not on
+normalized labels: those take the fiscal year of the latest filing
+reporting a value, so comparatives collide and there is no Q4. Their
+outputs, and anything derived from them, are dated period rows (e.g.
+"TTM-Q1-2025" with its start and end).
+"""
+
+import logging
+from datetime import date, timedelta
+from graphlib import CycleError, TopologicalSorter
+
+from models.fact import Fact
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+DERIVATION_BINARY_SUBTRACTION = "binary_subtraction"
+DERIVATION_SUM = "sum"
+DERIVATION_RATIO = "ratio"
+DERIVATION_TTM = "ttm"
+DERIVATION_YOY_GROWTH = "yoy_growth"
+
+DEFAULT_CONFIDENCE = "high"
+
+ONE_DAY = timedelta(days=1)
+
+# Span lengths, in days, of the dated periods TTM and YoY work on
+QUARTER_MIN_DAYS = 80
+QUARTER_MAX_DAYS = 100
+ANNUAL_MIN_DAYS = 350
+ANNUAL_MAX_DAYS = 380
+DAYS_PER_YEAR = 365
+# How far a prior-year period's end may drift from exactly a year
+# earlier (52/53-week fiscal years move by a few days)
+PRIOR_YEAR_TOLERANCE_DAYS = 7
+
+QUARTERS_PER_YEAR = 4
+
+# Derivations that need dated periods; they read the period stage
+DATED_DERIVATIONS = frozenset({DERIVATION_TTM, DERIVATION_YOY_GROWTH})
+
+
+# =========================
+# PERIOD INDEX
+# =========================
+
+def period_key(fact):
+    """Index key of a fact: its (start, end) dates if it has them, else its period label"""
+    if fact.start is not None and fact.end is not None:
+        return fact.start, fact.end
+    return fact.period
+
+
+class PeriodIndex:
+    """
+    Period x concept index of one statement's facts
+
+    Rows of period-stage facts are keyed by their dated (start, end)
+    span, rows of normalized facts by their period label. Normalized
+    labels come from the fiscal year of the filing a value was picked
+    from, so a 10-K's comparatives can share a label; TTM and YoY only
+    ever look at dated rows.
+
+    Each column is a list aligned on `periods` (the row labels), holding
+    a (value, currency) cell or None. When several facts share a concept
+    and row the last one wins, as in the original per-period index.
+    """
+
+    def __init__(self, facts):
+        self.periods = []
+        self.spans = []
+        self.position = {}
+        for fact in facts:
+            key = period_key(fact)
+            if key not in self.position:
+                self.position[key] = len(self.periods)
+                self.periods.append(fact.period)
+                self.spans.append((date.fromisoformat(key[0]), date.fromisoformat(key[1]))
+                                  if isinstance(key, tuple) else None)
+
+        self.columns = {}
+        for fact in facts:
+            column = self.columns.get(fact.concept)
+            if column is None:
+                column = self.columns[fact.concept] = [None] * len(self.periods)
+            column[self.position[period_key(fact)]] = (fact.value, fact.currency)
+
+        self._trailing_positions = None
+        self._prior_year_positions = None
+
+    def column(self, concept):
+        """Column of a concept; all None when the concept has no facts"""
+        column = self.columns.get(concept)
+        return column if column is not None else [None] * len(self.periods)
+
+    def is_dated(self, position):
+        return self.spans[position] is not None
+
+    def trailing_positions(self):
+        """
+        Per row, positions of the four contiguous quarters tiling it
+
+        Only dated twelve-month rows (the period stage's TTM rows) have
+        them; every other row gets None.
+        """
+        if self._trailing_positions is None:
+            quarters_by_end = {}
+            for position, span in enumerate(self.spans):
+                if span and QUARTER_MIN_DAYS <= (span[1] - span[0]).days <= QUARTER_MAX_DAYS:
+                    quarters_by_end.setdefault(span[1], position)
+
+            self._trailing_positions = []
+            for span in self.spans:
+                positions = None
+                if span and ANNUAL_MIN_DAYS <= (span[1] - span[0]).days <= ANNUAL_MAX_DAYS:
+                    positions = []
+                    end = span[1]
+                    for _ in range(QUARTERS_PER_YEAR):
+                        position = quarters_by_end.get(end)
+                        if position is None:
+                            break
+                        positions.append(position)
+                        end = self.spans[position][0] - ONE_DAY
+                    if len(positions) != QUARTERS_PER_YEAR or end + ONE_DAY != span[0]:
+                        positions = None
+                self._trailing_positions.append(positions)
+        return self._trailing_positions
+
+    def prior_year_positions(self):
+        """
+        Per row, position of the dated row of the same length ending a
+        year earlier (None for label rows or if it is not indexed)
+        """
+        if self._prior_year_positions is None:
+            by_end = {}
+            for position, span in enumerate(self.spans):
+                if span:
+                    by_end.setdefault(span[1], []).append(position)
+
+            self._prior_year_positions = []
+            for span in self.spans:
+                prior = None
+                if span:
+                    length = (span[1] - span[0]).days
+                    target = span[1] - timedelta(days=DAYS_PER_YEAR)
+                    # Nearest end date first
+                    for offset in sorted(range(-PRIOR_YEAR_TOLERANCE_DAYS, PRIOR_YEAR_TOLERANCE_DAYS + 1), key=abs):
+                        for position in by_end.get(target + timedelta(days=offset), ()):
+                            other = self.spans[position]
+                            if abs((other[1] - other[0]).days - length) <= PRIOR_YEAR_TOLERANCE_DAYS:
+                                prior = position
+                                break
+                        if prior is not None:
+                            break
+                self._prior_year_positions.append(prior)
+        return self._prior_year_positions
+
+
+# =========================
+# DERIVATIONS
+# =========================
+
+def requires_same_currency(spec):
+    return bool(spec.get("constraints", {}).get("same_currency"))
+
+
+def derive_binary_subtraction(index, inputs, spec):
+    left, right = inputs
+    same_currency = requires_same_currency(spec)
+    return [
+        (l[0] - r[0], l[1]) if l and r and (not same_currency or l[1] == r[1]) else None
+        for l, r in zip(left, right)
+    ]
+
+
+def derive_sum(index, inputs, spec):
+    same_currency = requires_same_currency(spec)
+    column = []
+    for cells in zip(*inputs):
+        if all(cells) and (not same_currency or len({cell[1] for cell in cells}) == 1):
+            column.append((sum(cell[0] for cell in cells), cells[0][1]))
+        else:
+            column.append(None)
+    return column
+
+
+def derive_ratio(index, inputs, spec):
+    numerator, denominator = inputs
+    same_currency = requires_same_currency(spec)
+    return [
+        (n[0] / d[0], None) if n and d and d[0] and (not same_currency or n[1] == d[1]) else None
+        for n, d in zip(numerator, denominator)
+    ]
+
+
+def derive_ttm(index, inputs, spec):
+    source, = inputs
+    column = []
+    for positions in index.trailing_positions():
+        cells = [source[position] for position in positions] if positions else None
+        if cells and all(cells) and len({cell[1] for cell in cells}) == 1:
+            column.append((sum(cell[0] for cell in cells), cells[0][1]))
+        else:
+            column.append(None)
+    return column
+
+
+def derive_yoy_growth(index, inputs, spec):
+    source, = inputs
+    column = []
+    for current, prior_position in zip(source, index.prior_year_positions()):
+        prior = source[prior_position] if prior_position is not None else None
+        if current and prior and prior[0] and current[1] == prior[1]:
+            column.append(((current[0] - prior[0]) / abs(prior[0]), None))
+        else:
+            column.append(None)
+    return column
+
+
+DERIVATION_OPERATORS = {
+    DERIVATION_BINARY_SUBTRACTION: derive_binary_subtraction,
+    DERIVATION_SUM: derive_sum,
+    DERIVATION_RATIO: derive_ratio,
+    DERIVATION_TTM: derive_ttm,
+    DERIVATION_YOY_GROWTH: derive_yoy_growth
+}
+
+# Number of derived_from inputs each derivation takes (None: one or more)
+DERIVATION_ARITY = {
+    DERIVATION_BINARY_SUBTRACTION: 2,
+    DERIVATION_SUM: None,
+    DERIVATION_RATIO: 2,
+    DERIVATION_TTM: 1,
+    DERIVATION_YOY_GROWTH: 1
+}
+
+
+# =========================
+# PLAN
+# =========================
+
+class DerivationPlan:
+    """
+    A derived-concept registry compiled into evaluation order
+
+    Concepts with an unknown derivation type or the wrong number of
+    inputs are skipped, and concepts on a dependency cycle are dropped
+    with an error; their dependents fail closed, like any concept with
+    a missing input.
+    """
+
+    def __init__(self, registry: dict):
+        """
+        Args:
+            registry: Derived concepts of a statement registry
+        """
+        self.specs = {}
+        for concept, spec in registry.items():
+            derivation_type = spec.get("derivation_type")
+            if derivation_type not in DERIVATION_OPERATORS:
+                logger.debug(f"Skipping {concept}: unknown derivation type {derivation_type}")
+                continue
+            arity = DERIVATION_ARITY[derivation_type]
+            n_inputs = len(spec.get("derived_from", []))
+            if n_inputs == 0 or (arity is not None and n_inputs != arity):
+                logger.error(f"Skipping {concept}: {derivation_type} takes {arity or 'one or more'} "
+                             f"inputs, got {n_inputs}")
+                continue
+            self.specs[concept] = spec
+
+        self.order = self._compile()
+        self.dated = self._dated_concepts()
+
+    def _compile(self):
+        while True:
+            graph = {
+                concept: [name for name in spec.get("derived_from", []) if name in self.specs]
+                for concept, spec in self.specs.items()
+            }
+            try:
+                return list(TopologicalSorter(graph).static_order())
+            except CycleError as e:
+                cycle = set(e.args[1])
+                logger.error(f"Dropping derived concepts on a dependency cycle: {sorted(cycle)}")
+                for concept in cycle:
+                    self.specs.pop(concept, None)
+
+    def _dated_concepts(self):
+        """TTM / YoY concepts and everything derived from them, which are emitted on dated periods"""
+        dated = set()
+        for concept in self.order:
+            spec = self.specs[concept]
+            if spec["derivation_type"] in DATED_DERIVATIONS or dated.intersection(spec.get("derived_from", [])):
+                dated.add(concept)
+        return dated
+
+    def affected_by(self, concepts):
+        """
+        Derived concepts that directly or transitively depend on the given concepts
+
+        Args:
+            concepts: Iterable of changed concept names
+        """
+        changed = set(concepts)
+        affected = set()
+        for concept in self.order:
+            if changed.union(affected).intersection(self.specs[concept].get("derived_from", [])):
+                affected.add(concept)
+        return affected
+
+    def evaluate(self, company, normalized_facts, period_facts=()):
+        """
+        Evaluate every derived concept over a statement's facts
+
+        Concepts in `dated` are emitted on the dated period-stage rows
+        (with their start and end), every other concept on the
+        normalized period labels.
+
+        Args:
+            company: Company ticker symbol
+            normalized_facts: List of normalized Facts
+            period_facts: List of period-stage Facts (discrete quarters and
+                TTM); without them TTM and YoY concepts yield nothing
+
+        Returns:
+            List of derived Facts
+        """
+        index = PeriodIndex(list(normalized_facts) + list(period_facts))
+        for concept in self.order:
+            spec = self.specs[concept]
+            inputs = [index.column(name) for name in spec.get("derived_from", [])]
+            index.columns[concept] = DERIVATION_OPERATORS[spec["derivation_type"]](index, inputs, spec)
+
+        derived = []
+        for concept, spec in self.specs.items():
+            confidence = spec.get("confidence", DEFAULT_CONFIDENCE)
+            dated = concept in self.dated
+            for period, span, cell in zip(index.periods, index.spans, index.columns[concept]):
+                if cell is None or (span is not None) != dated:
+                    continue
+                derived.append(Fact(
+                    company, spec["statement"], concept, cell[0], cell[1], period, False,
+                    derived_from=spec["derived_from"], derivation_type=spec["derivation_type"],
+                    confidence=confidence,
+                    start=span[0].isoformat() if span else None, end=span[1].isoformat() if span else None
+                ))
+        return derived
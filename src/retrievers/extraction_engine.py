@@ -0,0 +1,525 @@
+"""
+Extraction Engine
+--------------------------
+Single-pass extraction of every financial statement for a ticker.
+
+Inputs:
+- SEC companyfacts JSON (already downloaded, any raw_store codec), parsed once
+- compiled fact registry, parsed once per process
+
+Outputs:
+- Normalized and derived fact entries for every statement
+- Period-stage entries: discrete quarters (YTD decomposed) and rolling TTM
+- Written to file-based storage, and optionally the SQLite fact warehouse
+"""
+
+import json
+import logging
+from datetime import date
+from pathlib import Path
+from models.fact import facts_from_dicts
+from retrievers.compiled_registry import get_compiled_registry
+from retrievers.generic_derived_fact_retriever import GenericDerivedFactRetriever
+from retrievers.generic_direct_fact_retriever import GenericDirectFactRetriever, FactType, tag_chain
+from retrievers.streaming_companyfacts_parser import load_companyfacts_selective
+from retrievers.vectorized_fact_retriever import VectorizedDirectFactRetriever
+from storage.fact_store import STORAGE_FORMAT_JSON, read_statement
+from storage.fact_warehouse import STAGE_PERIODS, get_warehouse
+from storage.raw_store import load_raw
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+STATEMENT_TYPES = (
+    FactType.BALANCE_SHEET,
+    FactType.CASH_FLOW_STATEMENT,
+    FactType.INCOME_STATEMENT
+)
+
+# full: decode the whole document
+# selective: decode only the registry's us-gaap tags
+PARSE_MODE_FULL = "full"
+PARSE_MODE_SELECTIVE = "selective"
+
+# python: per-fact dict loop
+# numpy: vectorized grouping and period classification (identical output)
+EXTRACT_BACKEND_PYTHON = "python"
+EXTRACT_BACKEND_NUMPY = "numpy"
+
+DIRECT_RETRIEVER_CLASSES = {
+    EXTRACT_BACKEND_PYTHON: GenericDirectFactRetriever,
+    EXTRACT_BACKEND_NUMPY: VectorizedDirectFactRetriever
+}
+
+
+# =========================
+# PATH HELPERS
+# =========================
+
+def periods_dir_for(write_dir_normalized):
+    """Period-stage directory that sits next to a normalized directory"""
+    return Path(write_dir_normalized).parent / "periods"
+
+
+# =========================
+# EXTRACTION ENGINE
+# =========================
+
+class ExtractionEngine:
+    """
+    Extracts every statement from a single parse of companyfacts,
+    walking the us-gaap tags once and dispatching each matching
+    fact list to every statement retriever that needs it
+    """
+
+    def __init__(self, registry_path, statement_types=STATEMENT_TYPES, parse_mode=PARSE_MODE_FULL,
+                 storage_format=STORAGE_FORMAT_JSON, warehouse_path=None, backend=EXTRACT_BACKEND_PYTHON):
+        """
+        Initialize engine from the process-wide compiled registry
+
+        Args:
+            registry_path: Path to canonical mappings file
+            statement_types: Statement types to extract
+            parse_mode: PARSE_MODE_FULL or PARSE_MODE_SELECTIVE
+            storage_format: STORAGE_FORMAT_JSON or STORAGE_FORMAT_COLUMNAR
+            warehouse_path: SQLite fact warehouse to load on write (None: files only)
+            backend: EXTRACT_BACKEND_PYTHON or EXTRACT_BACKEND_NUMPY
+        """
+        self.registry = get_compiled_registry(PROJECT_ROOT / registry_path)
+        self.statement_types = statement_types
+        self.parse_mode = parse_mode
+        self.storage_format = storage_format
+        self.warehouse = get_warehouse(warehouse_path) if warehouse_path else None
+        self.direct_retriever_class = DIRECT_RETRIEVER_CLASSES[backend]
+        self.direct_fact_registries = {st: self.registry.direct(st) for st in statement_types}
+        self.derived_fact_registries = {st: self.registry.derived(st) for st in statement_types}
+        self.derivation_plans = {st: self.registry.plan(st) for st in statement_types}
+
+        # Reverse index over every tag of every chain, primary and fallback
+        self.tag_index = self.registry.tag_index_for(statement_types)
+        self.direct_tags = set(self.tag_index)
+
+    def load_companyfacts(self, companyfacts_file_path):
+        """
+        Load companyfacts according to the engine's parse mode
+
+        Args:
+            companyfacts_file_path: Path to companyfacts JSON file
+
+        Returns:
+            Companyfacts dictionary (only registry tags in selective mode)
+        """
+        if self.parse_mode == PARSE_MODE_SELECTIVE:
+            return load_companyfacts_selective(companyfacts_file_path, self.direct_tags)
+
+        return load_raw(companyfacts_file_path)
+
+    def extract(self, company_ticker, companyfacts):
+        """
+        Extract normalized, derived and period-stage facts for every statement
+
+        Args:
+            company_ticker: Company ticker symbol
+            companyfacts: SEC companyfacts dictionary
+
+        Returns:
+            Dictionary mapping FactType to {"normalized": [Fact], "derived": [Fact],
+            "periods": [Fact]}
+        """
+        direct_retrievers = {
+            statement_type: self.direct_retriever_class(company_ticker, statement_type, registry)
+            for statement_type, registry in self.direct_fact_registries.items()
+        }
+
+        # Single walk over us-gaap; per concept, keep the earliest tag of its chain that is reported
+        resolved = {}
+        us_gaap = companyfacts.get("facts", {}).get("us-gaap", {})
+        for tag, tag_data in us_gaap.items():
+            targets = self.tag_index.get(tag)
+            if not targets:
+                continue
+
+            raw_facts = tag_data.get("units", {}).get("USD")
+            if not raw_facts:
+                continue
+
+            for statement_type, concept, rank in targets:
+                current = resolved.get((statement_type, concept))
+                if current is None or rank < current[0]:
+                    resolved[(statement_type, concept)] = (rank, raw_facts)
+
+        results = {}
+        for statement_type, retriever in direct_retrievers.items():
+            # Keep registry order so output matches per-statement extraction
+            normalized = []
+            periods = []
+            for concept in retriever.registry:
+                entry = resolved.get((statement_type, concept))
+                if entry is None:
+                    continue
+                normalized.extend(retriever.normalize_concept(concept, entry[1]))
+                periods.extend(retriever.normalize_periods(concept, entry[1]))
+            logger.info(f"Extracted {len(normalized)} {statement_type.value} facts for {company_ticker}")
+
+            derived = []
+            derived_registry = self.derived_fact_registries[statement_type]
+            if normalized and derived_registry:
+                derived_retriever = GenericDerivedFactRetriever(company_ticker, statement_type, derived_registry,
+                                                                self.derivation_plans[statement_type])
+                derived = derived_retriever.extract_derived_facts(normalized, periods)
+
+            results[statement_type] = {"normalized": normalized, "derived": derived, "periods": periods}
+
+        return results
+
+    # =========================
+    # INCREMENTAL EXTRACTION
+    # =========================
+
+    def find_new_facts(self, companyfacts, known_accessions, latest_filed=None):
+        """
+        Registry-tag facts not covered by the stored companyfacts
+
+        A fact is new if its accession was not seen before or it was
+        filed after the stored document's latest filing.
+
+        Args:
+            companyfacts: SEC companyfacts dictionary
+            known_accessions: Accession numbers of the stored document
+            latest_filed: Latest filed date of the stored document
+
+        Returns:
+            Dictionary mapping tag to its list of new raw facts
+        """
+        known_accessions = set(known_accessions)
+        us_gaap = companyfacts.get("facts", {}).get("us-gaap", {})
+        new_facts = {}
+        for tag in self.direct_tags:
+            raw_facts = us_gaap.get(tag, {}).get("units", {}).get("USD")
+            if not raw_facts:
+                continue
+            fresh = [
+                f for f in raw_facts
+                if f.get("accn") not in known_accessions or (latest_filed and f.get("filed", "") > latest_filed)
+            ]
+            if fresh:
+                new_facts[tag] = fresh
+        return new_facts
+
+    def load_stored(self, write_dir_normalized, write_dir_derived, write_dir_periods=None):
+        """
+        Read previously written facts for every statement
+
+        Returns:
+            Dictionary mapping FactType to {"normalized": [Fact], "derived": [Fact],
+            "periods": [Fact] or None, "processed_date": ...}, without statements
+            that have no readable normalized file; "periods" is None when the
+            period stage was never written
+        """
+        write_dir_periods = write_dir_periods or periods_dir_for(write_dir_normalized)
+        stored = {}
+        for statement_type in self.statement_types:
+            try:
+                normalized = read_statement(write_dir_normalized, statement_type.value)
+            except (FileNotFoundError, ValueError):
+                continue
+            try:
+                derived = read_statement(write_dir_derived, statement_type.value)["facts"]
+            except (FileNotFoundError, ValueError):
+                derived = []
+            try:
+                periods = facts_from_dicts(read_statement(write_dir_periods, statement_type.value)["facts"])
+            except (FileNotFoundError, ValueError):
+                periods = None
+            stored[statement_type] = {
+                "normalized": facts_from_dicts(normalized["facts"]),
+                "derived": facts_from_dicts(derived),
+                "periods": periods,
+                "processed_date": normalized.get("processed_date")
+            }
+        return stored
+
+    def extract_incremental(self, company_ticker, companyfacts, stored, known_accessions, latest_filed=None):
+        """
+        Re-extract only the concepts whose tags received new facts
+
+        The unit of work is the concept: a concept with no new facts is
+        copied from the stored output, and a concept with any new fact is
+        renormalized over its tag's full history, so amendments
+        superseding earlier values are picked up. Individual (start, end)
+        periods are never patched. Normalized rows carry a period label
+        but not the (start, end) they were grouped by, and 10-K
+        comparatives share one label across several periods, so a stored
+        row cannot be matched to the period a new fact belongs to.
+
+        Derived concepts are recomputed only when one of their inputs
+        changed, directly or through another derived concept. A statement
+        without stored output, or whose output is older than the previous
+        document, is extracted in full. The result matches extract() on
+        the same document.
+
+        Args:
+            company_ticker: Company ticker symbol
+            companyfacts: New SEC companyfacts dictionary
+            stored: Output of load_stored() for the previous document
+            known_accessions: Accession numbers of the previous document
+            latest_filed: Latest filed date of the previous document
+
+        Returns:
+            Tuple of (output of extract(), {FactType: set of touched concepts})
+        """
+        new_facts = self.find_new_facts(companyfacts, known_accessions, latest_filed)
+
+        results = {}
+        touched = {}
+        for statement_type in self.statement_types:
+            direct_registry = self.direct_fact_registries[statement_type]
+            derived_registry = self.derived_fact_registries[statement_type]
+            previous = stored.get(statement_type)
+            if previous is not None and latest_filed and (previous.get("processed_date") or "") < latest_filed:
+                # Outputs predate the previous document (e.g. an interrupted refresh)
+                previous = None
+
+            if previous is None:
+                touched_concepts = set(direct_registry)
+            else:
+                touched_concepts = {
+                    c for c, meta in direct_registry.items() if any(tag in new_facts for tag in tag_chain(meta))
+                }
+            touched[statement_type] = touched_concepts
+
+            previous_by_concept = {}
+            for fact in (previous or {}).get("normalized", []):
+                previous_by_concept.setdefault(fact.concept, []).append(fact)
+
+            # Outputs written before the period stage existed get it in full
+            previous_periods = (previous or {}).get("periods")
+            periods_touched = touched_concepts if previous_periods is not None else set(direct_registry)
+            previous_periods_by_concept = {}
+            for fact in previous_periods or []:
+                previous_periods_by_concept.setdefault(fact.concept, []).append(fact)
+
+            # Registry order, exactly as extract() assembles it
+            retriever = self.direct_retriever_class(company_ticker, statement_type, direct_registry)
+            normalized = []
+            periods = []
+            for concept, meta in direct_registry.items():
+                _, raw_facts = retriever.resolve_raw_facts(companyfacts, meta)
+                if concept not in periods_touched:
+                    periods.extend(previous_periods_by_concept.get(concept, []))
+                elif raw_facts:
+                    periods.extend(retriever.normalize_periods(concept, raw_facts))
+
+                if concept not in touched_concepts:
+                    normalized.extend(previous_by_concept.get(concept, []))
+                elif raw_facts:
+                    normalized.extend(retriever.normalize_concept(concept, raw_facts))
+
+            derived = []
+            if normalized and derived_registry:
+                plan = self.derivation_plans[statement_type]
+                stale = set(derived_registry) if previous is None else plan.affected_by(periods_touched)
+                recomputed = {}
+                if stale:
+                    # Intermediate derived inputs are recomputed along with their dependents
+                    derived_retriever = GenericDerivedFactRetriever(company_ticker, statement_type,
+                                                                    derived_registry, plan)
+                    for fact in derived_retriever.extract_derived_facts(normalized, periods):
+                        recomputed.setdefault(fact.concept, []).append(fact)
+
+                previous_derived = {}
+                for fact in (previous or {}).get("derived", []):
+                    previous_derived.setdefault(fact.concept, []).append(fact)
+
+                for concept in derived_registry:
+                    source = recomputed if concept in stale else previous_derived
+                    derived.extend(source.get(concept, []))
+
+            logger.info(f"Re-extracted {len(touched_concepts)}/{len(direct_registry)} "
+                        f"{statement_type.value} concepts for {company_ticker}")
+            results[statement_type] = {"normalized": normalized, "derived": derived, "periods": periods}
+
+        return results, touched
+
+    def write(self, company_ticker, results, write_dir_normalized, write_dir_derived, write_dir_periods=None):
+        """
+        Write extracted facts to storage, skipping empty statements
+
+        Args:
+            company_ticker: Company ticker symbol
+            results: Output of extract()
+            write_dir_normalized: Directory for normalized facts
+            write_dir_derived: Directory for derived facts
+            write_dir_periods: Directory for period-stage facts (default: "periods"
+                next to write_dir_normalized)
+        """
+        processed_date = date.today().isoformat()
+        write_dir_periods = write_dir_periods or periods_dir_for(write_dir_normalized)
+
+        for statement_type, facts in results.items():
+            if not facts["normalized"]:
+                logger.warning(f"No {statement_type.value} facts extracted for {company_ticker}")
+                continue
+
+            write_dir_normalized.mkdir(parents=True, exist_ok=True)
+            direct_retriever = GenericDirectFactRetriever(
+                company_ticker, statement_type, self.direct_fact_registries[statement_type]
+            )
+            direct_retriever.write(facts["normalized"], write_dir_normalized, processed_date,
+                                   self.storage_format, self.warehouse)
+
+            if facts.get("periods"):
+                write_dir_periods.mkdir(parents=True, exist_ok=True)
+                direct_retriever.write(facts["periods"], write_dir_periods, processed_date,
+                                       self.storage_format, self.warehouse, STAGE_PERIODS)
+
+            if facts["derived"]:
+                write_dir_derived.mkdir(parents=True, exist_ok=True)
+                GenericDerivedFactRetriever(
+                    company_ticker, statement_type, self.derived_fact_registries[statement_type],
+                    self.derivation_plans[statement_type]
+                ).write(facts["derived"], write_dir_derived, processed_date, self.storage_format, self.warehouse)
+
+    def run(self, company_ticker, companyfacts_path, write_dir_normalized, write_dir_derived):
+        """
+        Run single-pass retrieval for all statements of a ticker
+
+        Args:
+            company_ticker: Company ticker symbol
+            companyfacts_path: Path to companyfacts JSON file
+            write_dir_normalized: Directory for normalized facts
+            write_dir_derived: Directory for derived facts
+
+        Returns:
+            Output of extract(), or None if companyfacts could not be loaded
+        """
+        companyfacts_file_path = PROJECT_ROOT / companyfacts_path
+
+        logger.info(f"Loading companyfacts from {companyfacts_file_path}")
+
+        try:
+            companyfacts = self.load_companyfacts(companyfacts_file_path)
+        except FileNotFoundError:
+            logger.error(f"Company facts file not found: {companyfacts_file_path}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing company facts JSON: {e}")
+            return None
+
+        results = self.extract(company_ticker, companyfacts)
+        self.write(company_ticker, results, PROJECT_ROOT / write_dir_normalized, PROJECT_ROOT / write_dir_derived)
+
+        for statement_type, facts in results.items():
+            print(f"✓ Extracted {len(facts['normalized'])} {statement_type.value} facts, "
+                  f"{len(facts['derived'])} derived facts and {len(facts['periods'])} period facts "
+                  f"for {company_ticker}")
+
+        return results
+
+    def run_incremental(self, company_ticker, companyfacts_path, write_dir_normalized, write_dir_derived,
+                        known_accessions, latest_filed=None):
+        """
+        Refresh stored outputs from a newer companyfacts document
+
+        Every statement is rewritten so processed_date moves forward,
+        but only touched concepts are recomputed (see extract_incremental).
+
+        Args:
+            company_ticker: Company ticker symbol
+            companyfacts_path: Path to the new companyfacts JSON file
+            write_dir_normalized: Directory for normalized facts
+            write_dir_derived: Directory for derived facts
+            known_accessions: Accession numbers of the previous document
+            latest_filed: Latest filed date of the previous document
+
+        Returns:
+            Output of extract(), or None if companyfacts could not be loaded
+        """
+        companyfacts_file_path = PROJECT_ROOT / companyfacts_path
+
+        try:
+            companyfacts = self.load_companyfacts(companyfacts_file_path)
+        except FileNotFoundError:
+            logger.error(f"Company facts file not found: {companyfacts_file_path}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing company facts JSON: {e}")
+            return None
+
+        write_dir_normalized = PROJECT_ROOT / write_dir_normalized
+        write_dir_derived = PROJECT_ROOT / write_dir_derived
+        stored = self.load_stored(write_dir_normalized, write_dir_derived)
+        results, touched = self.extract_incremental(company_ticker, companyfacts, stored,
+                                                    known_accessions, latest_filed)
+        self.write(company_ticker, results, write_dir_normalized, write_dir_derived)
+
+        for statement_type, facts in results.items():
+            print(f"✓ Refreshed {len(touched[statement_type])} {statement_type.value} concepts "
+                  f"({len(facts['normalized'])} facts, {len(facts['derived'])} derived) for {company_ticker}")
+
+        return results
+
+    def run_derivations(self, company_ticker, write_dir_normalized, write_dir_derived):
+        """
+        Recompute derived facts from the stored normalized outputs
+
+        Used when only the derived registry changed; companyfacts is not
+        read and normalized outputs are left as they are. Derived files keep
+        the processed_date of the normalized outputs they were computed from.
+
+        Args:
+            company_ticker: Company ticker symbol
+            write_dir_normalized: Directory of the stored normalized facts
+            write_dir_derived: Directory for derived facts
+
+        Returns:
+            Dictionary mapping FactType to its list of derived Facts
+        """
+        write_dir_normalized = PROJECT_ROOT / write_dir_normalized
+        write_dir_derived = PROJECT_ROOT / write_dir_derived
+        stored = self.load_stored(write_dir_normalized, write_dir_derived)
+
+        results = {}
+        for statement_type, facts in stored.items():
+            derived_registry = self.derived_fact_registries[statement_type]
+            if not facts["normalized"] or not derived_registry:
+                continue
+
+            derived_retriever = GenericDerivedFactRetriever(company_ticker, statement_type, derived_registry,
+                                                            self.derivation_plans[statement_type])
+            derived = derived_retriever.extract_derived_facts(facts["normalized"], facts["periods"] or [])
+            results[statement_type] = derived
+            if derived:
+                write_dir_derived.mkdir(parents=True, exist_ok=True)
+                derived_retriever.write(derived, write_dir_derived, facts["processed_date"],
+                                        self.storage_format, self.warehouse)
+            print(f"✓ Derived {len(derived)} {statement_type.value} facts for {company_ticker}")
+
+        return results
+
+
+# =========================
+# USAGE
+# =========================
+
+if __name__ == "__main__":
+    engine = ExtractionEngine("src/retrievers/registry/sec_facts_canonical_mappings_v1.json")
+    engine.run("RDDT",
+               "data/RDDT/raw/company_facts.json",
+               "data/RDDT/normalized",
+               "data/RDDT/derived")
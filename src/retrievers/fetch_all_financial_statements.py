@@ -1,6 +1,9 @@
-import json
 import logging
 from pathlib import Path
+from storage.columnar import MISSING
+from storage.fact_store import read_statement, read_statement_columns
+from storage.fact_warehouse import DEFAULT_WAREHOUSE_PATH, get_warehouse
+from storage.generations import read_current
 
 # =========================
 # LOGGING
@@ -18,55 +21,203 @@ def merge_cashflow_statements(normalized_facts, derived_facts):
         return merged_data
 
 class FetchAllFinancialStatements:
+    @staticmethod
     def fetch_income_statement(company_ticker: str):
         company_ticker = company_ticker.upper()
-        project_root = Path(__file__).parent.parent.parent.parent
-        normalized_path = f"{project_root}/data/{company_ticker}/normalized/income_statement.json"
+        project_root = Path(__file__).parent.parent.parent
+        company_dir = project_root / "data" / company_ticker
         try:
-            with open(normalized_path, "r") as f:
-                normalized_facts = json.load(f)
+            normalized_facts = read_current(
+                company_dir, lambda generation_dir: read_statement(generation_dir / "normalized", "income_statement")
+            )
         except FileNotFoundError:
-            logger.error(f"Income statement not found at: {normalized_path}")
+            logger.error(f"Income statement not found in: {company_dir}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing company facts JSON: {e}")
+        except ValueError as e:
+            logger.error(f"Error parsing income statement file: {e}")
             return None
         
         return normalized_facts
     
+    @staticmethod
     def fetch_balance_sheet(company_ticker: str):
         company_ticker = company_ticker.upper()
-        project_root = Path(__file__).parent.parent.parent.parent
-        normalized_path = f"{project_root}/data/{company_ticker}/normalized/balance_sheet.json"
+        project_root = Path(__file__).parent.parent.parent
+        company_dir = project_root / "data" / company_ticker
         try:
-            with open(normalized_path, "r") as f:
-                normalized_facts = json.load(f)
+            normalized_facts = read_current(
+                company_dir, lambda generation_dir: read_statement(generation_dir / "normalized", "balance_sheet")
+            )
         except FileNotFoundError:
-            logger.error(f"Balance sheet not found at: {normalized_path}")
+            logger.error(f"Balance sheet not found in: {company_dir}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing company facts JSON: {e}")
+        except ValueError as e:
+            logger.error(f"Error parsing balance sheet file: {e}")
             return None
         
         return normalized_facts
     
+    @staticmethod
     def fetch_cash_flow_statement(company_ticker: str):
         company_ticker = company_ticker.upper()
-        project_root = Path(__file__).parent.parent.parent.parent
-        normalized_path = f"{project_root}/data/{company_ticker}/normalized/cash_flow_statement.json"
-        derived_path = f"{project_root}/data/{company_ticker}/normalized/cash_flow_statement.json"
+        project_root = Path(__file__).parent.parent.parent
+        company_dir = project_root / "data" / company_ticker
+
+        # Both stages come from the same generation
+        def read(generation_dir):
+            normalized_facts = read_statement(generation_dir / "normalized", "cash_flow_statement")
+            derived_facts = read_statement(generation_dir / "derived", "cash_flow_statement")
+            return merge_cashflow_statements(normalized_facts, derived_facts)
+
         try:
-            with open(normalized_path, "r") as n, open(derived_path, "r") as d:
-                normalized_facts = json.load(n)
-                derived_facts = json.load(d)
-                merged_facts = merge_cashflow_statements(normalized_facts, derived_facts)
+            merged_facts = read_current(company_dir, read)
         except FileNotFoundError:
-            logger.error(f"Cashflow not found at: {normalized_path} or {derived_path}")
+            logger.error(f"Cashflow not found in: {company_dir}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing company facts JSON: {e}")
+        except ValueError as e:
+            logger.error(f"Error parsing cash flow statement file: {e}")
             return None
         
-        return normalized_facts
-    
+        return merged_facts
+
+    @staticmethod
+    def fetch_periods(company_ticker: str, statement: str):
+        """
+        Period-stage facts of a statement: discrete quarters (Q4 and other
+        YTD-only quarters decomposed) and rolling TTM values, e.g.
+        fetch_periods("RDDT", "income_statement")
+
+        Returns:
+            Statement payload, or None if the period stage was not written
+        """
+        company_ticker = company_ticker.upper()
+        project_root = Path(__file__).parent.parent.parent
+        company_dir = project_root / "data" / company_ticker
+        try:
+            return read_current(company_dir, lambda generation_dir: read_statement(generation_dir / "periods", statement))
+        except FileNotFoundError:
+            logger.error(f"{statement} periods not found in: {company_dir}")
+            return None
+        except ValueError as e:
+            logger.error(f"Error parsing {statement} periods file: {e}")
+            return None
+
+    @staticmethod
+    def fetch_columns(company_ticker: str, statement: str, stages=("normalized",), fields=None):
+        """
+        Facts of a statement as per-field value lists, without building a
+        dict per fact; columnar (.colz) files are decoded straight into
+        columns, e.g. fetch_columns("RDDT", "income_statement", fields=("concept", "period", "value"))
+
+        Args:
+            company_ticker: Company ticker symbol
+            statement: Statement type value
+            stages: Stages to read, concatenated in order (e.g. ("normalized", "derived"))
+            fields: Field names to return (default: every field)
+
+        Returns:
+            {"company", "statement", "processed_date", "columns": {field: list}},
+            with MISSING where a fact lacks a field, or None if not written
+        """
+        company_ticker = company_ticker.upper()
+        project_root = Path(__file__).parent.parent.parent
+        company_dir = project_root / "data" / company_ticker
+
+        # Every stage comes from the same generation
+        def read(generation_dir):
+            return [read_statement_columns(generation_dir / stage, statement, fields) for stage in stages]
+
+        try:
+            parts = read_current(company_dir, read)
+        except FileNotFoundError:
+            logger.error(f"{statement} not found in: {company_dir}")
+            return None
+        except ValueError as e:
+            logger.error(f"Error parsing {statement} file: {e}")
+            return None
+
+        names = list(fields) if fields is not None else []
+        for _, columns in parts:
+            names.extend(name for name in columns if name not in names)
+        merged = {name: [] for name in names}
+        for _, columns in parts:
+            rows = len(next(iter(columns.values()), []))
+            for name in names:
+                merged[name].extend(columns.get(name, [MISSING] * rows))
+
+        payload = dict(parts[0][0]) if parts else {}
+        payload["columns"] = merged
+        return payload
+
+    @staticmethod
+    def _open_warehouse(warehouse_path):
+        if not Path(warehouse_path).exists():
+            logger.error(f"Fact warehouse not found: {warehouse_path}")
+            return None
+        return get_warehouse(warehouse_path)
+
+    @staticmethod
+    def query_facts(company_ticker=None, statement=None, concept=None, period=None, stage=None,
+                    warehouse_path=DEFAULT_WAREHOUSE_PATH):
+        """
+        Facts from the SQLite warehouse matching every given filter
+
+        Args:
+            company_ticker: Ticker, or list of tickers
+            statement: Statement type value (e.g. "income_statement")
+            concept: Canonical concept, or list of concepts
+            period: Period label (e.g. "Q3-2024"), or list of labels
+            stage: "normalized", "derived" or "periods", or list of stages
+                (default: every stage; each fact says which it is from)
+            warehouse_path: Path to the warehouse database
 
+        Returns:
+            List of fact dictionaries, or None if there is no warehouse
+        """
+        warehouse = FetchAllFinancialStatements._open_warehouse(warehouse_path)
+        if warehouse is None:
+            return None
+        if isinstance(company_ticker, str):
+            company_ticker = company_ticker.upper()
+        elif company_ticker is not None:
+            company_ticker = [ticker.upper() for ticker in company_ticker]
+        return warehouse.query(company=company_ticker, statement=statement, concept=concept, period=period,
+                               stage=stage)
+
+    @staticmethod
+    def fetch_cross_section(statement: str, concept: str, period: str, stage=None,
+                            warehouse_path=DEFAULT_WAREHOUSE_PATH):
+        """
+        One concept for one period across every company, e.g.
+        fetch_cross_section("income_statement", "revenue", "Q3-2024")
+
+        Args:
+            stage: Stage to read (default: the period stage for quarters
+                and TTM, then derived, then normalized; see
+                fact_warehouse.stage_preference)
+
+        Returns:
+            Dictionary of ticker → value, or None if there is no warehouse
+        """
+        warehouse = FetchAllFinancialStatements._open_warehouse(warehouse_path)
+        if warehouse is None:
+            return None
+        return warehouse.cross_section(statement, concept, period, stage)
+
+    @staticmethod
+    def fetch_time_series(company_ticker: str, statement: str, concept: str, stage=None,
+                          warehouse_path=DEFAULT_WAREHOUSE_PATH):
+        """
+        Every period of one concept for one company, in order of period end
+
+        Args:
+            stage: Stage to read (default: one fact per period, preferred
+                as in fetch_cross_section)
+
+        Returns:
+            List of fact dictionaries, or None if there is no warehouse
+        """
+        warehouse = FetchAllFinancialStatements._open_warehouse(warehouse_path)
+        if warehouse is None:
+            return None
+        return warehouse.time_series(company_ticker, statement, concept, stage)
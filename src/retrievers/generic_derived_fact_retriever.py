@@ -1,5 +1,8 @@
+from models.fact import facts_to_dicts
+from retrievers.derivation_engine import DerivationPlan
 from retrievers.generic_direct_fact_retriever import FactType
-import json
+from storage.fact_store import STORAGE_FORMAT_JSON, write_statement
+from storage.fact_warehouse import STAGE_DERIVED
 import logging
 
 # =========================
@@ -13,135 +16,61 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def derive_binary_subtraction(
-    company,
-    concept_name,
-    spec,
-    normalized_facts
-):
-    derived = []
-    facts_by_period = index_facts_by_period(normalized_facts)
-    left_key, right_key = spec["derived_from"]
-
-    for period, facts in facts_by_period.items():
-        left = facts.get(left_key)
-        right = facts.get(right_key)
-
-        # Fail closed
-        if not left or not right:
-            continue
-
-        # Constraint: same currency
-        if spec["constraints"].get("same_currency"):
-            if left["currency"] != right["currency"]:
-                continue
-
-        value = left["value"] - right["value"]
-
-        derived.append({
-            "company": company,
-            "statement": spec["statement"],
-            "concept": concept_name,
-            "value": value,
-            "currency": left["currency"],
-            "period": period,
-            "reported": False,
-            "derived_from": spec["derived_from"],
-            "derivation_type": spec["derivation_type"],
-            "confidence": "high"
-        })
-
-    return derived
-
-def index_facts_by_period(normalized_facts):
-    """
-    Returns:
-    {
-        "Q2-2023": {
-            "operating_cash_flow": {...},
-            "capital_expenditure": {...}
-        }
-    }
-    """
-    index = {}
-
-    for fact in normalized_facts:
-        period = fact["period"]
-        concept = fact["concept"]
-
-        index.setdefault(period, {})
-        index[period][concept] = fact
-
-    return index
-
-
-DERIVATION_HANDLERS = {
-    "binary_subtraction": derive_binary_subtraction
-}
-
 class GenericDerivedFactRetriever:
     """
     Generic retriever for extracting and normalizing derived facts
     from SEC companyfacts JSON
     """
 
-    def __init__(self, company_ticker: str, statement_type: FactType, registry: dict):
+    def __init__(self, company_ticker: str, statement_type: FactType, registry: dict, plan: DerivationPlan = None):
         """
         Initialize retriever
         
         Args:
             company_ticker: Company ticker symbol
             statement_type: Type of financial statement to retrieve
+            registry: Derived concepts of the statement registry
+            plan: Already compiled DerivationPlan of the registry (compiled here if None)
         """
         self.company_ticker = company_ticker
         self.statement_type = statement_type
         self.registry = registry
+        self.plan = plan if plan is not None else DerivationPlan(registry)
 
-    def extract_derived_facts(self, normalized_facts):
+    def extract_derived_facts(self, normalized_facts, period_facts=()):
         """
         Extract derived facts based on registry specifications
+
+        Args:
+            normalized_facts: List of normalized Facts
+            period_facts: List of period-stage Facts, which TTM and YoY
+                concepts are computed from
         
         Returns:
-            List of derived normalized facts
+            List of derived Facts
         """
-        derived_all = []
-
-        for concept_name, spec in self.registry.items():
-            derivation_type = spec["derivation_type"]
-            handler = DERIVATION_HANDLERS.get(derivation_type)
-
-            if not handler:
-                continue  # unknown derivation type
-
-            derived = handler(
-                company=self.company_ticker,
-                concept_name=concept_name,
-                spec=spec,
-                normalized_facts=normalized_facts
-            )
-
-            derived_all.extend(derived)
-
-        return derived_all
+        return self.plan.evaluate(self.company_ticker, normalized_facts, period_facts)
     
-    def write(self, facts, write_dir, processed_date):
+    def write(self, facts, write_dir, processed_date, storage_format=STORAGE_FORMAT_JSON, warehouse=None):
         """
         Write derived facts to storage
         
         Args:
-            facts: List of derived normalized facts
-            project_root: Path to project root directory
+            facts: List of derived Facts
+            write_dir: Path to output directory
+            storage_format: STORAGE_FORMAT_JSON or STORAGE_FORMAT_COLUMNAR
+            warehouse: Optional FactWarehouse to load the facts into as well
         """
-        output_file = write_dir / f"{self.statement_type.value}.json"
-
         payload = {
             "company": self.company_ticker,
             "statement": self.statement_type.value,
             "processed_date": processed_date,
-            "facts": facts
+            "facts": facts_to_dicts(facts)
         }
 
-        with open(output_file, "w") as f:
-            json.dump(payload, f, indent=2)
+        output_file = write_statement(payload, write_dir, storage_format)
         
-        logger.info(f"Written {len(facts)} facts to {output_file}")
\ No newline at end of file
+        logger.info(f"Written {len(facts)} facts to {output_file}")
+
+        if warehouse is not None:
+            warehouse.load_statement(payload, STAGE_DERIVED)
@@ -10,12 +10,15 @@ Outputs:
 - Written to file-based JSON storage
 """
 
-import json
 import sys
 import logging
 from enum import Enum
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from models.fact import Fact, facts_to_dicts
+from storage.raw_store import load_raw
+from storage.fact_store import STORAGE_FORMAT_JSON, write_statement
+from storage.fact_warehouse import STAGE_NORMALIZED
 
 
 # =========================
@@ -51,33 +54,31 @@ FORM_PRIORITY = {
     "10-Q": 1
 }
 
+# Period stage
+ANNUAL_MIN_DAYS = 350
+ANNUAL_MAX_DAYS = 380
+DAYS_PER_QUARTER = 365.25 / 4
+TTM_QUARTERS = 4
+PERIOD_DERIVATION_YTD = "ytd_decomposition"
+PERIOD_DERIVATION_TTM = "ttm"
+ONE_DAY = timedelta(days=1)
+
 
 # =========================
-# REGISTRY LOADER
+# REGISTRY HELPERS
 # =========================
 
-def load_registry(statement_type: FactType, registry_path: str):
+def tag_chain(meta: dict):
     """
-    Load registry for a specific statement type from canonical mappings file
-    
+    XBRL tags that can supply a direct concept, in order of preference
+
     Args:
-        statement_type: StatementType enum value
-        
+        meta: Registry entry of the concept
+
     Returns:
-        Dictionary mapping canonical fields to XBRL metadata
+        Tuple of the primary "tag" followed by any "fallback_tags"
     """
-    
-    try:
-        with open(registry_path, "r") as f:
-            mappings = json.load(f)
-        logger.info(f"Loaded registry from {registry_path}")
-        return mappings.get(statement_type.value, {})
-    except FileNotFoundError:
-        logger.error(f"Registry file not found at {registry_path}")
-        return {}
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing registry file: {e}")
-        return {}
+    return (meta["tag"], *meta.get("fallback_tags", ()))
 
 
 # =========================
@@ -144,6 +145,23 @@ class GenericDirectFactRetriever:
             logger.debug(f"Tag {tag} not found in companyfacts")
             return []
 
+    def resolve_raw_facts(self, companyfacts, meta):
+        """
+        Raw SEC facts of the first tag in a concept's tag chain that has any
+
+        Args:
+            companyfacts: SEC companyfacts dictionary
+            meta: Registry entry of the concept
+
+        Returns:
+            Tuple of (tag, list of facts in USD), or (None, []) if no tag is reported
+        """
+        for tag in tag_chain(meta):
+            raw_facts = self.extract_raw_facts(companyfacts, tag)
+            if raw_facts:
+                return tag, raw_facts
+        return None, []
+
     # =========================
     # AUTHORITATIVE SELECTION
     # =========================
@@ -203,13 +221,269 @@ class GenericDirectFactRetriever:
         if self.is_discrete_quarter(fact):
             return f"{fact['fp']}-{fact['fy']}"
 
-        # YTD or unsupported period → ignore for now
+        # YTD or unsupported period → decomposed by the period stage (normalize_periods)
         return None
 
     # =========================
     # MAIN EXTRACTION LOGIC
     # =========================
 
+    def normalize_concept(self, concept, raw_facts):
+        """
+        Normalize the raw SEC facts of a single registry concept
+        
+        Args:
+            concept: Canonical concept name
+            raw_facts: List of raw SEC facts for the concept's tag
+            
+        Returns:
+            List of normalized Facts
+        """
+        normalized = []
+        grouped = self.group_by_period(raw_facts)
+
+        for _, facts in grouped.items():
+            fact = self.pick_authoritative(facts)
+            period = self.classify_period(fact)
+
+            if not period:
+                continue
+
+            normalized.append(Fact(
+                self.company_ticker, self.statement_type.value, concept, fact["val"], "USD", period,
+                True, source_form=fact["form"], filed_date=fact["filed"]
+            ))
+
+        return normalized
+
+    # =========================
+    # PERIOD NORMALIZATION
+    # =========================
+
+    @staticmethod
+    def fiscal_year_label(year_end):
+        """
+        Fiscal year of a fiscal year end date when no filing names it
+
+        Fallback for fiscal_year_labels(): years ending June-December
+        take the calendar year they end in, years ending January-May the
+        previous one. SEC's own fy does not always agree (NVIDIA's year
+        ending 2025-01-26 is fiscal 2025).
+        """
+        return year_end.year if year_end.month >= 6 else year_end.year - 1
+
+    def fiscal_year_labels(self, raw_facts, years):
+        """
+        SEC fiscal year (fy) of each fiscal year span
+
+        SEC tags a fact with the fy of the filing it was taken from, so
+        comparatives carry a later year than their own. A filing's fy
+        is the fiscal year of its current period, the latest end date it
+        reports, so each filing names the span holding that date; the
+        most recent filing wins. Spans no filing reports as current are
+        numbered from the nearest named one, and from fiscal_year_label()
+        if no fact has an fy.
+
+        Args:
+            raw_facts: List of raw SEC facts for the concept's tag
+            years: Output of fiscal_years()
+
+        Returns:
+            List of fiscal years, aligned with years
+        """
+        current = {}  # accession → (latest end, fy, filed)
+        for fact in raw_facts:
+            if fact.get("accn") is None or fact.get("fy") is None:
+                continue
+            end = date.fromisoformat(fact["end"])
+            seen = current.get(fact["accn"])
+            if seen is None or end > seen[0]:
+                current[fact["accn"]] = (end, int(fact["fy"]), fact.get("filed", ""))
+
+        named = {}  # position in years → (filed, fy)
+        for end, fiscal_year, filed in current.values():
+            for position, (year_start, year_end) in enumerate(years):
+                if year_start <= end <= year_end:
+                    if position not in named or filed > named[position][0]:
+                        named[position] = (filed, fiscal_year)
+                    break
+
+        labels = []
+        for position, (_, year_end) in enumerate(years):
+            if position in named:
+                labels.append(named[position][1])
+            elif named:
+                nearest = min(named, key=lambda other: abs(other - position))
+                labels.append(named[nearest][1] + round((year_end - years[nearest][1]).days / 365.25))
+            else:
+                labels.append(self.fiscal_year_label(year_end))
+        return labels
+
+    @staticmethod
+    def quarter_number(year_start, end):
+        """Quarter (1-4) of a fiscal year that ends on a given date"""
+        return min(4, max(1, round(((end - year_start).days + 1) / DAYS_PER_QUARTER)))
+
+    def authoritative_periods(self, raw_facts):
+        """
+        Authoritative fact of every dated (start, end) period
+
+        Returns:
+            Dictionary mapping (start, end) dates to the authoritative fact
+        """
+        periods = {}
+        for (start, end), facts in self.group_by_period(raw_facts).items():
+            if start is None or end is None:
+                continue
+            periods[(date.fromisoformat(start), date.fromisoformat(end))] = self.pick_authoritative(facts)
+        return periods
+
+    def fiscal_years(self, periods):
+        """
+        Fiscal years spanned by a concept's periods
+
+        A fiscal year starts where a cumulative (YTD or annual) period
+        starts, or the day after a known year end when only its first
+        quarter has been filed so far.
+
+        Returns:
+            Sorted list of (year_start, year_end) dates
+        """
+        year_ends = {}
+        starts = set()
+        for start, end in periods:
+            days = (end - start).days
+            if 100 < days <= ANNUAL_MAX_DAYS:
+                starts.add(start)
+                if days >= ANNUAL_MIN_DAYS:
+                    year_ends[start] = end
+        known_ends = set(year_ends.values())
+        for start, end in periods:
+            if 80 <= (end - start).days <= 100 and start - ONE_DAY in known_ends:
+                starts.add(start)
+
+        years = []
+        ordered = sorted(starts)
+        for i, start in enumerate(ordered):
+            if years and start <= years[-1][1]:
+                continue  # a cumulative period starting mid-year
+            end = year_ends.get(start)
+            if end is None:
+                following = ordered[i + 1] if i + 1 < len(ordered) else None
+                if following is not None and (following - start).days <= ANNUAL_MAX_DAYS:
+                    end = following - ONE_DAY
+                else:
+                    try:
+                        end = start.replace(year=start.year + 1) - ONE_DAY
+                    except ValueError:  # starts on February 29
+                        end = start.replace(year=start.year + 1, day=28)
+            years.append((start, end))
+        return years
+
+    def decompose_year(self, periods, year_start, year_end):
+        """
+        Discrete quarters of one fiscal year
+
+        A quarter is taken as reported when a filing has its three-month
+        value; otherwise it is the YTD value ending with it minus the
+        cumulative value through the previous quarter (e.g. Q4 = FY -
+        nine-month YTD).
+
+        Returns:
+            Dictionary mapping quarter number to (start, end, value,
+            facts used, reported); the first fact used is the reported
+            quarter or the YTD value it was decomposed from
+        """
+        ends = {}
+        for start, end in sorted(periods):
+            if year_start <= start and end <= year_end and (
+                    start == year_start or 80 <= (end - start).days <= 100):
+                ends.setdefault(self.quarter_number(year_start, end), end)
+
+        quarters = {}
+        running = (0, [])  # cumulative value and facts through the previous quarter
+        for quarter in range(1, 5):
+            end = ends.get(quarter)
+            previous_end = year_start - ONE_DAY if quarter == 1 else ends.get(quarter - 1)
+            if end is None or previous_end is None:
+                running = None
+                continue
+
+            start = previous_end + ONE_DAY
+            discrete = periods.get((start, end))
+            ytd = periods.get((year_start, end))
+            if discrete is not None:
+                quarters[quarter] = (start, end, discrete["val"], [discrete], True)
+            elif ytd is not None and running is not None:
+                quarters[quarter] = (start, end, ytd["val"] - running[0], [ytd] + running[1], False)
+
+            if ytd is not None:
+                running = (ytd["val"], [ytd])
+            elif quarter in quarters and running is not None:
+                running = (running[0] + quarters[quarter][2], running[1] + quarters[quarter][3])
+            else:
+                running = None
+        return quarters
+
+    def period_fact(self, concept, label, value, start, end, source, reported, derivation_type=None):
+        """Period-stage Fact whose source form and filed date come from the given raw fact"""
+        return Fact(
+            self.company_ticker, self.statement_type.value, concept, value, "USD", label, reported,
+            source_form=source["form"], filed_date=source["filed"],
+            derived_from=None if reported else [concept], derivation_type=derivation_type,
+            confidence=None if reported else "high", start=start.isoformat(), end=end.isoformat()
+        )
+
+    def normalize_periods(self, concept, raw_facts):
+        """
+        Discrete quarter and trailing-twelve-month series of a duration concept
+
+        Quarters are labelled with the SEC fiscal year of the span they
+        fall in (see fiscal_year_labels) rather than the fy of the filing
+        each value was picked from, so comparatives land in the year
+        they belong to. A TTM value is emitted for every run of four
+        contiguous quarters, labelled after the last one ("TTM-Q3-2025").
+
+        Args:
+            concept: Canonical concept name
+            raw_facts: List of raw SEC facts for the concept's tag
+
+        Returns:
+            List of period-stage Facts (quarters, then TTM), oldest first;
+            empty for instant concepts
+        """
+        if self.registry.get(concept, {}).get("type") != "duration":
+            return []
+
+        periods = self.authoritative_periods(raw_facts)
+        series = []
+        years = self.fiscal_years(periods)
+        for (year_start, year_end), fiscal_year in zip(years, self.fiscal_year_labels(raw_facts, years)):
+            for quarter, (start, end, value, facts, reported) in sorted(
+                    self.decompose_year(periods, year_start, year_end).items()):
+                series.append((f"Q{quarter}-{fiscal_year}", start, end, value, facts, reported))
+
+        quarter_facts = [
+            self.period_fact(concept, label, value, start, end, facts[0], reported,
+                             None if reported else PERIOD_DERIVATION_YTD)
+            for label, start, end, value, facts, reported in series
+        ]
+
+        ttm_facts = []
+        for i in range(TTM_QUARTERS - 1, len(series)):
+            window = series[i - TTM_QUARTERS + 1:i + 1]
+            if any(window[j + 1][1] != window[j][2] + ONE_DAY for j in range(TTM_QUARTERS - 1)):
+                continue
+            # Sourced from the most recent filing among its inputs
+            latest = max((fact for q in window for fact in q[4]),
+                         key=lambda f: (f["filed"], FORM_PRIORITY.get(f["form"], 0)))
+            ttm_facts.append(self.period_fact(
+                concept, f"TTM-{window[-1][0]}", sum(q[3] for q in window), window[0][1], window[-1][2],
+                latest, False, PERIOD_DERIVATION_TTM
+            ))
+
+        return quarter_facts + ttm_facts
+
     def extract(self, companyfacts):
         """
         Extract and normalize financial statement facts
@@ -224,33 +498,13 @@ class GenericDirectFactRetriever:
         normalized = []
         logger.info(f"Using registry with {len(self.registry)} concepts")
         for concept, meta in self.registry.items():
-            tag = meta["tag"]
-            raw_facts = self.extract_raw_facts(companyfacts, tag)
+            tag, raw_facts = self.resolve_raw_facts(companyfacts, meta)
 
             if not raw_facts:
-                logger.debug(f"No facts found for {concept} (tag: {tag})")
+                logger.debug(f"No facts found for {concept} (tags: {', '.join(tag_chain(meta))})")
                 continue
 
-            grouped = self.group_by_period(raw_facts)
-
-            for _, facts in grouped.items():
-                fact = self.pick_authoritative(facts)
-                period = self.classify_period(fact)
-
-                if not period:
-                    continue
-
-                normalized.append({
-                    "company": self.company_ticker,
-                    "statement": self.statement_type.value,
-                    "concept": concept,
-                    "value": fact["val"],
-                    "currency": "USD",
-                    "period": period,
-                    "reported": True,
-                    "source_form": fact["form"],
-                    "filed_date": fact["filed"]
-                })
+            normalized.extend(self.normalize_concept(concept, raw_facts))
 
         logger.info(f"Extracted {len(normalized)} facts")
         return normalized
@@ -259,29 +513,33 @@ class GenericDirectFactRetriever:
     # FILE-BASED STORAGE
     # =========================
 
-    def write(self, facts, output_dir, processed_date):
+    def write(self, facts, output_dir, processed_date, storage_format=STORAGE_FORMAT_JSON, warehouse=None,
+              stage=STAGE_NORMALIZED):
         """
-        Write normalized facts to storage
+        Write normalized (or period-stage) facts to storage
         
         Args:
-            facts: List of normalized facts
+            facts: List of normalized Facts
             output_dir: Path to output directory
+            storage_format: STORAGE_FORMAT_JSON or STORAGE_FORMAT_COLUMNAR
+            warehouse: Optional FactWarehouse to load the facts into as well
+            stage: Warehouse stage, STAGE_NORMALIZED or STAGE_PERIODS
         """
 
-        output_file = output_dir / f"{self.statement_type.value}.json"
-
         payload = {
             "company": self.company_ticker,
             "statement": self.statement_type.value,
             "processed_date": processed_date,
-            "facts": facts
+            "facts": facts_to_dicts(facts)
         }
 
-        with open(output_file, "w") as f:
-            json.dump(payload, f, indent=2)
+        output_file = write_statement(payload, output_dir, storage_format)
         
         logger.info(f"Written {len(facts)} facts to {output_file}")
 
+        if warehouse is not None:
+            warehouse.load_statement(payload, stage)
+
 
 # =========================
 # ENTRY POINT
@@ -301,8 +559,7 @@ def run(companyfacts_path, company_ticker, statement_type=FactType.INCOME_STATEM
     
     logger.info(f"Loading companyfacts from {companyfacts_file_path}")
     
-    with open(companyfacts_file_path, "r") as f:
-        companyfacts = json.load(f)
+    companyfacts = load_raw(companyfacts_file_path)
 
     # Initialize retriever
     retriever = GenericDirectFactRetriever(company_ticker, statement_type)
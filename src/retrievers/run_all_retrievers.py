@@ -1,10 +1,14 @@
-import json
 from pathlib import Path
 
-# Import the retriever classes and their run method
-from balance_sheet.balance_sheet_retriever import run as run_balance_sheet
-from cash_flow_statement.cash_flow_statement_retriever import run as run_cash_flow_statement
-from income_statement.income_statement_retriever import run as run_income_statement
+from retrievers.extraction_engine import ExtractionEngine
+from storage.generations import build_generation
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 
 # =========================
@@ -16,28 +20,46 @@ class RunAllRetrievers:
         self.balance_sheet_retriever = "balance_sheet"
         self.cash_flow_statement_retriever = "cash_flow_statement"
         self.income_statement_retriever = "income_statement"
+        self.registry_path = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+        self.extraction_engine = ExtractionEngine(self.registry_path)
 
-    def process_financial_statements(self, company_ticker: str):
+    def process_financial_statements(self, company_ticker: str, previous_manifest: dict = None):
         """
         Process financial statements for a given company ticker
+
+        Companyfacts and the registry are parsed once and every
+        statement is extracted in a single pass over the us-gaap tags.
+        Outputs are published as a new generation (storage/generations.py).
         
         Args:
             company_ticker: Company ticker symbol
-            companyfacts_path: Path to the companyfacts JSON file
-            registry_path: Path to the registry JSON file
+            previous_manifest: Manifest of the companyfacts the stored outputs
+                were built from; when given, only concepts with new facts are
+                re-extracted
         """
 
         company_ticker = company_ticker.upper()
         raw_path = f"data/{company_ticker}/raw/company_facts.json"
-        registry_path = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
-        normalized = f"data/{company_ticker}/normalized"
-        derived = f"data/{company_ticker}/derived"
+        company_dir = PROJECT_ROOT / "data" / company_ticker
 
-        # Run balance sheet retriever
-        run_balance_sheet(company_ticker, raw_path, registry_path, normalized)
+        if previous_manifest and previous_manifest.get("accessions") is not None:
+            return build_generation(company_dir, lambda staging: self.extraction_engine.run_incremental(
+                company_ticker, raw_path, staging / "normalized", staging / "derived",
+                previous_manifest["accessions"], previous_manifest.get("latest_filed")
+            ))
 
-        # Run cash flow statement retriever
-        run_cash_flow_statement(company_ticker, raw_path, registry_path, normalized, derived)
+        return build_generation(company_dir, lambda staging: self.extraction_engine.run(
+            company_ticker, raw_path, staging / "normalized", staging / "derived"
+        ))
 
-        # Run income statement retriever
-        run_income_statement(company_ticker, raw_path, registry_path, normalized)
+    def process_derivations(self, company_ticker: str):
+        """
+        Recompute derived facts of a company from its stored normalized facts
+
+        Args:
+            company_ticker: Company ticker symbol
+        """
+        company_ticker = company_ticker.upper()
+        return build_generation(PROJECT_ROOT / "data" / company_ticker, lambda staging: (
+            self.extraction_engine.run_derivations(company_ticker, staging / "normalized", staging / "derived")
+        ))
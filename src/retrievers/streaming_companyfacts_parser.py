@@ -0,0 +1,322 @@
+"""
+Streaming Companyfacts Parser
+--------------------------
+Selective companyfacts loader that only materializes registry tags.
+
+A full json.load builds Python objects for every tag of every
+taxonomy. This parser memory-maps the file, locates each requested
+tag with a byte-level search, and decodes only those tag objects, so
+parse time and peak memory scale with the registry rather than with
+the size of the filer.
+
+The result has the same shape as companyfacts, restricted to the
+requested taxonomy and tags. Compressed documents (storage/raw_store.py)
+cannot be mapped; they are decompressed as a stream and walked tag by
+tag over a window of the chunks (parse_companyfacts_chunks), buffering
+only the requested tag objects, so memory still scales with the
+registry and nothing is written to disk.
+"""
+
+import json
+import logging
+import re
+from storage import serialization
+from storage.raw_store import CODEC_JSON, iter_raw, map_raw, resolve_raw
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# PATTERNS
+# =========================
+
+# What follows a taxonomy key: an object opening on its first tag key
+TAXONOMY_OBJECT_START = re.compile(rb'\s*:\s*\{\s*"[^"\\]+"')
+
+# What follows a tag-level key: its object starts with label/description/units
+TAG_OBJECT_START = re.compile(rb'\s*:\s*\{\s*"(?:label|description|units)"')
+
+# Close of a tag object: last unit list, units object, tag object
+TAG_OBJECT_END = re.compile(rb'\]\s*\}\s*\}')
+
+# Close of a taxonomy object: one more brace after the last tag
+TAXONOMY_OBJECT_END = re.compile(rb'\]\s*\}\s*\}\s*\}')
+
+HEADER_FIELD = re.compile(rb'"(cik|entityName)"\s*:\s*("(?:[^"\\]|\\.)*"|\d+)')
+HEADER_SCAN_BYTES = 4096
+
+# Tail checked for the document's closing brace
+TRAILER_SCAN_BYTES = 64
+
+# Separator and key in front of each tag object of a taxonomy
+NEXT_TAG = re.compile(rb'\s*[{,]\s*"([^"\\]+)"\s*:\s*(?=\{)')
+
+# Bytes buffered past a position before a pattern is matched there, and
+# kept from the end of the window when a search goes on into the next chunk
+STREAM_LOOKAHEAD_BYTES = 256
+
+
+# =========================
+# SELECTIVE LOADER
+# =========================
+
+def taxonomy_span(buffer, taxonomy: str):
+    """
+    Byte range [start, end) covering a taxonomy's object
+
+    Args:
+        buffer: Companyfacts bytes or mmap
+        taxonomy: Taxonomy key (e.g. "us-gaap")
+
+    Returns:
+        Tuple of (start, end) or None if the taxonomy is absent
+    """
+    key = b'"' + taxonomy.encode() + b'"'
+    start = buffer.find(key)
+    while start != -1:
+        # A taxonomy key is followed by an object whose first value is a tag object
+        after_key = start + len(key)
+        m = TAXONOMY_OBJECT_START.match(buffer, after_key)
+        if m and TAG_OBJECT_START.match(buffer, m.end()):
+            end = TAXONOMY_OBJECT_END.search(buffer, m.end())
+            return start, end.end() if end else len(buffer)
+        start = buffer.find(key, after_key)
+    return None
+
+
+def find_tag(buffer, tag: str, start: int, end: int):
+    """
+    Byte range of a tag's object within [start, end), or None
+
+    Args:
+        buffer: Companyfacts bytes or mmap
+        tag: XBRL tag name
+        start: Taxonomy start offset
+        end: Taxonomy end offset
+    """
+    key = b'"' + tag.encode() + b'"'
+    pos = buffer.find(key, start, end)
+    while pos != -1:
+        m = TAG_OBJECT_START.match(buffer, pos + len(key), end)
+        if m:
+            value_start = buffer.find(b"{", pos + len(key), m.end())
+            value_end = TAG_OBJECT_END.search(buffer, m.end(), end)
+            return value_start, value_end.end() if value_end else end
+        pos = buffer.find(key, pos + len(key), end)
+    return None
+
+
+def parse_companyfacts_selective(buffer, tags, taxonomy: str = "us-gaap"):
+    """
+    Decode only the requested tags from companyfacts bytes
+
+    Each tag is located with a plain substring search and only its
+    own object is handed to the JSON decoder; the rest of the document
+    is never tokenized.
+
+    Args:
+        buffer: Companyfacts bytes or mmap
+        tags: Iterable of XBRL tag names to materialize
+        taxonomy: Taxonomy to read tags from
+
+    Returns:
+        Companyfacts-shaped dictionary holding only the requested tags
+
+    Raises:
+        json.JSONDecodeError: If the document is truncated or a selected
+            tag is malformed
+    """
+    # A document cut short would otherwise just look like one without the tags
+    if not buffer[-TRAILER_SCAN_BYTES:].rstrip().endswith(b"}"):
+        raise json.JSONDecodeError("Truncated companyfacts document", "", len(buffer))
+
+    companyfacts = {"facts": {taxonomy: {}}}
+
+    for m in HEADER_FIELD.finditer(buffer[:HEADER_SCAN_BYTES]):
+        companyfacts[m.group(1).decode()] = serialization.loads(m.group(2))
+
+    span = taxonomy_span(buffer, taxonomy)
+    if span is None:
+        return companyfacts
+
+    start, end = span
+    selected = companyfacts["facts"][taxonomy]
+    for tag in set(tags):
+        tag_span = find_tag(buffer, tag, start, end)
+        if tag_span is None:
+            continue
+        value_start, value_end = tag_span
+        selected[tag] = serialization.loads(buffer[value_start:value_end])
+
+    return companyfacts
+
+
+# =========================
+# STREAMING LOADER
+# =========================
+
+class ChunkWindow:
+    """
+    Buffered part of a document read as a sequence of byte chunks
+
+    Patterns are matched against data; discard() drops bytes already
+    consumed, so only a window of the document is held at a time.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.data = bytearray()
+        # Last bytes of the document read so far, for the truncation check
+        self.tail = b""
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Buffer the next chunk; False at the end of the document"""
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            return False
+        self.data += chunk
+        self.tail = (self.tail + chunk[-TRAILER_SCAN_BYTES:])[-TRAILER_SCAN_BYTES:]
+        return True
+
+    def ensure(self, size: int):
+        """Buffer at least size bytes, or up to the end of the document"""
+        while len(self.data) < size and self.fill():
+            pass
+
+    def discard(self, size: int):
+        """Drop the first size buffered bytes"""
+        del self.data[:size]
+
+
+def find_taxonomy_stream(window: ChunkWindow, taxonomy: str):
+    """
+    Advance a window to the opening brace of a taxonomy's object
+
+    Returns:
+        True with the window starting at the brace, or False (at the
+        end of the document) if the taxonomy is absent
+    """
+    key = b'"' + taxonomy.encode() + b'"'
+    pos = 0
+    while True:
+        found = window.data.find(key, pos)
+        if found == -1:
+            if window.eof:
+                return False
+            # Keep what could be the start of a key cut by the chunk boundary
+            window.discard(max(0, len(window.data) - len(key)))
+            pos = 0
+            window.fill()
+            continue
+
+        after_key = found + len(key)
+        window.ensure(after_key + STREAM_LOOKAHEAD_BYTES)
+        m = TAXONOMY_OBJECT_START.match(window.data, after_key)
+        if m and TAG_OBJECT_START.match(window.data, m.end()):
+            window.discard(window.data.find(b"{", after_key))
+            return True
+        pos = after_key
+
+
+def parse_companyfacts_chunks(chunks, tags, taxonomy: str = "us-gaap"):
+    """
+    Decode only the requested tags from companyfacts bytes read in chunks
+
+    Tags are walked in document order: each tag object is buffered
+    until its end if requested, and dropped as it streams past
+    otherwise. The whole document is read, to check it is complete.
+
+    Args:
+        chunks: Iterable of byte chunks of the document, in order
+        tags: Iterable of XBRL tag names to materialize
+        taxonomy: Taxonomy to read tags from
+
+    Returns:
+        Companyfacts-shaped dictionary holding only the requested tags,
+        the same as parse_companyfacts_selective() on the joined chunks
+
+    Raises:
+        json.JSONDecodeError: If the document is truncated or a selected
+            tag is malformed
+    """
+    window = ChunkWindow(chunks)
+    companyfacts = {"facts": {taxonomy: {}}}
+    selected = companyfacts["facts"][taxonomy]
+    wanted = set(tags)
+
+    window.ensure(HEADER_SCAN_BYTES)
+    for m in HEADER_FIELD.finditer(window.data[:HEADER_SCAN_BYTES]):
+        companyfacts[m.group(1).decode()] = serialization.loads(m.group(2))
+
+    if find_taxonomy_stream(window, taxonomy):
+        pos = 0
+        while True:
+            window.ensure(pos + STREAM_LOOKAHEAD_BYTES)
+            m = NEXT_TAG.match(window.data, pos)
+            if m is None:
+                # The taxonomy's closing brace
+                break
+            tag = m.group(1).decode()
+            keep = tag in wanted
+            window.discard(m.end())
+
+            search_from = 0
+            while (end := TAG_OBJECT_END.search(window.data, search_from)) is None:
+                if window.eof:
+                    raise json.JSONDecodeError(f"Truncated companyfacts tag {tag}", "", 0)
+                if not keep:
+                    window.discard(max(0, len(window.data) - STREAM_LOOKAHEAD_BYTES))
+                search_from = max(0, len(window.data) - STREAM_LOOKAHEAD_BYTES)
+                window.fill()
+
+            if keep:
+                selected[tag] = serialization.loads(window.data[:end.end()])
+            pos = end.end()
+
+    # A document cut short would otherwise just look like one without the tags
+    window.discard(len(window.data))
+    while window.fill():
+        window.discard(len(window.data))
+    if not window.tail.rstrip().endswith(b"}"):
+        raise json.JSONDecodeError("Truncated companyfacts document", "", 0)
+
+    return companyfacts
+
+
+def load_companyfacts_selective(companyfacts_path, tags, taxonomy: str = "us-gaap"):
+    """
+    Load only the requested tags from a companyfacts JSON file
+
+    Args:
+        companyfacts_path: Path to companyfacts JSON file (any raw_store codec)
+        tags: Iterable of XBRL tag names to materialize
+        taxonomy: Taxonomy to read tags from
+
+    Returns:
+        Companyfacts-shaped dictionary holding only the requested tags
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        json.JSONDecodeError: If the file is empty or corrupt, or a
+            selected tag is malformed
+    """
+    path, codec = resolve_raw(companyfacts_path)
+    if codec == CODEC_JSON:
+        with map_raw(path) as buffer:
+            companyfacts = parse_companyfacts_selective(buffer, tags, taxonomy)
+    else:
+        companyfacts = parse_companyfacts_chunks(iter_raw(path), tags, taxonomy)
+
+    logger.debug(f"Selectively loaded {len(companyfacts['facts'][taxonomy])} tags from {companyfacts_path}")
+    return companyfacts
@@ -0,0 +1,165 @@
+"""
+Vectorized Direct Fact Retriever
+--------------------------
+NumPy backend for GenericDirectFactRetriever.normalize_concept.
+
+Per tag, the raw SEC facts are loaded into typed arrays (datetime64
+start/end/filed, integer form priority, categorical fp) and:
+- periods are grouped by factorizing (start, end) day numbers
+- the authoritative fact of every group comes from one lexsort plus
+  group-first, instead of a Python sort per group
+- durations and period classification are array operations, instead
+  of two strptime calls per group
+
+Only the surviving winners are turned into Fact records, so the
+output is identical to the pure Python retriever.
+
+Requires numpy; tags whose dates do not parse as ISO dates fall back
+to the Python implementation.
+"""
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from models.fact import Fact
+from retrievers.generic_direct_fact_retriever import FORM_PRIORITY, GenericDirectFactRetriever
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+DISCRETE_QUARTER_MIN_DAYS = 80
+DISCRETE_QUARTER_MAX_DAYS = 100
+
+# Day numbers are shifted into [0, 2^20) so (start, end) packs into one int64;
+# that covers 1313-01-01 to 4183-12-31 with a zero slot left for a missing start
+DAY_OFFSET = 1 << 19
+DAY_BITS = 20
+
+
+def require_numpy():
+    """Raise a clear error when numpy is not installed"""
+    if np is None:
+        raise ImportError("The vectorized extraction backend requires numpy (pip install numpy)")
+
+
+# =========================
+# ARRAY HELPERS
+# =========================
+
+def to_days(values):
+    """ISO date strings (None for missing) → int64 days since epoch, NaT as int64 min"""
+    return np.array(values, dtype="datetime64[D]").astype(np.int64)
+
+
+def factorize_in_order(keys):
+    """
+    Group ids numbered by first appearance
+
+    Args:
+        keys: int64 array
+
+    Returns:
+        int64 array of group ids, same length as keys
+    """
+    _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    # np.unique numbers groups by sorted key; renumber by first appearance
+    rank = np.empty(len(first_index), dtype=np.int64)
+    rank[np.argsort(first_index, kind="stable")] = np.arange(len(first_index))
+    return rank[inverse.reshape(-1)]
+
+
+# =========================
+# VECTORIZED RETRIEVER
+# =========================
+
+class VectorizedDirectFactRetriever(GenericDirectFactRetriever):
+    """
+    GenericDirectFactRetriever whose per-concept normalization runs as
+    array operations
+    """
+
+    def __init__(self, company_ticker, statement_type, registry):
+        require_numpy()
+        super().__init__(company_ticker, statement_type, registry)
+
+    def normalize_concept(self, concept, raw_facts):
+        """
+        Normalize the raw SEC facts of a single registry concept
+
+        Args:
+            concept: Canonical concept name
+            raw_facts: List of raw SEC facts for the concept's tag
+
+        Returns:
+            List of normalized Facts, identical to the Python backend
+        """
+        if not raw_facts:
+            return []
+
+        try:
+            start = to_days([f.get("start") for f in raw_facts])
+            end = to_days([f.get("end") for f in raw_facts])
+            filed = to_days([f["filed"] for f in raw_facts])
+        except (ValueError, TypeError):
+            logger.debug(f"Non-ISO dates under {concept}; using the Python backend")
+            return super().normalize_concept(concept, raw_facts)
+
+        missing_start = start == np.iinfo(np.int64).min
+        missing_end = end == np.iinfo(np.int64).min
+        if missing_end.any():
+            # Never seen in SEC data; keep the Python backend's handling of it
+            return super().normalize_concept(concept, raw_facts)
+
+        # Group by (start, end); a missing start is its own key value
+        packed_start = np.where(missing_start, 0, start + DAY_OFFSET)
+        packed_end = end + DAY_OFFSET
+        group = factorize_in_order((packed_start << DAY_BITS) | packed_end)
+
+        # Authoritative fact per group: latest filed, then form priority,
+        # then earliest position (the Python sort is stable)
+        priority = np.array([FORM_PRIORITY.get(f["form"], 0) for f in raw_facts], dtype=np.int64)
+        position = np.arange(len(raw_facts))
+        order = np.lexsort((position, -priority, -filed, group))
+        sorted_group = group[order]
+        is_first = np.empty(len(order), dtype=bool)
+        is_first[0] = True
+        is_first[1:] = sorted_group[1:] != sorted_group[:-1]
+        winners = order[is_first]  # one per group, in group (first appearance) order
+
+        # Period classification
+        fp = np.array([raw_facts[i]["fp"] for i in winners], dtype=object)
+        duration = end[winners] - start[winners]
+        has_duration = ~missing_start[winners]
+        is_full_year = fp == "FY"
+        is_discrete_quarter = has_duration & (duration >= DISCRETE_QUARTER_MIN_DAYS) \
+            & (duration <= DISCRETE_QUARTER_MAX_DAYS)
+        keep = is_full_year | is_discrete_quarter
+
+        normalized = []
+        statement = self.statement_type.value
+        for index, full_year in zip(winners[keep].tolist(), is_full_year[keep].tolist()):
+            fact = raw_facts[index]
+            period = f"FY-{fact['fy']}" if full_year else f"{fact['fp']}-{fact['fy']}"
+            normalized.append(Fact(
+                self.company_ticker, statement, concept, fact["val"], "USD", period,
+                True, source_form=fact["form"], filed_date=fact["filed"]
+            ))
+
+        return normalized
@@ -0,0 +1,413 @@
+"""
+Scheduler Daemon
+--------------------------
+Long-running scheduler: periodic jobs, a durable job queue and a pool
+of worker threads.
+
+Inputs:
+- Daily schedule of periodic jobs (ticker list refresh, filing poll)
+- On-demand requests (request_ticker), served ahead of scheduled work
+
+Outputs:
+- data/scheduler.db: job queue and periodic schedule state (job_queue.py)
+- Everything the jobs write: company_tickers.json, companyfacts,
+  normalized / derived / period-stage facts
+
+Job types chain into each other: a ticker list refresh queues
+downloads for new listings, a filing poll queues downloads for tickers
+with new filings, and a download that brings a new document queues its
+extraction. Identical pending jobs are merged, failed jobs are retried
+with backoff, and because the queue and schedule live in SQLite a
+restarted daemon resumes where the last one stopped.
+
+A filing stays in the poller's change queue until a download finds it
+in the companyfacts document. The XBRL API lags the filing feed, so a
+download that does not find it yet fails and is retried with backoff,
+and every later poll queues it again (up to MAX_LAGGING_POLLS).
+
+Usage:
+    cd src/scheduler && PYTHONPATH=.. python daemon.py [--workers N] [--db PATH]
+"""
+
+import argparse
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from agents.fundametals.utils import (
+    download_companyfacts_if_modified,
+    load_companyfacts_manifest,
+    write_company_facts
+)
+from job_queue import DEFAULT_QUEUE_PATH, PRIORITY_NORMAL, PRIORITY_ON_DEMAND, JobQueue
+from retrievers.run_all_retrievers import RunAllRetrievers
+from sec_client import get_default_client
+from storage.generations import has_outputs
+from storage.ticker_lock import ticker_lock
+from submissions_poller import LISTING_FORM, SubmissionsPoller, listing_tickers
+from update_tickers import update_tickers
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_ROOT = PROJECT_ROOT / "data"
+
+JOB_REFRESH_TICKERS = "refresh_tickers"
+JOB_POLL_FILINGS = "poll_filings"
+JOB_DOWNLOAD = "download_companyfacts"
+JOB_EXTRACT = "extract"
+JOB_DERIVE = "derive"
+
+# Key of jobs that are not about one ticker
+GLOBAL_KEY = "*"
+
+# Periodic job → daily run time (HH:MM, local time)
+DEFAULT_PERIODIC_JOBS = {
+    JOB_POLL_FILINGS: "06:00",
+    JOB_REFRESH_TICKERS: "09:00"
+}
+
+DEFAULT_WORKERS = 4
+
+# Idle workers and the schedule loop check for work this often
+IDLE_POLL_SECONDS = 1.0
+
+# Finished jobs are kept this long for inspection
+FINISHED_JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+def next_daily_run(at: str, now: datetime) -> datetime:
+    """Next time of day `at` ("HH:MM") strictly after now"""
+    hour, minute = (int(part) for part in at.split(":"))
+    run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return run if run > now else run + timedelta(days=1)
+
+
+# =========================
+# DAEMON
+# =========================
+
+class SchedulerDaemon:
+    """
+    Periodic scheduling plus a worker pool draining the job queue
+    """
+
+    def __init__(self,
+                 queue: JobQueue = None,
+                 workers: int = DEFAULT_WORKERS,
+                 periodic_jobs: dict = None,
+                 client=None,
+                 idle_poll_seconds: float = IDLE_POLL_SECONDS,
+                 poller: SubmissionsPoller = None):
+        """
+        Args:
+            queue: Job queue (default: data/scheduler.db)
+            workers: Number of worker threads
+            periodic_jobs: Job type → daily "HH:MM" (default: DEFAULT_PERIODIC_JOBS)
+            client: SecClient for downloads (default: shared client)
+            idle_poll_seconds: Sleep of an idle worker between queue checks
+            poller: Filing poller and its change queue (default: data/ files,
+                created on first use)
+        """
+        self.queue = queue or JobQueue(DEFAULT_QUEUE_PATH)
+        self.workers = workers
+        self.periodic_jobs = DEFAULT_PERIODIC_JOBS if periodic_jobs is None else periodic_jobs
+        self.client = client or get_default_client()
+        self._poller = poller
+        self.idle_poll_seconds = idle_poll_seconds
+        self.stop_event = threading.Event()
+        self.threads = []
+        self._retrievers = threading.local()
+        self.handlers = {
+            JOB_REFRESH_TICKERS: self.handle_refresh_tickers,
+            JOB_POLL_FILINGS: self.handle_poll_filings,
+            JOB_DOWNLOAD: self.handle_download,
+            JOB_EXTRACT: self.handle_extract,
+            JOB_DERIVE: self.handle_derive
+        }
+
+    # -------------------------
+    # Producers
+    # -------------------------
+
+    def submit(self, job_type: str, key: str = GLOBAL_KEY, payload: dict = None, priority: int = PRIORITY_NORMAL):
+        """Queue a job (merged into an identical pending one); returns the job id"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job_id, created = self.queue.enqueue(job_type, key, payload, priority)
+        if created:
+            logger.debug(f"Queued {job_type} {key} (job {job_id})")
+        return job_id
+
+    def request_ticker(self, ticker: str):
+        """On-demand refresh of a ticker, ahead of all scheduled work; returns the job id"""
+        return self.submit(JOB_DOWNLOAD, ticker.upper(), priority=PRIORITY_ON_DEMAND)
+
+    def enqueue_due_periodic(self, now: datetime = None) -> list:
+        """
+        Queue every periodic job whose run time has passed
+
+        A periodic job seen for the first time is scheduled for its next
+        run time rather than run immediately.
+
+        Returns:
+            List of queued job types
+        """
+        now = now or datetime.now()
+        queued = []
+        for job_type, at in self.periodic_jobs.items():
+            next_run = self.queue.next_run(job_type)
+            if next_run is not None and next_run <= now.timestamp():
+                self.submit(job_type)
+                queued.append(job_type)
+            if next_run is None or next_run <= now.timestamp():
+                self.queue.set_next_run(job_type, next_daily_run(at, now).timestamp())
+        return queued
+
+    # -------------------------
+    # Handlers
+    # -------------------------
+
+    def retrievers(self) -> RunAllRetrievers:
+        """This worker thread's RunAllRetrievers (engine built once per thread)"""
+        retrievers = getattr(self._retrievers, "instance", None)
+        if retrievers is None:
+            retrievers = self._retrievers.instance = RunAllRetrievers()
+        return retrievers
+
+    def handle_refresh_tickers(self, job):
+        """Refresh company_tickers.json and queue downloads for new listings"""
+        def on_delta(delta):
+            for ticker, _ in listing_tickers(delta):
+                self.submit(JOB_DOWNLOAD, ticker, priority=job["priority"])
+
+        if not update_tickers(on_delta=on_delta):
+            raise RuntimeError("Ticker list update failed")
+
+    def poller(self) -> SubmissionsPoller:
+        """Filing poller whose change queue feeds download jobs"""
+        if self._poller is None:
+            self._poller = SubmissionsPoller(client=self.client)
+        return self._poller
+
+    def handle_poll_filings(self, job):
+        """
+        Poll the EDGAR daily index and queue a download for every ticker in the change queue
+
+        Entries stay in the change queue until a download finds their
+        filings (settle_filings); an entry left over from an earlier poll
+        is counted as lagging and queued again.
+        """
+        poller = self.poller()
+        with poller.queue.lock:
+            waiting = set(poller.queue.load().entries)
+        poller.poll_daily_index()
+        with poller.queue.lock:
+            poller.queue.load()
+            for ticker in poller.queue.tickers():
+                if ticker in waiting and not poller.queue.lag(ticker):
+                    continue
+                self.submit(JOB_DOWNLOAD, ticker, {"accessions": sorted(poller.queue.accessions(ticker))},
+                            priority=job["priority"])
+            poller.queue.save()
+
+    def settle_filings(self, ticker: str, accessions):
+        """
+        Complete the change-queue filings the stored companyfacts now contains
+
+        Args:
+            ticker: Downloaded ticker
+            accessions: Filings the download was queued for
+
+        Raises:
+            RuntimeError: If some are not in the document yet (the job is
+                retried with backoff; the change queue keeps them)
+        """
+        if not accessions:
+            return
+        manifest = load_companyfacts_manifest(ticker)
+        present = set(manifest.get("accessions") or []) if manifest else set()
+        # Listing entries only need a stored document
+        found = {a for a in accessions if a in present or (manifest and a.startswith(f"{LISTING_FORM}-"))}
+
+        if found:
+            queue = self.poller().queue
+            with queue.lock:
+                queue.load()
+                queue.complete(ticker, found)
+                queue.save()
+
+        missing = set(accessions) - found
+        if missing:
+            raise RuntimeError(f"Companyfacts of {ticker} does not include {', '.join(sorted(missing))} yet")
+
+    def handle_download(self, job):
+        """
+        Download a ticker's companyfacts if SEC has a newer one, then queue its extraction
+
+        A download queued for new filings (payload "accessions") fails
+        until the document has them.
+        """
+        ticker = job["key"]
+        accessions = job["payload"].get("accessions")
+        company_facts, validators = download_companyfacts_if_modified(ticker, self.client)
+        company_dir = DATA_ROOT / ticker
+        if company_facts is None:
+            # Stored document is current; extract only if it never was
+            if not has_outputs(company_dir):
+                self.submit(JOB_EXTRACT, ticker, priority=job["priority"])
+            self.settle_filings(ticker, accessions)
+            return
+
+        with ticker_lock(company_dir):
+            previous_manifest = load_companyfacts_manifest(ticker)
+            write_company_facts(company_facts, ticker, validators)
+
+        # An extraction already pending keeps the older manifest, which its outputs were built from
+        payload = None
+        if previous_manifest and previous_manifest.get("accessions") is not None:
+            payload = {"accessions": previous_manifest["accessions"],
+                       "latest_filed": previous_manifest.get("latest_filed")}
+        self.submit(JOB_EXTRACT, ticker, payload, priority=job["priority"])
+        self.settle_filings(ticker, accessions)
+
+    def handle_extract(self, job):
+        """Extract (incrementally when the payload has the previous manifest) a ticker's statements"""
+        ticker = job["key"]
+        with ticker_lock(DATA_ROOT / ticker):
+            results = self.retrievers().process_financial_statements(ticker, job["payload"] or None)
+        if results is None:
+            raise RuntimeError(f"No companyfacts to extract for {ticker}")
+
+    def handle_derive(self, job):
+        """Recompute a ticker's derived facts from its stored normalized facts"""
+        ticker = job["key"]
+        with ticker_lock(DATA_ROOT / ticker):
+            self.retrievers().process_derivations(ticker)
+
+    # -------------------------
+    # Workers
+    # -------------------------
+
+    def run_job(self, job) -> bool:
+        """
+        Run one claimed job and record its outcome
+
+        Returns:
+            True if the job succeeded
+        """
+        started = time.perf_counter()
+        try:
+            self.handlers[job["type"]](job)
+        except Exception as e:
+            status = self.queue.fail(job["id"], f"{type(e).__name__}: {e}")
+            logger.error(f"Job {job['id']} {job['type']} {job['key']} failed "
+                         f"(attempt {job['attempts']}/{job['max_attempts']}, now {status}): {e}")
+            return False
+
+        self.queue.complete(job["id"])
+        logger.info(f"Job {job['id']} {job['type']} {job['key']} done in {time.perf_counter() - started:.1f}s")
+        return True
+
+    def run_pending(self, worker: str = "main", max_jobs: int = None) -> int:
+        """
+        Run runnable jobs in the calling thread until none is left
+
+        Args:
+            worker: Name recorded on claimed jobs
+            max_jobs: Stop after this many jobs
+
+        Returns:
+            Number of jobs run
+        """
+        ran = 0
+        while max_jobs is None or ran < max_jobs:
+            job = self.queue.claim(worker)
+            if job is None:
+                break
+            self.run_job(job)
+            ran += 1
+        return ran
+
+    def worker_loop(self, worker: str):
+        """Claim and run jobs until the daemon stops"""
+        while not self.stop_event.is_set():
+            job = self.queue.claim(worker)
+            if job is None:
+                self.stop_event.wait(self.idle_poll_seconds)
+                continue
+            self.run_job(job)
+        self.queue.close()
+
+    def start(self):
+        """Requeue interrupted jobs and start the worker threads"""
+        self.queue.recover()
+        self.stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self.worker_loop, args=(f"worker-{i}",),
+                                      name=f"scheduler-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Scheduler daemon started with {self.workers} workers")
+
+    def stop(self, timeout: float = None):
+        """Stop the workers after their current job"""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        logger.info(f"Scheduler daemon stopped; queue: {self.queue.counts()}")
+
+    def run_forever(self):
+        """Start the workers and queue periodic jobs until SIGINT / SIGTERM"""
+        def handle_signal(signum, frame):
+            logger.info(f"Received signal {signum}, stopping")
+            self.stop_event.set()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        signal.signal(signal.SIGTERM, handle_signal)
+
+        self.start()
+        last_purge = 0.0
+        while not self.stop_event.is_set():
+            self.enqueue_due_periodic()
+            if time.time() - last_purge > FINISHED_JOB_RETENTION_SECONDS / 7:
+                self.queue.purge(FINISHED_JOB_RETENTION_SECONDS)
+                last_purge = time.time()
+            self.stop_event.wait(self.idle_poll_seconds)
+        self.stop()
+
+
+# =========================
+# ENTRY POINT
+# =========================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the scheduler daemon")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of worker threads")
+    parser.add_argument("--db", default=str(DEFAULT_QUEUE_PATH), help="Job queue database")
+    parser.add_argument("--request", nargs="*", default=[], metavar="TICKER",
+                        help="Queue on-demand refreshes for these tickers before starting")
+    args = parser.parse_args()
+
+    daemon = SchedulerDaemon(JobQueue(args.db), workers=args.workers)
+    for ticker in args.request:
+        daemon.request_ticker(ticker)
+    daemon.run_forever()
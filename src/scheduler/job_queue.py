@@ -0,0 +1,341 @@
+"""
+Job Queue
+--------------------------
+Durable SQLite queue of scheduler jobs, shared by every worker thread
+and process of the scheduler daemon.
+
+Inputs:
+- Jobs enqueued by the daemon's periodic schedule, by other jobs
+  (ticker list → downloads → extraction) and by on-demand requests
+
+Outputs:
+- jobs table in data/scheduler.db: one row per job, with its status,
+  attempts, next run time and last error
+- schedules table: next run time of every periodic job
+
+Jobs are identified by (type, key), e.g. ("extract", "AAPL"); at most
+one job per (type, key) is pending, and enqueueing a duplicate only
+raises the pending job's priority. Claims run in an IMMEDIATE
+transaction, so two workers never claim the same job. Failed jobs are
+retried with exponential backoff. Jobs left running by a crash are
+returned to the queue when the daemon starts again.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_QUEUE_PATH = PROJECT_ROOT / "data" / "scheduler.db"
+
+BUSY_TIMEOUT_SECONDS = 30
+
+# Lower runs first; on-demand agent requests jump ahead of scheduled work
+PRIORITY_ON_DEMAND = 0
+PRIORITY_NORMAL = 10
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# A retried job whose (type, key) was enqueued again while it ran
+STATUS_SUPERSEDED = "superseded"
+
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_SUPERSEDED)
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    type         TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    payload      TEXT,
+    priority     INTEGER NOT NULL,
+    status       TEXT NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after    REAL NOT NULL,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL,
+    worker       TEXT,
+    last_error   TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_pending_type_key
+    ON jobs (type, key) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_jobs_status_priority_run_after
+    ON jobs (status, priority, run_after, id);
+CREATE TABLE IF NOT EXISTS schedules (
+    name     TEXT PRIMARY KEY,
+    next_run REAL NOT NULL
+);
+"""
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retrying a job that has failed `attempts` times"""
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def row_to_job(row: sqlite3.Row) -> dict:
+    """Job dictionary from a jobs row, with the payload decoded"""
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"]) if job["payload"] else {}
+    return job
+
+
+# =========================
+# JOB QUEUE
+# =========================
+
+class JobQueue:
+    """
+    SQLite-backed job queue with priorities, dedup and retry backoff
+    """
+
+    def __init__(self, db_path=DEFAULT_QUEUE_PATH):
+        """
+        Open (and create if needed) the queue database
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; sqlite3 connections are not shareable
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use (autocommit; transactions are explicit)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, or ROLLBACK on error, on this thread's connection"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # -------------------------
+    # Producers
+    # -------------------------
+
+    def enqueue(self, job_type: str, key: str, payload: dict = None, priority: int = PRIORITY_NORMAL,
+                delay: float = 0, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> tuple[int, bool]:
+        """
+        Queue a job unless an identical one is already pending
+
+        A duplicate keeps the pending job's payload and takes the higher
+        priority and earlier run time of the two.
+
+        Args:
+            job_type: Job type (handler name)
+            key: Job identity within its type, e.g. a ticker
+            payload: JSON-serializable job arguments
+            priority: PRIORITY_ON_DEMAND, PRIORITY_NORMAL or any int (lower runs first)
+            delay: Seconds before the job may run
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            Tuple of (job id, True if a new job was created)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO jobs (type, key, payload, priority, status, max_attempts, run_after, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_type, key, json.dumps(payload) if payload else None, priority, STATUS_PENDING,
+                     max_attempts, now + delay, now, now)
+                )
+                return cursor.lastrowid, True
+            except sqlite3.IntegrityError:
+                conn.execute(
+                    "UPDATE jobs SET priority = MIN(priority, ?), run_after = MIN(run_after, ?), updated_at = ? "
+                    "WHERE type = ? AND key = ? AND status = ?",
+                    (priority, now + delay, now, job_type, key, STATUS_PENDING)
+                )
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE type = ? AND key = ? AND status = ?",
+                    (job_type, key, STATUS_PENDING)
+                ).fetchone()
+                return row["id"], False
+
+    # -------------------------
+    # Workers
+    # -------------------------
+
+    def claim(self, worker: str, job_types=None) -> dict | None:
+        """
+        Take the next runnable job: highest priority, then earliest run time
+
+        Args:
+            worker: Name recorded on the claimed job
+            job_types: Only claim these job types (default: any)
+
+        Returns:
+            Job dictionary, or None if nothing is runnable
+        """
+        now = time.time()
+        query = "SELECT * FROM jobs WHERE status = ? AND run_after <= ?"
+        params = [STATUS_PENDING, now]
+        if job_types:
+            query += f" AND type IN ({', '.join('?' * len(job_types))})"
+            params.extend(job_types)
+        query += " ORDER BY priority, run_after, id LIMIT 1"
+
+        with self._transaction() as conn:
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, worker = ?, updated_at = ? WHERE id = ?",
+                (STATUS_RUNNING, worker, now, row["id"])
+            )
+        job = row_to_job(row)
+        job["status"] = STATUS_RUNNING
+        job["attempts"] += 1
+        job["worker"] = worker
+        return job
+
+    def complete(self, job_id: int):
+        """Mark a claimed job done"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                         (STATUS_DONE, time.time(), job_id))
+
+    def fail(self, job_id: int, error: str) -> str:
+        """
+        Record a failed attempt of a claimed job
+
+        The job is retried after backoff_seconds(attempts) until it has
+        used max_attempts; if an identical job was queued meanwhile, that
+        one runs instead.
+
+        Returns:
+            New status of the job
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                status, run_after = STATUS_FAILED, row["run_after"]
+            else:
+                status, run_after = STATUS_PENDING, now + backoff_seconds(row["attempts"])
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                    (status, run_after, error, now, job_id)
+                )
+            except sqlite3.IntegrityError:
+                status = STATUS_SUPERSEDED
+                conn.execute("UPDATE jobs SET status = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                             (status, error, now, job_id))
+        return status
+
+    def recover(self) -> int:
+        """
+        Return jobs left running by a stopped or crashed daemon to the queue
+
+        Only call this while no worker of any process is running.
+
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        requeued = 0
+        with self._transaction() as conn:
+            for row in conn.execute("SELECT id FROM jobs WHERE status = ?", (STATUS_RUNNING,)).fetchall():
+                try:
+                    conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                                 (STATUS_PENDING, now, row["id"]))
+                    requeued += 1
+                except sqlite3.IntegrityError:
+                    conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                                 (STATUS_SUPERSEDED, now, row["id"]))
+        if requeued:
+            logger.info(f"Requeued {requeued} jobs interrupted by the last shutdown")
+        return requeued
+
+    # -------------------------
+    # Inspection and housekeeping
+    # -------------------------
+
+    def get(self, job_id: int) -> dict | None:
+        """A job by id"""
+        row = self.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row_to_job(row) if row is not None else None
+
+    def counts(self) -> dict:
+        """Number of jobs per status"""
+        rows = self.connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Delete finished jobs last updated more than older_than_seconds ago"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATUSES))}) AND updated_at < ?",
+                (*FINISHED_STATUSES, time.time() - older_than_seconds)
+            )
+        return cursor.rowcount
+
+    # -------------------------
+    # Periodic schedule state
+    # -------------------------
+
+    def next_run(self, name: str) -> float | None:
+        """Stored next run time (epoch seconds) of a periodic job"""
+        row = self.connection().execute("SELECT next_run FROM schedules WHERE name = ?", (name,)).fetchone()
+        return row["next_run"] if row is not None else None
+
+    def set_next_run(self, name: str, next_run: float):
+        """Store the next run time of a periodic job"""
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO schedules (name, next_run) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET next_run = excluded.next_run", (name, next_run))
+
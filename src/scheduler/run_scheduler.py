@@ -1,11 +1,11 @@
 """
-Scheduler for automatic SEC tickers update
+Scheduler for automatic SEC tickers update and filing change detection
 """
 
-import schedule
-import time
 import logging
+from daemon import DEFAULT_WORKERS, JOB_POLL_FILINGS, JOB_REFRESH_TICKERS, SchedulerDaemon
 from update_tickers import update_tickers
+from submissions_poller import SubmissionsPoller
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,26 +16,42 @@ logger = logging.getLogger(__name__)
 def job():
     """Job to run for scheduled updates"""
     logger.info("Running scheduled update...")
-    success = update_tickers()
+    success = update_tickers(on_delta=lambda delta: SubmissionsPoller().enqueue_listings(delta))
     if success:
         logger.info("✓ Scheduled update completed")
     else:
         logger.error("✗ Scheduled update failed")
 
-def start_scheduler(hour: int = 9, minute: int = 0):
+def poll_job():
+    """Job to queue tickers with new filings and rebuild only those"""
+    logger.info("Polling SEC filing index...")
+    try:
+        poller = SubmissionsPoller()
+        poller.poll_daily_index()
+        report = poller.process_queue()
+        logger.info(f"✓ Filing poll completed: {len(report['refreshed'])} tickers rebuilt")
+    except Exception as e:
+        logger.error(f"✗ Filing poll failed: {e}")
+
+def start_scheduler(hour: int = 9, minute: int = 0, poll_hour: int = 6, poll_minute: int = 0,
+                    workers: int = DEFAULT_WORKERS):
     """
-    Start the scheduler
+    Start the scheduler daemon
     
     Args:
         hour: Hour to run update (24-hour format)
         minute: Minute to run update
+        poll_hour: Hour to poll the filing index (after SEC publishes it overnight)
+        poll_minute: Minute to poll the filing index
+        workers: Number of worker threads draining the job queue
     """
-    schedule.every().day.at(f"{hour:02d}:{minute:02d}").do(job)
-    logger.info(f"Scheduler started. Update scheduled for {hour:02d}:{minute:02d} daily")
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    daemon = SchedulerDaemon(workers=workers, periodic_jobs={
+        JOB_POLL_FILINGS: f"{poll_hour:02d}:{poll_minute:02d}",
+        JOB_REFRESH_TICKERS: f"{hour:02d}:{minute:02d}"
+    })
+    logger.info(f"Scheduler started. Update scheduled for {hour:02d}:{minute:02d} daily, "
+                f"filing poll for {poll_hour:02d}:{poll_minute:02d} daily")
+    daemon.run_forever()
 
 if __name__ == "__main__":
     # Run daily at 9:00 AM
@@ -0,0 +1,566 @@
+"""
+SEC Submissions Poller
+--------------------------
+Change detection for periodic filings, so tickers are rebuilt only
+after they file something new.
+
+Inputs:
+- EDGAR daily form index (one small file per business day, listing
+  every filing of that day), for the whole universe
+- Per-CIK submissions documents, for an optional watch list
+- data/company_tickers.json for CIK → ticker mapping
+- Ticker-list deltas from update_tickers (new listings, renames)
+
+Outputs:
+- data/submissions_state.json: last polled day and seen accessions
+- data/change_queue.json: tickers with new 10-K / 10-Q / amendment filings
+
+Work per night scales with the number of filings, not with the number
+of tickers tracked. Downloads and retriever runs happen only for
+tickers in the queue.
+"""
+
+import logging
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import requests
+from filelock import FileLock
+
+from agents.fundametals.utils import (
+    download_companyfacts_if_modified,
+    load_companyfacts_manifest,
+    write_company_facts
+)
+from retrievers.bulk_ingest import load_cik_ticker_map
+from retrievers.run_all_retrievers import RunAllRetrievers
+from sec_client import get_default_client
+from storage import serialization
+from storage.ticker_lock import ticker_lock
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_ROOT = PROJECT_ROOT / "data"
+STATE_PATH = DATA_ROOT / "submissions_state.json"
+QUEUE_PATH = DATA_ROOT / "change_queue.json"
+
+TRACKED_FORMS = frozenset({"10-K", "10-Q", "10-K/A", "10-Q/A"})
+
+# Pseudo form of queue entries for tickers new to the ticker list
+LISTING_FORM = "LISTING"
+
+# First poll without state starts this many days back
+DEFAULT_LOOKBACK_DAYS = 1
+
+# Accessions remembered per watched CIK
+SEEN_ACCESSIONS_PER_CIK = 100
+
+# A queued ticker is dropped after this many failed refreshes
+MAX_REFRESH_ATTEMPTS = 5
+
+# ...or after this many polls on which SEC still served the stored
+# companyfacts (the XBRL API lags the filing feed, usually by hours)
+MAX_LAGGING_POLLS = 30
+
+INDEX_HEADER_END = re.compile(r"^-{20,}\s*$", re.MULTILINE)
+INDEX_COLUMN_GAP = re.compile(r"\s{2,}")
+
+
+# =========================
+# FEED PARSING
+# =========================
+
+def accession_from_filename(filename: str) -> str:
+    """Accession number from an index path like edgar/data/320193/0000320193-24-000123.txt"""
+    return Path(filename).stem
+
+
+def parse_form_index(text: str):
+    """
+    Parse an EDGAR form.YYYYMMDD.idx daily index
+
+    Args:
+        text: Index file contents
+
+    Returns:
+        List of {"form", "company", "cik", "filed", "accession"}
+    """
+    header_end = INDEX_HEADER_END.search(text)
+    body = text[header_end.end():] if header_end else text
+
+    filings = []
+    for line in body.splitlines():
+        # Company names contain spaces; the last three columns never do
+        parts = line.strip().rsplit(None, 3)
+        if len(parts) != 4 or not parts[1].isdigit():
+            continue
+        left, cik, filed, filename = parts
+        form_and_company = INDEX_COLUMN_GAP.split(left, maxsplit=1)
+        filings.append({
+            "form": form_and_company[0],
+            "company": form_and_company[1] if len(form_and_company) > 1 else "",
+            "cik": int(cik),
+            "filed": f"{filed[:4]}-{filed[4:6]}-{filed[6:8]}" if len(filed) == 8 else filed,
+            "accession": accession_from_filename(filename)
+        })
+    return filings
+
+
+def parse_recent_submissions(submissions: dict):
+    """
+    Flatten the `filings.recent` columns of a submissions document
+
+    Returns:
+        List of {"form", "cik", "filed", "accession"}, newest first
+    """
+    recent = submissions.get("filings", {}).get("recent", {})
+    cik = int(submissions.get("cik", 0))
+    return [
+        {"form": form, "cik": cik, "filed": filed, "accession": accession}
+        for accession, filed, form in zip(
+            recent.get("accessionNumber", []),
+            recent.get("filingDate", []),
+            recent.get("form", [])
+        )
+    ]
+
+
+def listing_tickers(delta: dict):
+    """
+    Tickers of a ticker-list delta whose data has to be ingested
+
+    Newly listed CIKs, renamed tickers (data directories are keyed by
+    ticker) and tickers now pointing at another CIK.
+
+    Args:
+        delta: Ticker-list delta from update_tickers.compute_delta()
+
+    Returns:
+        List of (ticker, cik)
+    """
+    new_ciks = set(delta.get("new_ciks", []))
+    listings = [(added["ticker"], added["cik"]) for added in delta.get("added", []) if added["cik"] in new_ciks]
+    listings += [(rename["new"], rename["cik"]) for rename in delta.get("renamed", [])]
+    listings += [(change["ticker"], change["new_cik"]) for change in delta.get("cik_changed", [])]
+    return listings
+
+
+# =========================
+# CHANGE QUEUE
+# =========================
+
+class ChangeQueue:
+    """
+    Persistent queue of tickers with unprocessed filings
+
+    One entry per ticker; later filings for a queued ticker are merged
+    into its entry, so a burst of amendments triggers a single rebuild.
+    """
+
+    def __init__(self, queue_path: Path = QUEUE_PATH):
+        self.queue_path = Path(queue_path)
+        self.lock = FileLock(str(self.queue_path) + ".lock")
+        self.entries = {}
+
+    def load(self):
+        """Read the queue from disk (an unreadable queue starts empty)"""
+        try:
+            self.entries = serialization.load_file(self.queue_path)
+        except FileNotFoundError:
+            self.entries = {}
+        except ValueError as e:
+            logger.error(f"Discarding unreadable change queue {self.queue_path}: {e}")
+            self.entries = {}
+        return self
+
+    def save(self):
+        """Write the queue to disk"""
+        self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+        serialization.dump_file(self.entries, self.queue_path, pretty=True)
+
+    def add(self, ticker: str, filing: dict) -> bool:
+        """
+        Queue a filing for a ticker
+
+        Returns:
+            True if the filing was not already queued
+        """
+        entry = self.entries.setdefault(ticker, {"cik": filing["cik"], "filings": [], "attempts": 0,
+                                                "lagging_polls": 0})
+        if any(f["accession"] == filing["accession"] for f in entry["filings"]):
+            return False
+        entry["filings"].append({key: filing[key] for key in ("accession", "form", "filed")})
+        return True
+
+    def tickers(self):
+        """Queued tickers, oldest filing first"""
+        return sorted(self.entries, key=lambda t: min(f["filed"] for f in self.entries[t]["filings"]))
+
+    def accessions(self, ticker: str):
+        """Accessions currently queued for a ticker"""
+        entry = self.entries.get(ticker)
+        return {f["accession"] for f in entry["filings"]} if entry else set()
+
+    def complete(self, ticker: str, accessions=None):
+        """
+        Remove processed filings of a ticker
+
+        Args:
+            ticker: Processed ticker
+            accessions: Filings the refresh covered (default: all); filings
+                queued after them stay, with a fresh attempt budget
+
+        Returns:
+            True if the ticker left the queue
+        """
+        entry = self.entries.get(ticker)
+        if entry is None:
+            return True
+        if accessions is not None:
+            entry["filings"] = [f for f in entry["filings"] if f["accession"] not in accessions]
+        if accessions is None or not entry["filings"]:
+            self.entries.pop(ticker)
+            return True
+        entry["attempts"] = 0
+        entry["lagging_polls"] = 0
+        return False
+
+    def fail(self, ticker: str) -> bool:
+        """
+        Record a failed refresh
+
+        Returns:
+            True if the ticker stays queued, False if it was dropped
+        """
+        entry = self.entries.get(ticker)
+        if entry is None:
+            return False
+        entry["attempts"] += 1
+        if entry["attempts"] >= MAX_REFRESH_ATTEMPTS:
+            logger.error(f"Dropping {ticker} from change queue after {entry['attempts']} failed refreshes")
+            self.entries.pop(ticker)
+            return False
+        return True
+
+    def lag(self, ticker: str) -> bool:
+        """
+        Record a refresh that found SEC still serving the stored companyfacts
+
+        Lag is expected after every filing, so it is not counted against
+        MAX_REFRESH_ATTEMPTS but against the longer MAX_LAGGING_POLLS.
+
+        Returns:
+            True if the ticker stays queued, False if it was dropped
+        """
+        entry = self.entries.get(ticker)
+        if entry is None:
+            return False
+        entry["lagging_polls"] = entry.get("lagging_polls", 0) + 1
+        if entry["lagging_polls"] >= MAX_LAGGING_POLLS:
+            logger.error(f"Dropping {ticker} from change queue: companyfacts unchanged "
+                         f"after {entry['lagging_polls']} polls")
+            self.entries.pop(ticker)
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# =========================
+# REFRESH
+# =========================
+
+def refresh_ticker(ticker: str, client=None) -> bool:
+    """
+    Download a ticker's companyfacts and rerun the retrievers
+
+    Returns:
+        True if the ticker was rebuilt; False if SEC still serves the
+        stored companyfacts (the XBRL API lags the filing feed)
+    """
+    company_facts, validators = download_companyfacts_if_modified(ticker, client)
+    if company_facts is None:
+        return False
+
+    with ticker_lock(DATA_ROOT / ticker):
+        previous_manifest = load_companyfacts_manifest(ticker)
+        write_company_facts(company_facts, ticker, validators)
+        RunAllRetrievers().process_financial_statements(ticker, previous_manifest)
+    return True
+
+
+# =========================
+# POLLER
+# =========================
+
+class SubmissionsPoller:
+    """
+    Polls SEC filing feeds and queues tickers with new periodic filings
+    """
+
+    def __init__(self,
+                 client=None,
+                 state_path: Path = STATE_PATH,
+                 queue_path: Path = QUEUE_PATH,
+                 cik_ticker_map: dict = None,
+                 tracked_forms=TRACKED_FORMS):
+        """
+        Args:
+            client: SecClient (default: shared client); point its base URLs
+                at a local fixture server to run without SEC
+            state_path: Poll state file
+            queue_path: Change queue file
+            cik_ticker_map: int CIK → ticker (default: data/company_tickers.json)
+            tracked_forms: Form types that trigger a rebuild
+        """
+        self.client = client or get_default_client()
+        self.state_path = Path(state_path)
+        self.queue = ChangeQueue(queue_path)
+        self.cik_ticker_map = cik_ticker_map if cik_ticker_map is not None else load_cik_ticker_map()
+        self.tracked_forms = frozenset(tracked_forms)
+
+    # -------------------------
+    # State
+    # -------------------------
+
+    def load_state(self):
+        try:
+            return serialization.load_file(self.state_path)
+        except (FileNotFoundError, ValueError):
+            return {"last_polled_day": None, "seen_accessions": {}}
+
+    def save_state(self, state):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        serialization.dump_file(state, self.state_path, pretty=True)
+
+    def enqueue(self, filings) -> int:
+        """Queue tracked filings of mapped CIKs; returns how many were new"""
+        added = 0
+        for filing in filings:
+            if filing["form"] not in self.tracked_forms:
+                continue
+            ticker = self.cik_ticker_map.get(filing["cik"])
+            if ticker and self.queue.add(ticker, filing):
+                added += 1
+        return added
+
+    def enqueue_listings(self, delta: dict, today: date = None) -> int:
+        """
+        Queue tickers a ticker-list update made new, so they get ingested
+
+        Each ticker of listing_tickers(delta) is queued as a LISTING
+        entry; the refresh downloads its companyfacts like any other
+        change.
+
+        Args:
+            delta: Ticker-list delta from update_tickers.compute_delta()
+            today: Date recorded on the queued entries (default: today)
+
+        Returns:
+            Number of newly queued tickers
+        """
+        filed = (today or date.today()).isoformat()
+
+        added = 0
+        with self.queue.lock:
+            self.queue.load()
+            for ticker, cik in listing_tickers(delta):
+                self.cik_ticker_map[cik] = ticker
+                filing = {"cik": cik, "accession": f"{LISTING_FORM}-{cik}-{ticker}", "form": LISTING_FORM,
+                          "filed": filed}
+                if self.queue.add(ticker, filing):
+                    added += 1
+            self.queue.save()
+
+        logger.info(f"Queued {added} newly listed, renamed or re-assigned tickers for ingest")
+        return added
+
+    # -------------------------
+    # Feeds
+    # -------------------------
+
+    def fetch_daily_index(self, day: date):
+        """
+        Filings listed in one day's form index
+
+        Returns:
+            List of filings, or None if the index is not published
+            (weekends, holidays, or a day still in progress)
+
+        Raises:
+            requests.exceptions.RequestException: On any other failure,
+                including 403, which SEC returns for rate limiting and
+                rejected User-Agents rather than for missing files
+        """
+        try:
+            response = self.client.get(self.client.daily_form_index_url(day))
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        return parse_form_index(response.content.decode("latin-1"))
+
+    def poll_daily_index(self, today: date = None) -> int:
+        """
+        Queue filings from every daily index since the last poll
+
+        A missing index for a past day (weekend, holiday) is skipped;
+        a missing index for today is retried on the next poll. A failed
+        download stops the poll at that day, so the next poll retries
+        it; filings from the days before it are still queued.
+
+        Returns:
+            Number of newly queued filings
+        """
+        today = today or date.today()
+        state = self.load_state()
+        last_polled = state.get("last_polled_day")
+        day = (datetime.strptime(last_polled, "%Y-%m-%d").date() + timedelta(days=1)
+               if last_polled else today - timedelta(days=DEFAULT_LOOKBACK_DAYS))
+
+        added = 0
+        with self.queue.lock:
+            self.queue.load()
+            while day <= today:
+                try:
+                    filings = self.fetch_daily_index(day)
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"Daily index poll stopped at {day}: {e}")
+                    break
+                if filings is None and day == today:
+                    break
+                if filings:
+                    added += self.enqueue(filings)
+                    logger.info(f"{day}: {len(filings)} filings in daily index")
+                state["last_polled_day"] = day.isoformat()
+                day += timedelta(days=1)
+            self.queue.save()
+
+        self.save_state(state)
+        logger.info(f"Daily index poll queued {added} filings ({len(self.queue)} tickers pending)")
+        return added
+
+    def poll_submissions(self, tickers) -> int:
+        """
+        Queue new filings for a watch list from per-CIK submissions
+
+        The first poll of a CIK only records its history.
+
+        Args:
+            tickers: Tickers to check
+
+        Returns:
+            Number of newly queued filings
+        """
+        ticker_cik_map = {ticker: cik for cik, ticker in self.cik_ticker_map.items()}
+        state = self.load_state()
+        seen_by_cik = state.setdefault("seen_accessions", {})
+
+        added = 0
+        with self.queue.lock:
+            self.queue.load()
+            for ticker in tickers:
+                cik = ticker_cik_map.get(ticker.upper())
+                if cik is None:
+                    logger.warning(f"No CIK for watched ticker {ticker}")
+                    continue
+                try:
+                    filings = parse_recent_submissions(self.client.get_json(self.client.submissions_url(cik)))
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    logger.error(f"Submissions poll failed for {ticker}: {e}")
+                    continue
+
+                tracked = [f for f in filings if f["form"] in self.tracked_forms]
+                key = str(cik)
+                if key in seen_by_cik:
+                    seen = set(seen_by_cik[key])
+                    added += self.enqueue(f for f in tracked if f["accession"] not in seen)
+                seen_by_cik[key] = [f["accession"] for f in tracked[:SEEN_ACCESSIONS_PER_CIK]]
+            self.queue.save()
+
+        self.save_state(state)
+        return added
+
+    # -------------------------
+    # Processing
+    # -------------------------
+
+    def process_queue(self, max_tickers: int = None, refresh=None):
+        """
+        Rebuild queued tickers
+
+        Args:
+            max_tickers: Cap on tickers processed in this run
+            refresh: Callable(ticker) -> bool (default: refresh_ticker)
+
+        Returns:
+            Dictionary with lists of "refreshed", "pending" and "dropped"
+            tickers; a refreshed ticker is also pending if filings were
+            queued for it while it was being refreshed
+        """
+        refresh = refresh or (lambda ticker: refresh_ticker(ticker, self.client))
+        report = {"refreshed": [], "pending": [], "dropped": []}
+
+        with self.queue.lock:
+            self.queue.load()
+            tickers = self.queue.tickers()[:max_tickers]
+
+        for ticker in tickers:
+            # Only filings queued before the download can be in the document it fetches
+            with self.queue.lock:
+                self.queue.load()
+                accessions = self.queue.accessions(ticker)
+            if not accessions:
+                continue
+
+            failed = False
+            try:
+                refreshed = refresh(ticker)
+            except Exception as e:
+                logger.error(f"Refresh failed for {ticker}: {type(e).__name__}: {e}")
+                refreshed = False
+                failed = True
+
+            # Re-read so filings queued by a concurrent poll are kept
+            with self.queue.lock:
+                self.queue.load()
+                if refreshed:
+                    report["refreshed"].append(ticker)
+                    if not self.queue.complete(ticker, accessions):
+                        report["pending"].append(ticker)
+                elif (self.queue.fail(ticker) if failed else self.queue.lag(ticker)):
+                    report["pending"].append(ticker)
+                else:
+                    report["dropped"].append(ticker)
+                self.queue.save()
+
+        logger.info(f"Change queue: {len(report['refreshed'])} refreshed, "
+                    f"{len(report['pending'])} pending, {len(report['dropped'])} dropped")
+        return report
+
+
+# =========================
+# USAGE
+# =========================
+
+if __name__ == "__main__":
+    poller = SubmissionsPoller()
+    poller.poll_daily_index()
+    poller.process_queue()
@@ -1,12 +1,26 @@
 """
 SEC Company Tickers Update Script
 Downloads and updates company_tickers.json from SEC
+
+Each run diffs the download against the current ticker index and
+appends the delta (added / removed / renamed tickers, CIK changes, new
+CIKs) as one line of data/ticker_changes.jsonl. Full copies of the list
+are kept only as periodic snapshots in data/backups/, pruned to the
+most recent few. The delta is handed to an optional callback so it can
+drive downstream work, e.g. queueing newly listed companies for ingest.
+
+The delta is logged and handed over before the new list is saved: if the
+callback or the save fails, the next run diffs against the same list and
+reports the same delta again, so callbacks must tolerate a repeat.
 """
 
 import json
 import requests
 from pathlib import Path
-from datetime import datetime
+from sec_client import get_default_client
+from storage import serialization
+from storage.ticker_index import TickerIndex, refresh_ticker_index
+from datetime import datetime, timedelta
 import logging
 
 # Configure logging
@@ -21,47 +35,193 @@ SEC_URL = "https://www.sec.gov/files/company_tickers.json"
 SEC_HEADER = {
     "User-Agent": "Pawan Sidhani (pawan.sidhani1963@gmail.com)"
 }
-DATA_DIR = Path(__file__).parent.parent
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
 OUTPUT_FILE = DATA_DIR / "company_tickers.json"
 BACKUP_DIR = DATA_DIR / "backups"
+CHANGE_LOG_FILE = DATA_DIR / "ticker_changes.jsonl"
+
+SNAPSHOT_PREFIX = "company_tickers_"
+SNAPSHOT_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+SNAPSHOT_INTERVAL = timedelta(days=7)
+SNAPSHOTS_KEPT = 4
+
+DELTA_KEYS = ("added", "removed", "renamed", "cik_changed", "new_ciks")
+
+def list_snapshots(backup_dir: Path = BACKUP_DIR):
+    """Full snapshots of the ticker list, oldest first"""
+    if not backup_dir.exists():
+        return []
+    return sorted(backup_dir.glob(f"{SNAPSHOT_PREFIX}*.json"))
+
+def snapshot_time(snapshot: Path):
+    """Time a snapshot was taken, from its file name (None if unparseable)"""
+    try:
+        return datetime.strptime(snapshot.stem[len(SNAPSHOT_PREFIX):], SNAPSHOT_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
 
-def ensure_backup_dir():
-    """Create backup directory if it doesn't exist"""
-    BACKUP_DIR.mkdir(exist_ok=True)
+def take_snapshot(data: dict, backup_dir: Path = BACKUP_DIR, now: datetime = None,
+                  interval: timedelta = SNAPSHOT_INTERVAL, keep: int = SNAPSHOTS_KEPT):
+    """
+    Write a full snapshot of the ticker list if the latest one is older than interval,
+    then prune all but the most recent `keep` snapshots
+
+    Args:
+        data: Ticker list to snapshot
+        backup_dir: Snapshot directory
+        now: Current time (default: datetime.now())
+        interval: Minimum age of the latest snapshot before a new one is taken
+        keep: Number of snapshots to keep
+
+    Returns:
+        Path of the new snapshot, or None if none was due
+    """
+    now = now or datetime.now()
+    snapshots = list_snapshots(backup_dir)
+    taken = [t for t in (snapshot_time(snapshot) for snapshot in snapshots) if t is not None]
+    if taken and now - max(taken) < interval:
+        return None
 
-def create_backup(file_path: Path):
-    """Create a timestamped backup of existing file"""
-    if file_path.exists():
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = BACKUP_DIR / f"company_tickers_{timestamp}.json"
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    snapshot = backup_dir / f"{SNAPSHOT_PREFIX}{now.strftime(SNAPSHOT_TIMESTAMP_FORMAT)}.json"
+    try:
+        serialization.dump_file(data, snapshot)
+    except Exception as e:
+        logger.error(f"Failed to create snapshot: {e}")
+        return None
+    logger.info(f"Snapshot created: {snapshot}")
+
+    for old in list_snapshots(backup_dir)[:-keep]:
+        old.unlink()
+        logger.info(f"Pruned snapshot: {old}")
+    return snapshot
+
+def compute_delta(old_index: TickerIndex, new_index: TickerIndex) -> dict:
+    """
+    Changes between two ticker lists
+
+    A CIK whose primary ticker was replaced by a ticker it did not list
+    before is a rename, not an added plus a removed ticker. Share
+    classes of a CIK are tickers of their own: a new class is added, a
+    dropped one removed, and reordering them renames nothing.
+
+    Args:
+        old_index: Index of the current list
+        new_index: Index of the downloaded list
+
+    Returns:
+        Dictionary with:
+        - "added": [{"ticker", "cik"}] tickers that were not listed
+        - "removed": [{"ticker", "cik"}] tickers no longer listed
+        - "renamed": [{"cik", "old", "new"}] primary ticker changes
+        - "cik_changed": [{"ticker", "old_cik", "new_cik"}]
+        - "new_ciks": [int] CIKs that were not listed
+    """
+    renamed = [
+        {"cik": cik, "old": old_ticker, "new": new_index.cik_to_ticker[cik]}
+        for cik, old_ticker in old_index.cik_to_ticker.items()
+        if cik in new_index.cik_to_ticker and new_index.cik_to_ticker[cik] != old_ticker
+        and new_index.ticker_to_cik.get(old_ticker) != cik
+        and old_index.ticker_to_cik.get(new_index.cik_to_ticker[cik]) != cik
+    ]
+    renamed_old = {rename["old"] for rename in renamed}
+    renamed_new = {rename["new"] for rename in renamed}
+
+    return {
+        "added": [
+            {"ticker": ticker, "cik": cik} for ticker, cik in new_index.ticker_to_cik.items()
+            if ticker not in old_index.ticker_to_cik and ticker not in renamed_new
+        ],
+        "removed": [
+            {"ticker": ticker, "cik": cik} for ticker, cik in old_index.ticker_to_cik.items()
+            if ticker not in new_index.ticker_to_cik and ticker not in renamed_old
+        ],
+        "renamed": renamed,
+        "cik_changed": [
+            {"ticker": ticker, "old_cik": old_index.ticker_to_cik[ticker], "new_cik": cik}
+            for ticker, cik in new_index.ticker_to_cik.items()
+            if ticker in old_index.ticker_to_cik and old_index.ticker_to_cik[ticker] != cik
+        ],
+        "new_ciks": [cik for cik in new_index.cik_to_ticker if cik not in old_index.cik_to_ticker]
+    }
+
+def delta_is_empty(delta: dict) -> bool:
+    """True if a delta records no change"""
+    return not any(delta[key] for key in DELTA_KEYS)
+
+def append_change_log(delta: dict, change_log: Path = CHANGE_LOG_FILE, now: datetime = None):
+    """
+    Append a delta to the change log as one compact JSON line
+
+    Args:
+        delta: Output of compute_delta()
+        change_log: Change log path
+        now: Time of the update (default: datetime.now())
+    """
+    entry = {"updated_at": (now or datetime.now()).isoformat(timespec="seconds")}
+    entry.update({key: delta[key] for key in DELTA_KEYS})
+    change_log.parent.mkdir(parents=True, exist_ok=True)
+    with open(change_log, "ab") as f:
+        f.write(serialization.dumps(entry) + b"\n")
+    logger.info(f"Change log updated: {change_log}")
+
+def record_delta(current: dict, data: dict, change_log: Path = CHANGE_LOG_FILE, on_delta=None) -> bool:
+    """
+    Diff two ticker lists, run the change handler and log the delta
+
+    Args:
+        current: Ticker list being replaced
+        data: Downloaded ticker list
+        change_log: Change log path
+        on_delta: Callable(delta) run when the lists differ
+
+    Returns:
+        True if the delta was handled (or empty), False if on_delta raised;
+        nothing is logged then, so the next run records the delta instead
+    """
+    delta = compute_delta(TickerIndex.from_company_tickers(current), TickerIndex.from_company_tickers(data))
+    if delta_is_empty(delta):
+        logger.info("No ticker or CIK changes")
+        return True
+
+    logger.info(f"Ticker changes: {len(delta['added'])} added, {len(delta['removed'])} removed, "
+                f"{len(delta['renamed'])} renamed, {len(delta['cik_changed'])} CIK changes, "
+                f"{len(delta['new_ciks'])} new CIKs")
+    if on_delta is not None:
         try:
-            with open(file_path, 'r') as src:
-                backup_content = src.read()
-            with open(backup_file, 'w') as dst:
-                dst.write(backup_content)
-            logger.info(f"Backup created: {backup_file}")
-            return backup_file
+            on_delta(delta)
         except Exception as e:
-            logger.error(f"Failed to create backup: {e}")
-            return None
-    return None
+            logger.error(f"Ticker change handler failed: {e}")
+            return False
+    append_change_log(delta, change_log)
+    return True
+
+def load_current(file_path: Path) -> dict | None:
+    """Current ticker list, or None if there is none (or it is unreadable)"""
+    try:
+        return serialization.load_file(file_path)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        logger.error(f"Ignoring unreadable ticker list {file_path}: {e}")
+        return None
 
-def download_tickers(url: str, header) -> dict | None:
+def download_tickers(url: str, header, client=None) -> dict | None:
     """
     Download company tickers from SEC
     
     Args:
         url: SEC endpoint URL
+        header: Request headers
+        client: SecClient to use (default: shared client)
         
     Returns:
         Dictionary of tickers or None if failed
     """
+    client = client or get_default_client()
     try:
         logger.info(f"Downloading from {url}...")
-        response = requests.get(url, header, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
+        data = client.get_json(url, headers=header)
         logger.info(f"Successfully downloaded {len(data)} records")
         return data
         
@@ -104,7 +264,7 @@ def validate_data(data: dict) -> bool:
 
 def save_data(data: dict, file_path: Path) -> bool:
     """
-    Save data to JSON file
+    Save data to JSON file, atomically (readers see the old or the new file, never a partial one)
     
     Args:
         data: Dictionary to save
@@ -114,8 +274,7 @@ def save_data(data: dict, file_path: Path) -> bool:
         True if successful, False otherwise
     """
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        serialization.dump_file(data, file_path)
         logger.info(f"Data saved to {file_path}")
         return True
     except Exception as e:
@@ -125,14 +284,22 @@ def save_data(data: dict, file_path: Path) -> bool:
 def update_tickers(url: str = SEC_URL,
                    header = SEC_HEADER, 
                    output_file: Path = OUTPUT_FILE,
-                   create_backup_flag: bool = True) -> bool:
+                   create_backup_flag: bool = True,
+                   change_log: Path = CHANGE_LOG_FILE,
+                   backup_dir: Path = BACKUP_DIR,
+                   on_delta=None) -> bool:
     """
     Main update function
     
     Args:
         url: SEC endpoint URL
         output_file: Path to output file
-        create_backup_flag: Whether to create backup
+        create_backup_flag: Whether to keep periodic full snapshots
+        change_log: Path of the delta change log
+        backup_dir: Snapshot directory
+        on_delta: Callable(delta) run when the list changed (not on the first download),
+            before the new list is saved; if it raises, the update fails and the
+            next run hands it the same delta again
         
     Returns:
         True if successful, False otherwise
@@ -141,11 +308,6 @@ def update_tickers(url: str = SEC_URL,
     logger.info("Starting SEC Company Tickers Update")
     logger.info("=" * 60)
     
-    # Create backup
-    if create_backup_flag:
-        ensure_backup_dir()
-        create_backup(output_file)
-    
     # Download data
     data = download_tickers(url, header)
     if data is None:
@@ -156,11 +318,29 @@ def update_tickers(url: str = SEC_URL,
     if not validate_data(data):
         logger.error("Update failed: Data validation failed")
         return False
-    
-    # Save data
-    if not save_data(data, output_file):
-        logger.error("Update failed: Unable to save data")
-        return False
+
+    current = load_current(output_file)
+    if current == data:
+        logger.info("Ticker list unchanged")
+    else:
+        # Hand the delta over before the new list replaces the one it is computed against
+        if current is not None and not record_delta(current, data, change_log, on_delta):
+            logger.error("Update failed: Ticker change handler failed")
+            return False
+
+        # Save data
+        if not save_data(data, output_file):
+            logger.error("Update failed: Unable to save data")
+            return False
+
+        # Rebuild the ticker index; a stale one is also rebuilt on its next load
+        try:
+            refresh_ticker_index(output_file)
+        except Exception as e:
+            logger.error(f"Failed to rebuild ticker index: {e}")
+
+    if create_backup_flag:
+        take_snapshot(data, backup_dir)
     
     logger.info("=" * 60)
     logger.info("Update completed successfully!")
@@ -0,0 +1,337 @@
+"""
+SEC Client
+--------------------------
+Shared HTTP client for SEC EDGAR endpoints.
+
+- One pooled requests.Session (keep-alive, gzip)
+- Token-bucket limiter honouring SEC's 10 requests/second fair-access cap
+- Exponential backoff on 429/5xx and connection errors, honouring
+  Retry-After in both its seconds and HTTP-date forms
+- Threaded bulk mode sharing the same pool and limiter
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from storage import serialization
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+SEC_DATA_URL = "https://data.sec.gov"
+SEC_WWW_URL = "https://www.sec.gov"
+
+DEFAULT_HEADERS = {
+    "User-Agent": "FundamentalsAgent/1.0 (your_email@example.com)",
+    "Accept-Encoding": "gzip, deflate"
+}
+
+SEC_MAX_REQUESTS_PER_SECOND = 10
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# =========================
+# RETRY-AFTER
+# =========================
+
+def parse_retry_after(value, now: datetime = None):
+    """
+    Seconds to wait from a Retry-After header
+
+    Args:
+        value: Header value, either delay-seconds ("120") or an HTTP-date
+               ("Wed, 21 Oct 2015 07:28:00 GMT")
+        now: Current time for HTTP-dates (default: now, UTC)
+
+    Returns:
+        Non-negative delay in seconds, or None if the value is missing or unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+# =========================
+# RATE LIMITER
+# =========================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (default: rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        """Block until `tokens` are available and consume them"""
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+# =========================
+# CLIENT
+# =========================
+
+class SecClient:
+    """
+    Pooled, rate-limited HTTP client for SEC endpoints
+    """
+
+    def __init__(self,
+                 headers: dict = None,
+                 rate_limit: float = SEC_MAX_REQUESTS_PER_SECOND,
+                 timeout: float = 30,
+                 max_retries: int = 5,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30,
+                 pool_size: int = 10,
+                 data_base_url: str = SEC_DATA_URL,
+                 www_base_url: str = SEC_WWW_URL):
+        """
+        Initialize client
+
+        Args:
+            headers: Extra request headers (SEC requires a User-Agent)
+            rate_limit: Maximum requests per second across all threads
+            timeout: Per-request timeout in seconds
+            max_retries: Retries on 429/5xx and connection errors
+            backoff_factor: Base delay for exponential backoff
+            max_backoff: Upper bound for a single backoff delay
+            pool_size: Keep-alive connections kept per host
+            data_base_url: Base URL for data.sec.gov (override for stubs)
+            www_base_url: Base URL for www.sec.gov (override for stubs)
+        """
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.data_base_url = data_base_url.rstrip("/")
+        self.www_base_url = www_base_url.rstrip("/")
+        self.limiter = TokenBucket(rate_limit)
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    # =========================
+    # URL HELPERS
+    # =========================
+
+    def companyfacts_url(self, cik) -> str:
+        """URL of the companyfacts document for a CIK"""
+        return f"{self.data_base_url}/api/xbrl/companyfacts/CIK{str(cik).zfill(10)}.json"
+
+    def company_tickers_url(self) -> str:
+        """URL of the SEC ticker list"""
+        return f"{self.www_base_url}/files/company_tickers.json"
+
+    def submissions_url(self, cik) -> str:
+        """URL of the filing history (submissions) document for a CIK"""
+        return f"{self.data_base_url}/submissions/CIK{str(cik).zfill(10)}.json"
+
+    def daily_form_index_url(self, day) -> str:
+        """URL of the EDGAR daily form index for a date"""
+        quarter = (day.month - 1) // 3 + 1
+        return f"{self.www_base_url}/Archives/edgar/daily-index/{day.year}/QTR{quarter}/form.{day:%Y%m%d}.idx"
+
+    # =========================
+    # REQUESTS
+    # =========================
+
+    def backoff_delay(self, attempt: int, response=None) -> float:
+        """
+        Delay before retry `attempt` (0-based), honouring Retry-After
+
+        Args:
+            attempt: Retry number
+            response: Failed response, if any
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = self.backoff_factor * (2 ** attempt)
+        return min(delay + random.uniform(0, self.backoff_factor), self.max_backoff)
+
+    def get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        Rate-limited GET with exponential backoff
+
+        Args:
+            url: Absolute URL
+            headers: Per-request headers
+
+        Returns:
+            Response (raise_for_status already applied)
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"{type(e).__name__} for {url}; retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self.backoff_delay(attempt, response)
+                logger.warning(f"HTTP {response.status_code} for {url}; retrying in {delay:.2f}s")
+
+            attempt += 1
+            time.sleep(delay)
+
+    def get_json(self, url: str, headers: dict = None):
+        """GET a URL and decode its JSON body"""
+        return serialization.loads(self.get(url, headers=headers).content)
+
+    def get_json_if_modified(self, url: str, etag: str = None, last_modified: str = None, headers: dict = None):
+        """
+        Conditional GET using stored ETag / Last-Modified validators
+
+        Args:
+            url: Absolute URL
+            etag: ETag from the previous response
+            last_modified: Last-Modified from the previous response
+            headers: Extra per-request headers
+
+        Returns:
+            Tuple of (data or None if 304 Not Modified, validators dict)
+        """
+        request_headers = dict(headers or {})
+        if etag:
+            request_headers["If-None-Match"] = etag
+        if last_modified:
+            request_headers["If-Modified-Since"] = last_modified
+
+        response = self.get(url, headers=request_headers)
+        if response.status_code == 304:
+            return None, {"etag": etag, "last_modified": last_modified}
+
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        return serialization.loads(response.content), validators
+
+    def get_companyfacts(self, cik) -> dict:
+        """Download the companyfacts document for a CIK"""
+        return self.get_json(self.companyfacts_url(cik))
+
+    def get_company_tickers(self) -> dict:
+        """Download the SEC ticker list"""
+        return self.get_json(self.company_tickers_url())
+
+    def get_many_json(self, urls, max_workers: int = None):
+        """
+        Download many JSON documents concurrently
+
+        Requests share the connection pool and the rate limiter, so
+        throughput is capped at the limiter rate rather than by
+        per-request latency.
+
+        Args:
+            urls: Iterable of absolute URLs
+            max_workers: Concurrent requests in flight (default: pool_size)
+
+        Yields:
+            Tuples of (url, data, error) in input order
+        """
+        def fetch(url):
+            try:
+                return url, self.get_json(url), None
+            except Exception as e:
+                return url, None, e
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as pool:
+            yield from pool.map(fetch, urls)
+
+
+# =========================
+# SHARED INSTANCE
+# =========================
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> SecClient:
+    """Process-wide SecClient so every caller shares one pool and limiter"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = SecClient()
+        return _default_client
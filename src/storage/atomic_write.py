@@ -0,0 +1,169 @@
+"""
+Atomic Write
+--------------------------
+Crash-safe file replacement shared by every store.
+
+A file is written to a temporary sibling, flushed to disk, and renamed
+over its target, so a reader (or the process after a crash) sees either
+the previous complete file or the new complete file, never a truncated
+one.
+
+Files may carry a checksum footer, a fixed-width ASCII trailer line:
+
+    \\n#checksum crc32=1a2b3c4d length=000000012345\\n
+
+length counts the payload bytes before the footer. A reader can tell an
+intact file from a truncated or torn one by reading only the footer
+(verify_file(path)) or, with full=True, by a CRC over the bytes, which
+is far cheaper than parsing them. strip_checksum() removes and checks
+the footer of data read from disk; data without a footer passes through
+unchanged, so files written before checksums keep reading.
+"""
+
+import os
+import re
+import secrets
+import zlib
+from pathlib import Path
+
+
+# =========================
+# CONFIG
+# =========================
+
+FOOTER_FORMAT = b"\n#checksum crc32=%08x length=%012d\n"
+FOOTER_SIZE = len(FOOTER_FORMAT % (0, 0))
+FOOTER_PATTERN = re.compile(rb"\n#checksum crc32=([0-9a-f]{8}) length=(\d{12})\n\Z")
+
+TMP_SUFFIX = ".tmp"
+
+
+# =========================
+# CHECKSUM FOOTER
+# =========================
+
+def add_checksum(data: bytes) -> bytes:
+    """Payload followed by its checksum footer"""
+    return data + FOOTER_FORMAT % (zlib.crc32(data), len(data))
+
+
+def parse_footer(tail: bytes):
+    """
+    (crc32, length) of a footer, or None if tail does not end with one
+
+    Args:
+        tail: Last FOOTER_SIZE (or more) bytes of a file
+    """
+    match = FOOTER_PATTERN.search(tail[-FOOTER_SIZE:])
+    if match is None:
+        return None
+    return int(match.group(1), 16), int(match.group(2))
+
+
+def strip_checksum(data: bytes) -> bytes:
+    """
+    Payload of data read from a file, checked against its footer
+
+    Returns:
+        data without its footer, or data unchanged if it has none
+
+    Raises:
+        ValueError: If the footer does not match the payload
+    """
+    footer = parse_footer(data)
+    if footer is None:
+        return data
+    crc, length = footer
+    payload = data[:-FOOTER_SIZE]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError("Checksum mismatch: file is truncated or corrupt")
+    return payload
+
+
+def verify_file(path, full: bool = False):
+    """
+    Check a file against its checksum footer without parsing it
+
+    Args:
+        path: File to check
+        full: Also compare the CRC of the payload (reads the whole file);
+              otherwise only the footer and the file size are read
+
+    Returns:
+        True if intact, False if truncated or corrupt, None if the file
+        has no footer to check against
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < FOOTER_SIZE:
+            return None
+        f.seek(size - FOOTER_SIZE)
+        footer = parse_footer(f.read(FOOTER_SIZE))
+        if footer is None:
+            return None
+        crc, length = footer
+        if length != size - FOOTER_SIZE:
+            return False
+        if not full:
+            return True
+        f.seek(0)
+        return zlib.crc32(f.read(length)) == crc
+
+
+# =========================
+# ATOMIC WRITES
+# =========================
+
+def fsync_directory(directory):
+    """Flush a directory entry change (a rename) to disk where the platform allows it"""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_bytes_atomic(path, data: bytes, checksum: bool = False, durable: bool = True) -> Path:
+    """
+    Replace a file with new contents atomically
+
+    Args:
+        path: Target file
+        data: New contents
+        checksum: Append a checksum footer
+        durable: fsync the file before the rename and the directory after
+                 it, so the new contents survive a power loss; without it
+                 the replacement is still atomic for concurrent readers
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    if checksum:
+        data = add_checksum(data)
+
+    # Unique per writer; created with the usual umask-derived mode, unlike mkstemp's 0600
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.{secrets.token_hex(4)}{TMP_SUFFIX}"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if durable:
+        fsync_directory(path.parent)
+    return path
@@ -0,0 +1,418 @@
+"""
+Columnar Fact Storage
+--------------------------
+Compact column-oriented layout for statement payloads.
+
+A statement payload ({company, statement, processed_date, facts}) is
+stored column-wise:
+- company / statement / processed_date once, in the header
+- string-like fields dictionary-encoded: int32 codes + a vocabulary
+  (concept, period, source_form, ... repeat heavily per statement)
+- numeric fields as an int64 column and a float64 column with a
+  per-row int8 kind, so integers and floats round-trip exactly
+  (a field holding an integer outside int64 is dictionary-encoded)
+- booleans as int8
+
+Missing keys are encoded as code -1 / kind 0, so facts with different
+key sets (normalized vs derived) share one layout and decode to the
+same JSON shape they were written from.
+
+File layout (a single zlib stream after the magic):
+    MAGIC | zlib(header length:uint32 | header JSON | codes | flags | ints | floats) [| checksum footer]
+
+Column buffers are little-endian int32 / int8 / int64 / float64, so
+they can be handed to numpy.frombuffer as-is, but only the stdlib
+array module is needed to read or write them.
+
+Reads: load_columns() is the fast path and decodes only the fields
+asked for. load_file() rebuilds one dict per fact, which costs about as
+much as parsing the equivalent JSON with orjson, so readers that scan
+fields should use columns (fact_store.read_statement_columns).
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import repeat
+from operator import itemgetter
+
+from storage import serialization
+from storage.atomic_write import strip_checksum, write_bytes_atomic
+
+
+# =========================
+# CONFIG
+# =========================
+
+FILE_EXTENSION = ".colz"
+MAGIC = b"FCOL1\n"
+HEADER_LENGTH = struct.Struct("<I")
+COMPRESSION_LEVEL = 6
+
+KIND_DICT = "dict"
+KIND_NUMBER = "number"
+KIND_BOOL = "bool"
+
+NUMBER_MISSING = 0
+NUMBER_INT = 1
+NUMBER_FLOAT = 2
+
+class _Missing:
+    """Sentinel for a key absent from a fact"""
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+# Buffer name → fixed-width array typecode (int32, int8, int64, float64)
+BUFFERS = (("codes", "i"), ("flags", "b"), ("ints", "q"), ("floats", "d"))
+
+# Integers the "q" buffer can hold; larger ones are stored in a dictionary column
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+# =========================
+# ENCODING
+# =========================
+
+def column_kind(values):
+    """
+    Pick the storage kind for one field's values
+
+    Args:
+        values: Present (non-missing) values of the field
+
+    Returns:
+        KIND_BOOL, KIND_NUMBER or KIND_DICT
+    """
+    if values and all(isinstance(v, bool) for v in values):
+        return KIND_BOOL
+    if values and all(
+        isinstance(v, float) or (isinstance(v, int) and not isinstance(v, bool) and INT64_MIN <= v <= INT64_MAX)
+        for v in values
+    ):
+        return KIND_NUMBER
+    return KIND_DICT
+
+
+def buffer_lengths(header: dict) -> dict:
+    """Number of slots in each packed buffer described by a header"""
+    rows = header["rows"]
+    kinds = [column["kind"] for column in header["columns"]]
+    n_numbers = kinds.count(KIND_NUMBER)
+    return {
+        "codes": kinds.count(KIND_DICT) * rows,
+        "flags": (kinds.count(KIND_BOOL) + n_numbers) * rows,
+        "ints": n_numbers * rows,
+        "floats": n_numbers * rows
+    }
+
+
+def encode_payload(payload: dict):
+    """
+    Encode a statement payload into a header and packed column buffers
+
+    Columns of the same kind share one buffer, each column occupying
+    `rows` consecutive slots starting at index * rows.
+
+    Args:
+        payload: {"company", "statement", "processed_date", "facts"}
+
+    Returns:
+        Tuple of (header dict, {buffer name: array})
+    """
+    facts = payload["facts"]
+    rows = len(facts)
+
+    # Column order follows first appearance, which preserves key order
+    fields = []
+    for fact in facts:
+        for key in fact:
+            if key not in fields:
+                fields.append(key)
+
+    columns = []
+    for field in fields:
+        present = [fact[field] for fact in facts if field in fact]
+        columns.append({"name": field, "kind": column_kind(present)})
+
+    dict_columns = [c for c in columns if c["kind"] == KIND_DICT]
+    flag_columns = [c for c in columns if c["kind"] in (KIND_BOOL, KIND_NUMBER)]
+    number_columns = [c for c in columns if c["kind"] == KIND_NUMBER]
+
+    codes = array("i", [-1]) * (len(dict_columns) * rows)
+    flags = array("b", [0]) * (len(flag_columns) * rows)
+    ints = array("q", [0]) * (len(number_columns) * rows)
+    floats = array("d", [0.0]) * (len(number_columns) * rows)
+
+    for index, column in enumerate(dict_columns):
+        column["index"] = index
+        field = column["name"]
+        base = index * rows
+        # Non-string values (lists, nulls, integers beyond int64) are stored as their JSON text
+        vocabulary = {}
+        encoded = False
+        for row, fact in enumerate(facts):
+            if field not in fact:
+                continue
+            value = fact[field]
+            if isinstance(value, str):
+                token = value
+            else:
+                token = "\0" + json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+                encoded = True
+            codes[base + row] = vocabulary.setdefault(token, len(vocabulary))
+        column["vocabulary"] = list(vocabulary)
+        column["encoded"] = encoded
+
+    for index, column in enumerate(flag_columns):
+        column["index"] = index
+        if column["kind"] == KIND_BOOL:
+            field = column["name"]
+            base = index * rows
+            for row, fact in enumerate(facts):
+                flags[base + row] = int(fact[field]) if field in fact else -1
+
+    for number_index, column in enumerate(number_columns):
+        column["number_index"] = number_index
+        field = column["name"]
+        flag_base = column["index"] * rows
+        base = number_index * rows
+        for row, fact in enumerate(facts):
+            if field not in fact:
+                continue
+            value = fact[field]
+            if isinstance(value, int):
+                flags[flag_base + row] = NUMBER_INT
+                ints[base + row] = value
+            else:
+                flags[flag_base + row] = NUMBER_FLOAT
+                floats[base + row] = value
+
+    header = {key: value for key, value in payload.items() if key != "facts"}
+    header["rows"] = rows
+    header["columns"] = columns
+
+    return header, {"codes": codes, "flags": flags, "ints": ints, "floats": floats}
+
+
+def take(vocabulary, codes):
+    """vocabulary[code] for every code, as a list (itemgetter runs the loop in C)"""
+    if not codes:
+        return []
+    if len(codes) == 1:
+        return [vocabulary[codes[0]]]
+    return list(itemgetter(*codes)(vocabulary))
+
+
+def decode_columns(header: dict, buffers: dict, fields=None) -> dict:
+    """
+    Decode packed buffers into one value list per field
+
+    Missing values decode to the MISSING sentinel so they can be told
+    apart from stored nulls.
+
+    Args:
+        header: Header produced by encode_payload
+        buffers: Buffers produced by encode_payload
+        fields: Field names to decode (default: every column); other
+            columns are not touched
+
+    Returns:
+        Dictionary of field name → list of values, in column order
+    """
+    rows = header["rows"]
+    codes, flags, ints, floats = (buffers[name] for name, _ in BUFFERS)
+    wanted = None if fields is None else set(fields)
+    decoded = {}
+
+    for column in header["columns"]:
+        if wanted is not None and column["name"] not in wanted:
+            continue
+        base = column["index"] * rows
+        kind = column["kind"]
+
+        if kind == KIND_BOOL:
+            column_flags = flags[base:base + rows]
+            if -1 in column_flags:
+                decoded[column["name"]] = [MISSING if value == -1 else bool(value) for value in column_flags]
+            else:
+                decoded[column["name"]] = list(map(bool, column_flags))
+
+        elif kind == KIND_NUMBER:
+            number_base = column["number_index"] * rows
+            column_flags = flags[base:base + rows]
+            if NUMBER_FLOAT not in column_flags and NUMBER_MISSING not in column_flags:
+                decoded[column["name"]] = ints[number_base:number_base + rows].tolist()
+            elif NUMBER_INT not in column_flags and NUMBER_MISSING not in column_flags:
+                decoded[column["name"]] = floats[number_base:number_base + rows].tolist()
+            else:
+                column_ints = ints[number_base:number_base + rows]
+                column_floats = floats[number_base:number_base + rows]
+                decoded[column["name"]] = [
+                    column_ints[row] if flag == NUMBER_INT else column_floats[row] if flag == NUMBER_FLOAT
+                    else MISSING
+                    for row, flag in enumerate(column_flags)
+                ]
+
+        else:
+            # Files written before "encoded" existed are scanned for JSON tokens
+            if column.get("encoded", True):
+                # stdlib json: orjson turns integers below int64 into floats
+                vocabulary = [
+                    json.loads(token[1:]) if token.startswith("\0") else token
+                    for token in column["vocabulary"]
+                ]
+            else:
+                vocabulary = list(column["vocabulary"])
+            vocabulary.append(MISSING)  # code -1 indexes the sentinel
+            decoded[column["name"]] = take(vocabulary, codes[base:base + rows])
+
+    return decoded
+
+
+def decode_payload(header: dict, buffers: dict) -> dict:
+    """
+    Decode a header and packed buffers back into a statement payload
+
+    Args:
+        header: Header produced by encode_payload
+        buffers: Buffers produced by encode_payload
+
+    Returns:
+        Statement payload with facts in their original JSON shape
+    """
+    columns = decode_columns(header, buffers)
+    names = list(columns)
+    if not names:
+        facts = [{} for _ in range(header["rows"])]
+    else:
+        # map() keeps the per-fact loop in C
+        facts = list(map(dict, map(zip, repeat(names), zip(*columns.values()))))
+        # Drop absent keys afterwards, only in the columns that have any
+        for name, values in columns.items():
+            if MISSING in values:
+                for fact, value in zip(facts, values):
+                    if value is MISSING:
+                        del fact[name]
+
+    payload = {key: value for key, value in header.items() if key not in ("rows", "columns")}
+    payload["facts"] = facts
+    return payload
+
+
+# =========================
+# BYTES API
+# =========================
+
+def dumps(payload: dict) -> bytes:
+    """Encode a statement payload to compressed columnar bytes"""
+    header, buffers = encode_payload(payload)
+    header_bytes = serialization.dumps(header)
+
+    parts = [HEADER_LENGTH.pack(len(header_bytes)), header_bytes]
+    for name, _ in BUFFERS:
+        buffer = buffers[name]
+        if sys.byteorder != "little":
+            buffer = array(buffer.typecode, buffer)
+            buffer.byteswap()
+        parts.append(buffer.tobytes())
+
+    return MAGIC + zlib.compress(b"".join(parts), COMPRESSION_LEVEL)
+
+
+def unpack(data: bytes):
+    """
+    Split columnar bytes into header and packed buffers
+
+    Returns:
+        Tuple of (header dict, {buffer name: array})
+
+    Raises:
+        ValueError: If the data is not a columnar file or is truncated
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a columnar fact file")
+    try:
+        raw = zlib.decompress(data[len(MAGIC):])
+    except zlib.error as e:
+        raise ValueError(f"Corrupt columnar fact file: {e}") from None
+
+    if len(raw) < HEADER_LENGTH.size:
+        raise ValueError("Truncated columnar fact file")
+    (header_length,) = HEADER_LENGTH.unpack_from(raw)
+    offset = HEADER_LENGTH.size
+    header = serialization.loads(raw[offset:offset + header_length])
+    offset += header_length
+
+    lengths = buffer_lengths(header)
+    buffers = {}
+    for name, typecode in BUFFERS:
+        buffer = array(typecode)
+        end = offset + lengths[name] * buffer.itemsize
+        buffer.frombytes(raw[offset:end])
+        if len(buffer) != lengths[name]:
+            raise ValueError("Truncated columnar fact file")
+        if sys.byteorder != "little":
+            buffer.byteswap()
+        buffers[name] = buffer
+        offset = end
+
+    return header, buffers
+
+
+def loads(data: bytes) -> dict:
+    """Decode columnar bytes into a statement payload"""
+    return decode_payload(*unpack(data))
+
+
+# =========================
+# FILE API
+# =========================
+
+def dump_file(payload: dict, path, checksum: bool = False, durable: bool = True):
+    """Atomically write a statement payload as a columnar file (see atomic_write)"""
+    write_bytes_atomic(path, dumps(payload), checksum=checksum, durable=durable)
+
+
+def read_payload_bytes(path) -> bytes:
+    """Bytes of a columnar file with its checksum footer checked and stripped"""
+    with open(path, "rb") as f:
+        return strip_checksum(f.read())
+
+
+def load_file(path) -> dict:
+    """
+    Read a statement payload from a columnar file
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is truncated or corrupt
+    """
+    return loads(read_payload_bytes(path))
+
+
+def load_columns(path, fields=None):
+    """
+    Read a columnar file as per-field value lists, skipping the
+    per-fact dicts (for column scans across many statements)
+
+    Args:
+        path: Columnar file
+        fields: Field names to decode (default: every column)
+
+    Returns:
+        Tuple of (header dict, {field name: list of values}); absent
+        values are the MISSING sentinel
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is truncated or corrupt
+    """
+    header, buffers = unpack(read_payload_bytes(path))
+    return header, decode_columns(header, buffers, fields)
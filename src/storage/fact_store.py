@@ -0,0 +1,189 @@
+"""
+Fact Store
+--------------------------
+Reads and writes statement payloads in a selectable storage format.
+
+Formats:
+- json: indented JSON, data/<TICKER>/<stage>/<statement>.json
+- colz: columnar, data/<TICKER>/<stage>/<statement>.colz
+
+Readers pick whichever format was written most recently, so switching
+formats never serves a stale file. read_statement_columns() returns
+per-field value lists instead of per-fact dicts; columnar files are
+decoded straight into them.
+
+Statement files are replaced atomically. Columnar files also end with
+a checksum footer (storage/atomic_write.py), so verify_statement() can
+tell a complete file from a damaged one without decoding it. JSON files
+get no footer by default, so they stay plain JSON for jq, pandas and
+other standard tools; verify_statement(full=True) parses them instead.
+"""
+
+import os
+from pathlib import Path
+
+from storage import columnar, serialization
+from storage.atomic_write import verify_file
+
+
+# =========================
+# CONFIG
+# =========================
+
+STORAGE_FORMAT_JSON = "json"
+STORAGE_FORMAT_COLUMNAR = "colz"
+
+FILE_EXTENSIONS = {
+    STORAGE_FORMAT_JSON: ".json",
+    STORAGE_FORMAT_COLUMNAR: columnar.FILE_EXTENSION
+}
+
+
+# =========================
+# PATHS
+# =========================
+
+def statement_path(directory, statement: str, storage_format: str = STORAGE_FORMAT_JSON) -> Path:
+    """Path of a statement file in the given format"""
+    if storage_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unknown storage format: {storage_format}")
+    return Path(directory) / f"{statement}{FILE_EXTENSIONS[storage_format]}"
+
+
+def find_statement(directory, statement: str):
+    """
+    Most recently written file for a statement
+
+    Returns:
+        Tuple of (path, storage_format) or None if no file exists
+    """
+    # One stat per candidate on plain strings: this runs once per statement read
+    base = os.path.join(directory, statement)
+    candidates = []
+    for storage_format, extension in FILE_EXTENSIONS.items():
+        try:
+            candidates.append((os.stat(base + extension).st_mtime_ns, storage_format))
+        except FileNotFoundError:
+            continue
+    if not candidates:
+        return None
+    _, storage_format = max(candidates)
+    return Path(base + FILE_EXTENSIONS[storage_format]), storage_format
+
+
+# =========================
+# READ / WRITE
+# =========================
+
+def write_statement(payload: dict, directory, storage_format: str = STORAGE_FORMAT_JSON,
+                    checksum: bool = None) -> Path:
+    """
+    Write a statement payload
+
+    Args:
+        payload: {"company", "statement", "processed_date", "facts"}
+        directory: Output directory
+        storage_format: STORAGE_FORMAT_JSON or STORAGE_FORMAT_COLUMNAR
+        checksum: Append a checksum footer (default: columnar files only;
+            a footer makes a .json file invalid JSON to other readers)
+
+    Returns:
+        Path written
+    """
+    path = statement_path(directory, payload["statement"], storage_format)
+    if checksum is None:
+        checksum = storage_format == STORAGE_FORMAT_COLUMNAR
+    if storage_format == STORAGE_FORMAT_COLUMNAR:
+        columnar.dump_file(payload, path, checksum=checksum)
+    else:
+        serialization.dump_file(payload, path, pretty=True, checksum=checksum)
+    return path
+
+
+def read_statement(directory, statement: str) -> dict:
+    """
+    Read a statement payload in whichever format is newest
+
+    Raises:
+        FileNotFoundError: If the statement has not been written
+        ValueError: If the statement file is corrupt
+    """
+    found = find_statement(directory, statement)
+    if found is None:
+        raise FileNotFoundError(f"No stored {statement} in {directory}")
+
+    path, storage_format = found
+    if storage_format == STORAGE_FORMAT_COLUMNAR:
+        return columnar.load_file(path)
+    return serialization.load_file(path)
+
+
+def read_statement_columns(directory, statement: str, fields=None):
+    """
+    Read a statement as per-field value lists, in whichever format is newest
+
+    Args:
+        directory: Stage directory
+        statement: Statement type value
+        fields: Field names to return (default: every field)
+
+    Returns:
+        Tuple of (payload without "facts", {field name: list of values});
+        a fact without a field has columnar.MISSING in its slot
+
+    Raises:
+        FileNotFoundError: If the statement has not been written
+        ValueError: If the statement file is corrupt
+    """
+    found = find_statement(directory, statement)
+    if found is None:
+        raise FileNotFoundError(f"No stored {statement} in {directory}")
+
+    path, storage_format = found
+    if storage_format == STORAGE_FORMAT_COLUMNAR:
+        header, columns = columnar.load_columns(path, fields)
+        for field in fields or ():
+            columns.setdefault(field, [columnar.MISSING] * header["rows"])
+        return {key: value for key, value in header.items() if key not in ("rows", "columns")}, columns
+
+    payload = serialization.load_file(path)
+    facts = payload.pop("facts")
+    if fields is None:
+        fields = []
+        for fact in facts:
+            fields.extend(key for key in fact if key not in fields)
+    return payload, {field: [fact.get(field, columnar.MISSING) for fact in facts] for field in fields}
+
+
+def verify_statement(directory, statement: str, full: bool = False) -> bool:
+    """
+    Check the newest file of a statement against its checksum footer, without parsing it
+
+    Args:
+        directory: Stage directory
+        statement: Statement type value
+        full: Also check the CRC of the contents, not only the footer and
+            size; a file without a footer is parsed instead
+
+    Returns:
+        True if the statement exists and is intact (without full, files
+        without a footer count as intact: they were replaced atomically),
+        False if it is missing or damaged
+    """
+    found = find_statement(directory, statement)
+    if found is None:
+        return False
+    path, storage_format = found
+    try:
+        intact = verify_file(path, full)
+        if intact is not None or not full:
+            return intact is not False
+        if storage_format == STORAGE_FORMAT_COLUMNAR:
+            columnar.load_file(path)
+        else:
+            serialization.load_file(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except ValueError:
+        return False
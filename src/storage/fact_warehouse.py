@@ -0,0 +1,340 @@
+"""
+Fact Warehouse
+--------------------------
+Optional SQLite store of every normalized and derived fact, for
+cross-company and time-series queries without opening per-ticker files.
+
+Inputs:
+- Statement payloads from the retrievers' write step
+
+Outputs:
+- facts table in data/facts.db, indexed on (company, statement, concept, period)
+
+The database runs in WAL mode, so readers never block the writer and a
+reader always sees the last committed statement. Each write replaces one
+(company, statement, stage) slice inside a single transaction.
+"""
+
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from storage import serialization
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_WAREHOUSE_PATH = PROJECT_ROOT / "data" / "facts.db"
+
+STAGE_NORMALIZED = "normalized"
+STAGE_DERIVED = "derived"
+STAGE_PERIODS = "periods"
+
+# A concept can have a row in several stages for one period label. The
+# period stage holds quarters under their own fiscal labels with YTD
+# decomposed, so it wins for quarters and TTM; it has no fiscal years.
+QUARTER_STAGE_PREFERENCE = (STAGE_PERIODS, STAGE_DERIVED, STAGE_NORMALIZED)
+ANNUAL_STAGE_PREFERENCE = (STAGE_NORMALIZED, STAGE_DERIVED, STAGE_PERIODS)
+
+# Fiscal years sort after their fourth quarter, TTM after the quarter it ends on
+PERIOD_KIND_ORDER = {"Q": 0, "TTM": 1, "FY": 2}
+
+BUSY_TIMEOUT_SECONDS = 30
+
+# Keys with their own column; anything else rides along in `extra`
+FACT_COLUMNS = ("company", "statement", "concept", "period", "value", "currency",
+                "reported", "source_form", "filed_date")
+
+# `value` has no declared type so SQLite keeps ints and floats as written
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    company        TEXT NOT NULL,
+    statement      TEXT NOT NULL,
+    concept        TEXT NOT NULL,
+    period         TEXT NOT NULL,
+    stage          TEXT NOT NULL,
+    value,
+    currency       TEXT,
+    reported       INTEGER,
+    source_form    TEXT,
+    filed_date     TEXT,
+    processed_date TEXT,
+    extra          TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_facts_company_statement_concept_period
+    ON facts (company, statement, concept, period);
+CREATE INDEX IF NOT EXISTS idx_facts_statement_concept_period
+    ON facts (statement, concept, period);
+"""
+
+
+# =========================
+# ROW CONVERSION
+# =========================
+
+def fact_to_row(fact: dict, company: str, statement: str, stage: str, processed_date: str):
+    """Flatten a fact dictionary into a facts table row"""
+    extra = {key: value for key, value in fact.items() if key not in FACT_COLUMNS}
+    reported = fact.get("reported")
+    return (
+        company, statement, fact["concept"], fact["period"], stage,
+        fact.get("value"), fact.get("currency"),
+        None if reported is None else int(reported),
+        fact.get("source_form"), fact.get("filed_date"), processed_date,
+        serialization.dumps(extra).decode("utf-8") if extra else None
+    )
+
+
+def row_to_fact(row: sqlite3.Row) -> dict:
+    """Rebuild a fact dictionary (plus its stage) from a facts table row"""
+    fact = {key: row[key] for key in FACT_COLUMNS if row[key] is not None}
+    if "reported" in fact:
+        fact["reported"] = bool(fact["reported"])
+    if row["extra"]:
+        fact.update(serialization.loads(row["extra"]))
+    fact["stage"] = row["stage"]
+    return fact
+
+
+# =========================
+# PERIODS
+# =========================
+
+def period_sort_key(period: str):
+    """
+    Sort key placing period labels in order of period end
+
+    "Q3-2024" < "TTM-Q3-2024" < "Q4-2024" < "FY-2024" < "Q1-2025";
+    unrecognised labels sort after every recognised one.
+    """
+    parts = period.split("-")
+    try:
+        if len(parts) == 2 and parts[0] == "FY":
+            return (0, int(parts[1]), 4, PERIOD_KIND_ORDER["FY"])
+        if len(parts) == 2 and parts[0].startswith("Q"):
+            return (0, int(parts[1]), int(parts[0][1:]), PERIOD_KIND_ORDER["Q"])
+        if len(parts) == 3 and parts[0] == "TTM" and parts[1].startswith("Q"):
+            return (0, int(parts[2]), int(parts[1][1:]), PERIOD_KIND_ORDER["TTM"])
+    except ValueError:
+        pass
+    return (1, period)
+
+
+def stage_preference(period: str):
+    """Stages in the order their value is preferred for a period label"""
+    return ANNUAL_STAGE_PREFERENCE if period.startswith("FY-") else QUARTER_STAGE_PREFERENCE
+
+
+def preferred_facts(facts):
+    """
+    One fact per (company, statement, concept, period), from the preferred stage
+
+    Args:
+        facts: Fact dictionaries, each with its stage
+
+    Returns:
+        List of the facts kept, in their original order
+    """
+    best = {}
+    for position, fact in enumerate(facts):
+        key = (fact["company"], fact["statement"], fact["concept"], fact["period"])
+        rank = stage_preference(fact["period"]).index(fact["stage"])
+        if key not in best or rank < best[key][0]:
+            best[key] = (rank, position)
+    kept = sorted(position for _, position in best.values())
+    return [facts[position] for position in kept]
+
+
+# =========================
+# WAREHOUSE
+# =========================
+
+class FactWarehouse:
+    """
+    SQLite fact store shared by writers (retrievers) and readers
+    (FetchAllFinancialStatements)
+    """
+
+    def __init__(self, db_path=DEFAULT_WAREHOUSE_PATH):
+        """
+        Open (and create if needed) the warehouse database
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; sqlite3 connections are not shareable
+        self._local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def load_statement(self, payload: dict, stage: str):
+        """
+        Replace one company's statement slice with a freshly written payload
+
+        Args:
+            payload: {"company", "statement", "processed_date", "facts"}
+            stage: STAGE_NORMALIZED, STAGE_DERIVED or STAGE_PERIODS
+
+        Returns:
+            Number of rows loaded
+        """
+        company = payload["company"]
+        statement = payload["statement"]
+        processed_date = payload.get("processed_date")
+        rows = [fact_to_row(fact, company, statement, stage, processed_date) for fact in payload["facts"]]
+
+        with self.connection() as conn:
+            conn.execute(
+                "DELETE FROM facts WHERE company = ? AND statement = ? AND stage = ?",
+                (company, statement, stage)
+            )
+            conn.executemany(
+                "INSERT INTO facts (company, statement, concept, period, stage, value, currency, "
+                "reported, source_form, filed_date, processed_date, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+        logger.debug(f"Loaded {len(rows)} {stage} {statement} facts for {company}")
+        return len(rows)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def query(self, company=None, statement=None, concept=None, period=None, stage=None):
+        """
+        Facts matching every given filter, ordered by company then period end
+
+        Without a stage filter a period can come back once per stage that
+        holds it (e.g. a quarter's normalized and period-stage values);
+        every fact says which stage it is from.
+
+        Args:
+            company: Ticker, or list of tickers
+            statement: Statement type value (e.g. "income_statement")
+            concept: Canonical concept, or list of concepts
+            period: Period label (e.g. "Q3-2024"), or list of labels
+            stage: STAGE_NORMALIZED, STAGE_DERIVED or STAGE_PERIODS, or list of stages
+
+        Returns:
+            List of fact dictionaries, each with its stage
+        """
+        clauses = []
+        params = []
+        for column, value in (("company", company), ("statement", statement),
+                              ("concept", concept), ("period", period), ("stage", stage)):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                values = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        sql = "SELECT * FROM facts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        # Filing dates do not order periods: a filing reports earlier periods as comparatives
+        sql += " ORDER BY company, rowid"
+
+        facts = [row_to_fact(row) for row in self.connection().execute(sql, params)]
+        facts.sort(key=lambda fact: (fact["company"], period_sort_key(fact["period"])))
+        return facts
+
+    def cross_section(self, statement: str, concept: str, period: str, stage: str = None):
+        """
+        One concept for one period across every company
+
+        Args:
+            statement: Statement type value
+            concept: Canonical concept
+            period: Period label
+            stage: Stage to read (default: each company's value from the
+                first stage of stage_preference(period) that has one)
+
+        Returns:
+            Dictionary of company → value
+        """
+        facts = self.query(statement=statement, concept=concept, period=period, stage=stage)
+        if stage is None:
+            facts = preferred_facts(facts)
+        return {fact["company"]: fact.get("value") for fact in facts}
+
+    def time_series(self, company: str, statement: str, concept: str, stage: str = None):
+        """
+        Every period of one concept for one company, in order of period end
+
+        Args:
+            company: Ticker
+            statement: Statement type value
+            concept: Canonical concept
+            stage: Stage to read (default: one fact per period, from the
+                first stage of stage_preference(period) that has it)
+
+        Returns:
+            List of fact dictionaries
+        """
+        facts = self.query(company=company.upper(), statement=statement, concept=concept, stage=stage)
+        return facts if stage is not None else preferred_facts(facts)
+
+    def companies(self):
+        """Tickers present in the warehouse"""
+        return [row[0] for row in self.connection().execute("SELECT DISTINCT company FROM facts ORDER BY company")]
+
+
+# =========================
+# SHARED INSTANCES
+# =========================
+
+_warehouses = {}
+_warehouses_lock = threading.Lock()
+
+
+def get_warehouse(db_path=DEFAULT_WAREHOUSE_PATH) -> FactWarehouse:
+    """Process-wide FactWarehouse for a database path"""
+    key = str(Path(db_path).resolve())
+    with _warehouses_lock:
+        if key not in _warehouses:
+            _warehouses[key] = FactWarehouse(db_path)
+        return _warehouses[key]
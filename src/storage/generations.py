@@ -0,0 +1,286 @@
+"""
+Output Generations
+--------------------------
+Versioned per-ticker output directories, published atomically.
+
+Layout:
+- data/<TICKER>/generations/gen-000001/{normalized,derived,periods}
+- data/<TICKER>/CURRENT: name of the last complete generation
+
+Writers never touch the generation readers see. They build a new one in
+a staging directory (seeded with a copy of the current outputs, so an
+incremental run patches it in place), rename it to the next generation
+name and then replace CURRENT, which is a single atomic rename. A crash
+before that leaves a stray staging directory and the old generation
+still current.
+
+Writers publish while holding the ticker lock (storage/ticker_lock.py),
+so generations are published in the order they are numbered; CURRENT
+is never moved back to an older generation even if one is not.
+
+Readers resolve CURRENT once and read every stage of a statement from
+that generation, so they never see a half-written rebuild and never
+wait for one. The last few generations are kept so a reader that
+resolved an older one can finish; read_current() retries on the newest
+generation if its files were pruned mid-read.
+
+Tickers written before generations existed keep their stage
+directories directly under data/<TICKER>/; those are read until the
+first generation is published, which starts as a copy of them. They
+are left in place afterwards (they may be tracked or backed up
+elsewhere) and are no longer read once CURRENT exists; delete them by
+hand once the ticker has a generation.
+"""
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from storage.atomic_write import fsync_directory, write_bytes_atomic
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+CURRENT_FILE = "CURRENT"
+GENERATIONS_DIR = "generations"
+GENERATION_PREFIX = "gen-"
+STAGING_PREFIX = ".staging-"
+
+STAGES = ("normalized", "derived", "periods")
+
+# Generations kept behind the current one for readers still using them
+GENERATIONS_KEPT = 2
+# Staging directories left by a crashed writer are removed after this long
+STALE_STAGING_SECONDS = 60 * 60
+
+GENERATION_PATTERN = re.compile(rf"^{GENERATION_PREFIX}(\d+)$")
+
+
+# =========================
+# READERS
+# =========================
+
+def current_generation(company_dir):
+    """Name of the current generation, or None if none was published"""
+    try:
+        return (Path(company_dir) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_dir(company_dir) -> Path:
+    """Directory holding the current stage directories of a ticker"""
+    company_dir = Path(company_dir)
+    generation = current_generation(company_dir)
+    if generation is None:
+        return company_dir
+    return company_dir / GENERATIONS_DIR / generation
+
+
+def stage_dir(company_dir, stage: str) -> Path:
+    """Current directory of one stage ("normalized", "derived" or "periods")"""
+    return current_dir(company_dir) / stage
+
+
+def read_current(company_dir, read):
+    """
+    Read from the current generation
+
+    Args:
+        company_dir: data/<TICKER> directory
+        read: Callable taking the generation directory
+
+    Returns:
+        Whatever read returns; if the generation it resolved disappears
+        under it, it is called once more on the newest generation
+    """
+    directory = current_dir(company_dir)
+    try:
+        return read(directory)
+    except FileNotFoundError:
+        latest = current_dir(company_dir)
+        if latest == directory:
+            raise
+        return read(latest)
+
+
+def has_outputs(company_dir) -> bool:
+    """True if any statement was published for a ticker"""
+    return (current_dir(company_dir) / "normalized").is_dir()
+
+
+# =========================
+# WRITERS
+# =========================
+
+def generation_number(name: str):
+    """Sequence number of a generation directory name, or None for other names"""
+    match = GENERATION_PATTERN.match(name)
+    return int(match.group(1)) if match else None
+
+
+def list_generations(company_dir):
+    """Generation names of a ticker, oldest first"""
+    generations_dir = Path(company_dir) / GENERATIONS_DIR
+    if not generations_dir.is_dir():
+        return []
+    numbered = []
+    for entry in os.listdir(generations_dir):
+        number = generation_number(entry)
+        if number is not None:
+            numbered.append((number, entry))
+    return [name for _, name in sorted(numbered)]
+
+
+def begin_generation(company_dir) -> Path:
+    """
+    Create a staging directory holding a copy of the current outputs
+
+    Args:
+        company_dir: data/<TICKER> directory
+
+    Returns:
+        Staging directory; write stage directories into it, then
+        publish_generation() or discard_generation() it (creates the
+        ticker's generations directory if needed)
+    """
+    company_dir = Path(company_dir)
+    generations_dir = company_dir / GENERATIONS_DIR
+    generations_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=generations_dir))
+
+    source = current_dir(company_dir)
+    for stage in STAGES:
+        if (source / stage).is_dir():
+            shutil.copytree(source / stage, staging / stage)
+    return staging
+
+
+def discard_generation(staging):
+    """Delete an unpublished staging directory"""
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def publish_generation(company_dir, staging) -> str:
+    """
+    Make a staging directory the current generation
+
+    Call with the ticker lock held. CURRENT only ever moves forward: if
+    a newer generation became current meanwhile (a writer that does not
+    take the lock), this one is kept as a non-current generation and
+    pruned later.
+
+    Args:
+        company_dir: data/<TICKER> directory
+        staging: Directory returned by begin_generation()
+
+    Returns:
+        Name of the published generation
+    """
+    company_dir = Path(company_dir)
+    generations_dir = company_dir / GENERATIONS_DIR
+    existing = list_generations(company_dir)
+    number = generation_number(existing[-1]) + 1 if existing else 1
+
+    # Another writer may publish between listing and renaming; take the next free name
+    while True:
+        name = f"{GENERATION_PREFIX}{number:06d}"
+        try:
+            os.rename(staging, generations_dir / name)
+            break
+        except OSError:
+            if not (generations_dir / name).exists():
+                raise
+            number += 1
+
+    fsync_directory(generations_dir)
+
+    current = current_generation(company_dir)
+    if current is not None and (generation_number(current) or 0) > number:
+        logger.warning(f"Not publishing {company_dir.name} generation {name}: "
+                       f"newer generation {current} is already current")
+    else:
+        write_bytes_atomic(company_dir / CURRENT_FILE, name.encode())
+        logger.info(f"Published {company_dir.name} output generation {name}")
+    prune_generations(company_dir)
+    return name
+
+
+def build_generation(company_dir, build):
+    """
+    Run build(staging_dir) on a staging copy of the current outputs and
+    publish the result as the next generation
+
+    Call with the ticker lock held.
+
+    Args:
+        company_dir: data/<TICKER> directory
+        build: Callable writing stage directories into the staging directory
+
+    Returns:
+        Output of build; nothing is published when it returns None or
+        raises, and directories created for the staging copy are removed
+    """
+    company_dir = Path(company_dir)
+    created = [d for d in (company_dir, company_dir / GENERATIONS_DIR) if not d.exists()]
+    staging = begin_generation(company_dir)
+    try:
+        results = build(staging)
+    except BaseException:
+        discard_generation(staging)
+        remove_empty_dirs(created)
+        raise
+    if results is None:
+        discard_generation(staging)
+        remove_empty_dirs(created)
+    else:
+        publish_generation(company_dir, staging)
+    return results
+
+
+def remove_empty_dirs(directories):
+    """Remove directories, deepest first, that are still empty"""
+    for directory in reversed(directories):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+
+
+def prune_generations(company_dir, kept: int = GENERATIONS_KEPT):
+    """Delete generations older than the last `kept` before the current one, and stale staging directories"""
+    company_dir = Path(company_dir)
+    generations_dir = company_dir / GENERATIONS_DIR
+    current = current_generation(company_dir)
+    generations = [name for name in list_generations(company_dir) if name != current]
+    for name in generations[:max(0, len(generations) - kept)]:
+        shutil.rmtree(generations_dir / name, ignore_errors=True)
+
+    now = time.time()
+    for entry in os.listdir(generations_dir):
+        if not entry.startswith(STAGING_PREFIX):
+            continue
+        path = generations_dir / entry
+        try:
+            stale = now - path.stat().st_mtime > STALE_STAGING_SECONDS
+        except FileNotFoundError:
+            continue
+        if stale:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,475 @@
+"""
+Raw Store
+--------------------------
+Compressed storage of raw SEC companyfacts documents.
+
+Codecs:
+- zstd: data/<TICKER>/raw/company_facts.json.zst (needs the zstandard
+  package; optionally with a dictionary trained on stored documents)
+- gzip: data/<TICKER>/raw/company_facts.json.gz (stdlib)
+- json: data/<TICKER>/raw/company_facts.json (uncompressed)
+
+Every companyfacts document shares the same structure and mostly the
+same keys, so compact JSON compresses about 10x with gzip, and a zstd
+dictionary trained on a sample of documents does better still on small
+filers.
+
+Callers keep passing the logical path .../raw/company_facts.json:
+load_raw() reads whichever stored variant is newest, so every retriever
+reads any codec transparently. Decode and decompression failures are
+raised as json.JSONDecodeError, like serialization.load_file.
+
+Memory:
+- read_raw() / load_raw() decode the whole document, so they hold its
+  decompressed bytes once: the compressed file is streamed through the
+  decompressor into a buffer allocated at the size the codec records.
+- Readers that only touch part of the document (the selective parser)
+  memory-map uncompressed documents in place (map_raw()) and read
+  compressed ones as a stream of decompressed chunks (iter_raw()), so
+  resident memory stays independent of the document size and nothing
+  is written to disk.
+
+Usage:
+    cd src && python -m storage.raw_store [--codec gzip|zstd|json] [--train-dictionary]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from storage import serialization
+from storage.atomic_write import write_bytes_atomic
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_ROOT = PROJECT_ROOT / "data"
+
+RAW_STEM = "company_facts"
+
+CODEC_JSON = "json"
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+
+RAW_EXTENSIONS = {
+    CODEC_JSON: ".json",
+    CODEC_GZIP: ".json.gz",
+    CODEC_ZSTD: ".json.zst"
+}
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+# Longest zstd frame header (ZSTD_FRAMEHEADERSIZE_MAX)
+ZSTD_FRAME_HEADER_MAX_BYTES = 18
+
+# Optional trained zstd dictionaries shared by every document
+DICTIONARY_DIR = DATA_ROOT / "raw_dictionaries"
+DICTIONARY_SUFFIX = ".zstd-dict"
+DICTIONARY_SIZE = 112 * 1024
+DICTIONARY_SAMPLES = 500
+
+READ_CHUNK_BYTES = 1 << 20
+
+# gzip.BadGzipFile is an OSError
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+
+def available_codecs():
+    """Installed codecs, smallest output first"""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(CODEC_ZSTD)
+    codecs.extend([CODEC_GZIP, CODEC_JSON])
+    return codecs
+
+
+DEFAULT_CODEC = available_codecs()[0]
+
+
+# =========================
+# PATHS
+# =========================
+
+def raw_path(raw_dir, codec: str = DEFAULT_CODEC) -> Path:
+    """Path of the stored companyfacts document in a codec"""
+    if codec not in RAW_EXTENSIONS:
+        raise ValueError(f"Unknown raw codec: {codec}")
+    return Path(raw_dir) / f"{RAW_STEM}{RAW_EXTENSIONS[codec]}"
+
+
+def find_raw(raw_dir):
+    """
+    Most recently written companyfacts document of a raw directory
+
+    Returns:
+        Tuple of (path, codec) or None if no document is stored
+    """
+    candidates = []
+    for codec in RAW_EXTENSIONS:
+        path = raw_path(raw_dir, codec)
+        try:
+            candidates.append((path.stat().st_mtime_ns, path, codec))
+        except FileNotFoundError:
+            continue
+    if not candidates:
+        return None
+    _, path, codec = max(candidates)
+    return path, codec
+
+
+def resolve_raw(path):
+    """
+    Stored document for a companyfacts path, whatever its codec
+
+    Args:
+        path: A stored file, or the logical .../company_facts.json path
+
+    Returns:
+        Tuple of (path, codec)
+
+    Raises:
+        FileNotFoundError: If no document is stored there
+    """
+    path = Path(path)
+    for codec, extension in RAW_EXTENSIONS.items():
+        if path.name == RAW_STEM + extension:
+            found = find_raw(path.parent)
+            break
+    else:
+        # Any other file name is read as given, by its extension
+        codec = next((c for c, ext in RAW_EXTENSIONS.items() if c != CODEC_JSON and path.name.endswith(ext)),
+                     CODEC_JSON)
+        found = (path, codec) if path.exists() else None
+    if found is None:
+        raise FileNotFoundError(f"No stored companyfacts at {path}")
+    return found
+
+
+# =========================
+# ZSTD DICTIONARIES
+# =========================
+
+# dictionary id -> ZstdCompressionDict
+_dictionaries = {}
+
+
+def dictionary_path(dictionary_id: int, dictionary_dir=DICTIONARY_DIR) -> Path:
+    """Path of a trained dictionary, named by the id zstd records in every frame using it"""
+    return Path(dictionary_dir) / f"{dictionary_id}{DICTIONARY_SUFFIX}"
+
+
+def load_dictionary(dictionary_id: int, dictionary_dir=DICTIONARY_DIR):
+    """
+    Trained zstd dictionary by id
+
+    Raises:
+        FileNotFoundError: If the dictionary was deleted
+    """
+    key = (str(dictionary_dir), dictionary_id)
+    if key not in _dictionaries:
+        data = dictionary_path(dictionary_id, dictionary_dir).read_bytes()
+        _dictionaries[key] = zstandard.ZstdCompressionDict(data)
+    return _dictionaries[key]
+
+
+def latest_dictionary(dictionary_dir=DICTIONARY_DIR):
+    """Most recently trained dictionary, used to compress new documents, or None"""
+    if zstandard is None or not Path(dictionary_dir).is_dir():
+        return None
+    trained = []
+    for path in Path(dictionary_dir).glob(f"*{DICTIONARY_SUFFIX}"):
+        trained.append((path.stat().st_mtime_ns, int(path.name[:-len(DICTIONARY_SUFFIX)])))
+    if not trained:
+        return None
+    return load_dictionary(max(trained)[1], dictionary_dir)
+
+
+def train_dictionary(sample_paths, dictionary_dir=DICTIONARY_DIR, size: int = DICTIONARY_SIZE):
+    """
+    Train a zstd dictionary on stored companyfacts documents
+
+    Documents written afterwards use it; earlier dictionaries are kept,
+    since the documents compressed with them still need them to be read.
+
+    Args:
+        sample_paths: Stored companyfacts files, any codec
+        dictionary_dir: Directory of trained dictionaries
+        size: Dictionary size in bytes
+
+    Returns:
+        Path written
+    """
+    if zstandard is None:
+        raise RuntimeError("Training a dictionary needs the zstandard package")
+    # zstandard takes samples as bytes only
+    samples = [bytes(read_raw(path)) for path in sample_paths]
+    dictionary = zstandard.train_dictionary(size, samples)
+    Path(dictionary_dir).mkdir(parents=True, exist_ok=True)
+    path = write_bytes_atomic(dictionary_path(dictionary.dict_id(), dictionary_dir), dictionary.as_bytes())
+    logger.info(f"Trained {size // 1024} KiB zstd dictionary {dictionary.dict_id()} on {len(samples)} documents")
+    return path
+
+
+# =========================
+# READ / WRITE
+# =========================
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC, dictionary_dir=DICTIONARY_DIR) -> bytes:
+    """Encode document bytes for storage in a codec"""
+    if codec == CODEC_GZIP:
+        # mtime=0 keeps the output a pure function of the document
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("The zstd raw codec needs the zstandard package")
+        dictionary = latest_dictionary(dictionary_dir)
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary).compress(data)
+    if codec == CODEC_JSON:
+        return data
+    raise ValueError(f"Unknown raw codec: {codec}")
+
+
+def write_raw(raw_dir, content: bytes, codec: str = DEFAULT_CODEC) -> Path:
+    """
+    Atomically store a companyfacts document, replacing any stored copy
+
+    Args:
+        raw_dir: data/<TICKER>/raw directory
+        content: Compact JSON bytes of the document
+        codec: CODEC_ZSTD, CODEC_GZIP or CODEC_JSON
+
+    Returns:
+        Path written
+    """
+    path = write_bytes_atomic(raw_path(raw_dir, codec), compress(content, codec))
+    # Readers take the newest variant; drop the others so they cannot shadow it
+    for other in RAW_EXTENSIONS:
+        if other != codec:
+            try:
+                os.unlink(raw_path(raw_dir, other))
+            except FileNotFoundError:
+                pass
+    return path
+
+
+def open_raw(path, codec: str, dictionary_dir=DICTIONARY_DIR):
+    """Binary file object that decompresses a stored document as it is read"""
+    if codec == CODEC_GZIP:
+        return gzip.open(path, "rb")
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} needs the zstandard package")
+        f = open(path, "rb")
+        try:
+            # The frame header names the dictionary it was compressed with (0: none)
+            dictionary_id = zstandard.get_frame_parameters(f.read(ZSTD_FRAME_HEADER_MAX_BYTES)).dict_id
+            f.seek(0)
+            dictionary = load_dictionary(dictionary_id, dictionary_dir) if dictionary_id else None
+        except BaseException:
+            f.close()
+            raise
+        return zstandard.ZstdDecompressor(dict_data=dictionary).stream_reader(f, closefd=True)
+    return open(path, "rb")
+
+
+def decompressed_size(path, codec: str):
+    """
+    Size of a stored document's JSON bytes as its codec records it
+
+    gzip records it modulo 2**32 and zstd frames may omit it, so this is
+    a hint for sizing buffers, not a bound.
+
+    Returns:
+        Size in bytes, or None if the codec does not record it
+    """
+    with open(path, "rb") as f:
+        if codec == CODEC_GZIP:
+            if f.seek(0, os.SEEK_END) < 4:
+                return None
+            f.seek(-4, os.SEEK_END)
+            return struct.unpack("<I", f.read(4))[0]
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                return None
+            content_size = zstandard.get_frame_parameters(f.read(ZSTD_FRAME_HEADER_MAX_BYTES)).content_size
+            return None if content_size == zstandard.CONTENTSIZE_UNKNOWN else content_size
+        return os.fstat(f.fileno()).st_size
+
+
+def read_raw(path) -> bytearray:
+    """
+    Decompressed JSON bytes of a stored companyfacts document
+
+    The stored file is streamed through the decompressor into a buffer
+    of the recorded size, so only the decompressed document is held.
+
+    Args:
+        path: A stored file, or the logical .../company_facts.json path
+
+    Returns:
+        The document's JSON as a bytearray
+
+    Raises:
+        FileNotFoundError: If no document is stored
+        json.JSONDecodeError: If the stored file is truncated or corrupt
+    """
+    path, codec = resolve_raw(path)
+    try:
+        buffer = bytearray(decompressed_size(path, codec) or 0)
+        filled = 0
+        with open_raw(path, codec) as f:
+            while True:
+                if filled == len(buffer):
+                    # The recorded size was short (or missing): keep reading
+                    chunk = f.read(READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    filled = len(buffer)
+                    continue
+                with memoryview(buffer) as view:
+                    read = f.readinto(view[filled:])
+                if not read:
+                    break
+                filled += read
+    except FileNotFoundError:
+        raise
+    except DECOMPRESSION_ERRORS as e:
+        raise json.JSONDecodeError(f"Corrupt compressed companyfacts {path}: {e}", "", 0) from None
+    del buffer[filled:]
+    return buffer
+
+
+def iter_raw(path, chunk_size: int = None):
+    """
+    Decompressed JSON bytes of a stored companyfacts document, chunk by chunk
+
+    Args:
+        path: A stored file, or the logical .../company_facts.json path
+        chunk_size: Bytes per chunk (default: READ_CHUNK_BYTES)
+
+    Yields:
+        bytes chunks, in document order
+
+    Raises:
+        FileNotFoundError: If no document is stored
+        json.JSONDecodeError: If the stored file is truncated or corrupt
+    """
+    path, codec = resolve_raw(path)
+    chunk_size = chunk_size or READ_CHUNK_BYTES
+    try:
+        with open_raw(path, codec) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    except FileNotFoundError:
+        raise
+    except DECOMPRESSION_ERRORS as e:
+        raise json.JSONDecodeError(f"Corrupt compressed companyfacts {path}: {e}", "", 0) from None
+
+
+@contextmanager
+def map_raw(path):
+    """
+    Read-only memory map of an uncompressed stored document
+
+    Compressed documents cannot be mapped; read them with iter_raw().
+
+    Args:
+        path: A stored file, or the logical .../company_facts.json path
+
+    Raises:
+        FileNotFoundError: If no document is stored
+        ValueError: If the stored document is compressed
+        json.JSONDecodeError: If the document is empty
+    """
+    path, codec = resolve_raw(path)
+    if codec != CODEC_JSON:
+        raise ValueError(f"Cannot map compressed companyfacts {path}; use iter_raw()")
+
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            raise json.JSONDecodeError("Empty companyfacts file", "", 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def load_raw(path) -> dict:
+    """
+    Decode a stored companyfacts document, whatever its codec
+
+    Raises:
+        FileNotFoundError: If no document is stored
+        json.JSONDecodeError: If the document is corrupt
+    """
+    return serialization.loads(read_raw(path))
+
+
+# =========================
+# MIGRATION
+# =========================
+
+def compress_stored(data_root=DATA_ROOT, codec: str = DEFAULT_CODEC):
+    """
+    Re-encode every stored companyfacts document in a codec
+
+    Returns:
+        Tuple of (documents re-encoded, bytes before, bytes after)
+    """
+    converted = before = after = 0
+    for raw_dir in sorted(Path(data_root).glob("*/raw")):
+        found = find_raw(raw_dir)
+        if found is None or found[1] == codec:
+            continue
+        path, _ = found
+        before += path.stat().st_size
+        # Compact before compressing: older documents were stored indented
+        content = serialization.dumps(load_raw(path))
+        after += write_raw(raw_dir, content, codec).stat().st_size
+        converted += 1
+    logger.info(f"Re-encoded {converted} companyfacts documents as {codec}: {before:,} → {after:,} bytes")
+    return converted, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress stored companyfacts documents")
+    parser.add_argument("--codec", choices=list(RAW_EXTENSIONS), default=DEFAULT_CODEC)
+    parser.add_argument("--data-root", default=str(DATA_ROOT))
+    parser.add_argument("--train-dictionary", action="store_true",
+                        help="Train a zstd dictionary on stored documents first")
+    args = parser.parse_args()
+
+    if args.train_dictionary:
+        samples = [found[0] for raw_dir in sorted(Path(args.data_root).glob("*/raw"))
+                   if (found := find_raw(raw_dir)) is not None][:DICTIONARY_SAMPLES]
+        train_dictionary(samples)
+    compress_stored(args.data_root, args.codec)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Serialization
+--------------------------
+Single JSON layer for every read and write path.
+
+Uses the fastest backend available, in order:
+- orjson
+- msgspec
+- stdlib json
+
+Everything works on bytes. Decode failures are always raised as
+json.JSONDecodeError, so callers keep a single except clause whatever
+backend is active.
+
+Files are replaced atomically (storage/atomic_write.py) and may carry a
+checksum footer, which load_file checks and strips.
+"""
+
+import json
+from pathlib import Path
+
+from storage.atomic_write import strip_checksum, write_bytes_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# =========================
+# BACKENDS
+# =========================
+
+BACKEND_ORJSON = "orjson"
+BACKEND_MSGSPEC = "msgspec"
+BACKEND_STDLIB = "json"
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    backends = []
+    if orjson is not None:
+        backends.append(BACKEND_ORJSON)
+    if msgspec is not None:
+        backends.append(BACKEND_MSGSPEC)
+    backends.append(BACKEND_STDLIB)
+    return backends
+
+
+BACKEND = available_backends()[0]
+
+
+def set_backend(name: str):
+    """
+    Force a backend (benchmarks and debugging)
+
+    Args:
+        name: One of available_backends()
+    """
+    global BACKEND
+    if name not in available_backends():
+        raise ValueError(f"JSON backend not available: {name}")
+    BACKEND = name
+
+
+# =========================
+# BYTES API
+# =========================
+
+def loads(data):
+    """
+    Decode JSON from bytes or str
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON
+    """
+    if BACKEND == BACKEND_ORJSON:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        return orjson.loads(data)
+
+    if BACKEND == BACKEND_MSGSPEC:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), "", 0) from None
+
+    return json.loads(data)
+
+
+def dumps(obj, pretty: bool = False) -> bytes:
+    """
+    Encode to UTF-8 JSON bytes
+
+    Args:
+        obj: Object to encode
+        pretty: Two-space indented output for files read by people;
+                compact output otherwise
+    """
+    if BACKEND == BACKEND_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    if BACKEND == BACKEND_MSGSPEC:
+        data = msgspec.json.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# =========================
+# FILE API
+# =========================
+
+def load_file(path):
+    """
+    Read and decode a JSON file
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        json.JSONDecodeError: If the file is not valid JSON or fails its checksum
+    """
+    with open(Path(path), "rb") as f:
+        data = f.read()
+    try:
+        data = strip_checksum(data)
+    except ValueError as e:
+        raise json.JSONDecodeError(f"{e}: {path}", "", 0) from None
+    return loads(data)
+
+
+def dump_file(obj, path, pretty: bool = False, checksum: bool = False, durable: bool = True):
+    """
+    Encode and atomically write a JSON file
+
+    Args:
+        obj: Object to encode
+        path: Output path
+        pretty: Indented output (see dumps)
+        checksum: Append a checksum footer (see atomic_write)
+        durable: fsync before and after the rename
+    """
+    write_bytes_atomic(path, dumps(obj, pretty=pretty), checksum=checksum, durable=durable)
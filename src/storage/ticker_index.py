@@ -0,0 +1,269 @@
+"""
+Ticker Index
+--------------------------
+In-memory ticker ↔ CIK lookups built from the SEC company_tickers.json.
+
+Inputs:
+- data/company_tickers.json (refreshed by scheduler/update_tickers.py)
+
+Outputs:
+- data/company_tickers.index.pickle: compact pickled index next to it
+- TickerIndex: ticker → CIK, CIK → ticker and company name prefix search
+
+The SEC file is keyed by row number, so finding a ticker in it is a scan.
+The index is rebuilt on every ticker update and loaded lazily, once per
+process; after that every lookup is a dictionary or bisect lookup with
+no file I/O. A pickle older than its source file is rebuilt on load.
+"""
+
+import logging
+import pickle
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from storage import serialization
+from storage.atomic_write import write_bytes_atomic
+
+
+# =========================
+# LOGGING
+# =========================
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# CONFIG
+# =========================
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+COMPANY_TICKERS_PATH = PROJECT_ROOT / "data" / "company_tickers.json"
+
+INDEX_SUFFIX = ".index.pickle"
+INDEX_VERSION = 1
+
+DEFAULT_SEARCH_LIMIT = 10
+
+
+# =========================
+# TICKER INDEX
+# =========================
+
+def index_path_for(tickers_path):
+    """Pickled index that sits next to a company_tickers.json file"""
+    tickers_path = Path(tickers_path)
+    return tickers_path.with_name(tickers_path.stem + INDEX_SUFFIX)
+
+
+class TickerIndex:
+    """
+    Ticker ↔ CIK lookups over one company_tickers.json snapshot
+
+    A CIK listing several share classes maps back to the first ticker
+    SEC lists for it, which is its primary listing.
+    """
+
+    def __init__(self, ticker_to_cik: dict, cik_to_ticker: dict, titles: dict, names=None, name_tickers=None):
+        """
+        Args:
+            ticker_to_cik: Upper-case ticker → int CIK
+            cik_to_ticker: int CIK → primary upper-case ticker
+            titles: Upper-case ticker → company name
+            names: Sorted upper-case company names (built from titles if None)
+            name_tickers: Ticker of each entry of names
+        """
+        self.ticker_to_cik = ticker_to_cik
+        self.cik_to_ticker = cik_to_ticker
+        self.titles = titles
+
+        # Sorted upper-case names with the matching tickers, for prefix search
+        if names is None or name_tickers is None:
+            rows = sorted((title.upper(), ticker) for ticker, title in titles.items())
+            names = [name for name, _ in rows]
+            name_tickers = [ticker for _, ticker in rows]
+        self.names = names
+        self.name_tickers = name_tickers
+
+    @classmethod
+    def from_company_tickers(cls, company_tickers: dict):
+        """
+        Build the index from the SEC company_tickers.json dictionary
+
+        Args:
+            company_tickers: {"0": {"cik_str": ..., "ticker": ..., "title": ...}, ...}
+        """
+        ticker_to_cik = {}
+        cik_to_ticker = {}
+        titles = {}
+        for record in company_tickers.values():
+            ticker = record["ticker"].upper()
+            cik = int(record["cik_str"])
+            cik_to_ticker.setdefault(cik, ticker)
+            if ticker not in ticker_to_cik:
+                ticker_to_cik[ticker] = cik
+                titles[ticker] = record.get("title", "")
+        return cls(ticker_to_cik, cik_to_ticker, titles)
+
+    def __len__(self):
+        return len(self.ticker_to_cik)
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self.ticker_to_cik
+
+    def cik_for(self, ticker: str):
+        """CIK of a ticker (int), or None if SEC does not list it"""
+        return self.ticker_to_cik.get(ticker.upper())
+
+    def ticker_for(self, cik):
+        """Primary ticker of a CIK, or None if SEC does not list it"""
+        return self.cik_to_ticker.get(int(cik))
+
+    def title_for(self, ticker: str):
+        """Company name of a ticker, or None if SEC does not list it"""
+        return self.titles.get(ticker.upper())
+
+    def tickers(self):
+        """Every ticker, in SEC file order"""
+        return list(self.ticker_to_cik)
+
+    def search(self, prefix: str, limit: int = DEFAULT_SEARCH_LIMIT):
+        """
+        Companies whose name starts with a prefix (case-insensitive)
+
+        Args:
+            prefix: Start of the company name
+            limit: Maximum number of matches
+
+        Returns:
+            List of {"ticker", "cik", "title"} in name order
+        """
+        prefix = prefix.upper()
+        matches = []
+        position = bisect_left(self.names, prefix)
+        while position < len(self.names) and len(matches) < limit and self.names[position].startswith(prefix):
+            ticker = self.name_tickers[position]
+            matches.append({"ticker": ticker, "cik": self.ticker_to_cik[ticker], "title": self.titles[ticker]})
+            position += 1
+        return matches
+
+    # =========================
+    # PERSISTENCE
+    # =========================
+
+    def save(self, index_path, source_mtime_ns=None):
+        """
+        Pickle the index, replacing any previous one atomically
+
+        Args:
+            index_path: Output path
+            source_mtime_ns: Modification time of the company_tickers.json it was built from
+        """
+        state = {
+            "version": INDEX_VERSION,
+            "source_mtime_ns": source_mtime_ns,
+            "ticker_to_cik": self.ticker_to_cik,
+            "cik_to_ticker": self.cik_to_ticker,
+            "titles": self.titles,
+            "names": self.names,
+            "name_tickers": self.name_tickers
+        }
+        write_bytes_atomic(index_path, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def load(cls, index_path, source_mtime_ns=None):
+        """
+        Unpickle an index
+
+        Args:
+            index_path: Path written by save()
+            source_mtime_ns: If given, reject an index built from another version of the source
+
+        Returns:
+            TickerIndex, or None if the file is missing, unreadable or stale
+        """
+        try:
+            with open(index_path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            logger.warning(f"Unreadable ticker index {index_path}: {e}")
+            return None
+
+        if state.get("version") != INDEX_VERSION:
+            return None
+        if source_mtime_ns is not None and state.get("source_mtime_ns") != source_mtime_ns:
+            return None
+        return cls(state["ticker_to_cik"], state["cik_to_ticker"], state["titles"],
+                   state["names"], state["name_tickers"])
+
+
+# =========================
+# BUILD / LOAD
+# =========================
+
+def build_ticker_index(tickers_path=COMPANY_TICKERS_PATH):
+    """
+    Build the index from company_tickers.json and pickle it next to it
+
+    Args:
+        tickers_path: Path to company_tickers.json
+
+    Returns:
+        TickerIndex
+    """
+    tickers_path = Path(tickers_path)
+    source_mtime_ns = tickers_path.stat().st_mtime_ns
+    index = TickerIndex.from_company_tickers(serialization.load_file(tickers_path))
+    index.save(index_path_for(tickers_path), source_mtime_ns)
+    logger.info(f"Built ticker index of {len(index)} tickers from {tickers_path}")
+    return index
+
+
+def load_ticker_index(tickers_path=COMPANY_TICKERS_PATH):
+    """
+    Load the pickled index of company_tickers.json, rebuilding it if missing or stale
+
+    Args:
+        tickers_path: Path to company_tickers.json
+
+    Returns:
+        TickerIndex
+
+    Raises:
+        FileNotFoundError: If company_tickers.json does not exist
+    """
+    tickers_path = Path(tickers_path)
+    index = TickerIndex.load(index_path_for(tickers_path), tickers_path.stat().st_mtime_ns)
+    if index is None:
+        index = build_ticker_index(tickers_path)
+    return index
+
+
+# =========================
+# SHARED INSTANCES
+# =========================
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ticker_index(tickers_path=COMPANY_TICKERS_PATH) -> TickerIndex:
+    """Process-wide TickerIndex of a company_tickers.json, loaded on first use"""
+    key = str(Path(tickers_path).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = load_ticker_index(tickers_path)
+        return _indexes[key]
+
+
+def refresh_ticker_index(tickers_path=COMPANY_TICKERS_PATH) -> TickerIndex:
+    """Rebuild the index after company_tickers.json changed and swap it in for this process"""
+    index = build_ticker_index(tickers_path)
+    with _indexes_lock:
+        _indexes[str(Path(tickers_path).resolve())] = index
+    return index
@@ -0,0 +1,129 @@
+"""
+Ticker Lock
+--------------------------
+Per-ticker writer lock (data/<TICKER>/.lock) with a timeout and
+contention metrics.
+
+Only writers take it: downloading companyfacts into raw/ and
+publishing a new output generation (storage/generations.py). Readers
+read the current generation without it.
+
+Acquisition first tries without waiting; only a lock held by another
+writer counts as contended and is timed. filelock.Timeout is raised
+when the lock is not acquired within the timeout, so a caller that can
+serve existing outputs passes timeout=0 and never waits.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from filelock import FileLock, Timeout
+
+
+# =========================
+# CONFIG
+# =========================
+
+LOCK_FILE = ".lock"
+
+# Longest a writer waits for another writer of the same ticker
+DEFAULT_LOCK_TIMEOUT_SECONDS = 300
+
+
+# =========================
+# METRICS
+# =========================
+
+class LockMetrics:
+    """
+    Process-wide counters of ticker lock acquisitions
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            self.acquisitions = 0
+            self.contended = 0
+            self.timeouts = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record(self, waited: float, contended: bool, acquired: bool):
+        """Record one acquisition attempt"""
+        with self._lock:
+            if acquired:
+                self.acquisitions += 1
+            else:
+                self.timeouts += 1
+            if contended:
+                self.contended += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self):
+        """Counters plus contention rate and mean wait of contended attempts"""
+        with self._lock:
+            attempts = self.acquisitions + self.timeouts
+            return {
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+                "timeouts": self.timeouts,
+                "contention_rate": self.contended / attempts if attempts else 0.0,
+                "mean_wait_seconds": self.wait_seconds / self.contended if self.contended else 0.0,
+                "max_wait_seconds": self.max_wait_seconds
+            }
+
+
+metrics = LockMetrics()
+
+
+def lock_stats():
+    """Ticker lock metrics of this process"""
+    return metrics.stats()
+
+
+# =========================
+# LOCK
+# =========================
+
+@contextmanager
+def ticker_lock(company_dir, timeout: float = DEFAULT_LOCK_TIMEOUT_SECONDS):
+    """
+    Hold a ticker's writer lock
+
+    Args:
+        company_dir: data/<TICKER> directory (created if missing)
+        timeout: Seconds to wait for another writer; 0 fails at once
+
+    Raises:
+        filelock.Timeout: If the lock is still held by another writer after timeout
+    """
+    company_dir = Path(company_dir)
+    company_dir.mkdir(parents=True, exist_ok=True)
+    lock = FileLock(str(company_dir / LOCK_FILE))
+
+    started = time.perf_counter()
+    contended = False
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        contended = True
+        try:
+            if timeout <= 0:
+                raise
+            lock.acquire(timeout=timeout)
+        except Timeout:
+            metrics.record(time.perf_counter() - started, contended, acquired=False)
+            raise
+    metrics.record(time.perf_counter() - started, contended, acquired=True)
+
+    try:
+        yield lock
+    finally:
+        lock.release()
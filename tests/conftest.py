@@ -0,0 +1,95 @@
+"""
+Shared test fixtures
+
+Modules under src/ import each other as top-level packages (storage,
+retrievers, ...) and the scheduler modules import their siblings
+directly, so both directories go on sys.path, as PYTHONPATH does when
+they are run.
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT / "src", ROOT / "src" / "scheduler"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+# =========================
+# STUB HTTP SERVER
+# =========================
+
+class StubServer:
+    """
+    Local HTTP server answering scripted responses per path
+
+    route(path, *responses) queues responses for a path; each request
+    takes the next one and the last one repeats. A response is a tuple
+    (status, headers dict, body bytes) or a callable taking the request
+    handler and returning one.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._serve(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def route(self, path, *responses):
+        with self._lock:
+            self.routes[path] = list(responses)
+
+    def hits(self, path):
+        """Requests received for a path, as (monotonic time, headers) tuples"""
+        with self._lock:
+            return [(t, headers) for t, p, headers in self.requests if p == path]
+
+    def _serve(self, handler):
+        with self._lock:
+            self.requests.append((time.monotonic(), handler.path, dict(handler.headers)))
+            responses = self.routes.get(handler.path)
+            if not responses:
+                response = (404, {}, b"not found")
+            elif len(responses) > 1:
+                response = responses.pop(0)
+            else:
+                response = responses[0]
+        if callable(response):
+            response = response(handler)
+        status, headers, body = response
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
@@ -0,0 +1,89 @@
+import zipfile
+
+import pytest
+
+from retrievers import bulk_ingest
+from retrievers.batch_pipeline import STATUS_FAILED, STATUS_OK, STATUS_SKIPPED
+from storage import serialization
+from storage.fact_store import read_statement
+from storage.generations import current_generation, stage_dir
+from storage.raw_store import read_raw
+
+RDDT_CIK = 1713445
+REGISTRY_PATH = str(bulk_ingest.PROJECT_ROOT / bulk_ingest.REGISTRY_PATH)
+RDDT_RAW = bulk_ingest.DATA_ROOT / "RDDT" / "raw" / "company_facts.json"
+RDDT_NORMALIZED = bulk_ingest.DATA_ROOT / "RDDT" / "normalized"
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """Synthetic companyfacts.zip: RDDT, an unmapped CIK and a corrupt member"""
+    path = tmp_path / "companyfacts.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"CIK{RDDT_CIK:010d}.json", read_raw(RDDT_RAW))
+        zf.writestr("CIK0000000002.json", serialization.dumps({"cik": 2, "facts": {}}))
+        zf.writestr("CIK0000000003.json", b'{"cik": 3, "facts": {')
+        zf.writestr("README.txt", b"not a company")
+    return path
+
+
+@pytest.fixture
+def tickers_path(tmp_path):
+    path = tmp_path / "company_tickers.json"
+    path.write_bytes(serialization.dumps({
+        "0": {"cik_str": RDDT_CIK, "ticker": "RDDT", "title": "Reddit, Inc."},
+        "1": {"cik_str": 3, "ticker": "BAD", "title": "Corrupt Member Inc."}
+    }))
+    return path
+
+
+def test_cik_from_member_name():
+    assert bulk_ingest.cik_from_member_name("CIK0000320193.json") == 320193
+    assert bulk_ingest.cik_from_member_name("README.txt") is None
+    assert bulk_ingest.cik_from_member_name("CIKabc.json") is None
+
+
+def test_bulk_ingest_writes_published_outputs(archive, tickers_path, tmp_path):
+    data_root = tmp_path / "data"
+
+    results = bulk_ingest.run_bulk_ingest(archive, max_workers=2, tickers_path=tickers_path,
+                                          data_root=data_root, registry_path=REGISTRY_PATH,
+                                          only_mapped=False)
+
+    statuses = {result["ticker"]: result["status"] for result in results}
+    assert statuses == {"RDDT": STATUS_OK, "CIK0000000002.json": STATUS_SKIPPED, "BAD": STATUS_FAILED}
+    assert next(r for r in results if r["ticker"] == "RDDT")["facts"] > 0
+
+    # Outputs match the tracked per-ticker pipeline output
+    assert current_generation(data_root / "RDDT") is not None
+    for statement in ("income_statement", "balance_sheet", "cash_flow_statement"):
+        written = read_statement(stage_dir(data_root / "RDDT", "normalized"), statement)
+        expected = read_statement(RDDT_NORMALIZED, statement)
+        assert written["facts"] == expected["facts"]
+
+    # A failed member publishes nothing
+    assert not (data_root / "BAD").exists()
+
+
+def test_only_mapped_skips_unmapped_members_before_dispatch(archive, tickers_path, tmp_path):
+    results = bulk_ingest.run_bulk_ingest(archive, max_workers=1, tickers_path=tickers_path,
+                                          data_root=tmp_path / "data", registry_path=REGISTRY_PATH)
+
+    assert sorted(result["ticker"] for result in results) == ["BAD", "RDDT"]
+
+
+def test_every_share_class_gets_outputs(archive, tmp_path):
+    tickers_path = tmp_path / "share_classes.json"
+    tickers_path.write_bytes(serialization.dumps({
+        "0": {"cik_str": RDDT_CIK, "ticker": "RDDT", "title": "Reddit, Inc."},
+        "1": {"cik_str": RDDT_CIK, "ticker": "RDDT-B", "title": "Reddit, Inc."}
+    }))
+    data_root = tmp_path / "data"
+
+    results = bulk_ingest.run_bulk_ingest(archive, max_workers=1, tickers_path=tickers_path,
+                                          data_root=data_root, registry_path=REGISTRY_PATH)
+
+    assert sorted((r["ticker"], r["status"]) for r in results) == [("RDDT", STATUS_OK), ("RDDT-B", STATUS_OK)]
+    written = read_statement(stage_dir(data_root / "RDDT-B", "normalized"), "income_statement")
+    expected = read_statement(RDDT_NORMALIZED, "income_statement")["facts"]
+    assert written["facts"] == [{**fact, "company": "RDDT-B"} for fact in expected]
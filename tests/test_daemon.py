@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+import daemon
+from daemon import JOB_DOWNLOAD, JOB_POLL_FILINGS, SchedulerDaemon
+from job_queue import STATUS_DONE, STATUS_PENDING, JobQueue
+from sec_client import SecClient
+from storage import serialization
+from submissions_poller import SubmissionsPoller
+
+RDDT_CIK = 1713445
+FILING = {"cik": RDDT_CIK, "accession": "0001713445-25-000010", "form": "10-Q", "filed": "2025-02-14"}
+
+
+@pytest.fixture
+def scheduler(stub_server, tmp_path, monkeypatch):
+    client = SecClient(rate_limit=1000, max_retries=0,
+                       data_base_url=stub_server.url, www_base_url=stub_server.url)
+    # Already polled today: handle_poll_filings only drains the change queue
+    state_path = tmp_path / "submissions_state.json"
+    serialization.dump_file({"last_polled_day": date.today().isoformat()}, state_path)
+    poller = SubmissionsPoller(client, state_path, tmp_path / "change_queue.json", {RDDT_CIK: "RDDT"})
+    with poller.queue.lock:
+        poller.queue.load()
+        poller.queue.add("RDDT", FILING)
+        poller.queue.save()
+
+    monkeypatch.setattr(daemon, "has_outputs", lambda company_dir: True)
+    queue = JobQueue(tmp_path / "scheduler.db")
+    yield SchedulerDaemon(queue, workers=0, client=client, poller=poller)
+    queue.close()
+
+
+def stored_document(monkeypatch, accessions):
+    """SEC still serves the stored companyfacts, which has these filings"""
+    monkeypatch.setattr(daemon, "download_companyfacts_if_modified", lambda ticker, client: (None, {}))
+    monkeypatch.setattr(daemon, "load_companyfacts_manifest", lambda ticker: {"accessions": accessions})
+
+
+def run_poll(scheduler):
+    scheduler.submit(JOB_POLL_FILINGS)
+    assert scheduler.run_pending(max_jobs=1) == 1
+    return scheduler.queue.claim("test", job_types=[JOB_DOWNLOAD])
+
+
+def test_poll_queues_download_and_keeps_change_queue_entry(scheduler):
+    job = run_poll(scheduler)
+
+    assert job["key"] == "RDDT"
+    assert job["payload"] == {"accessions": [FILING["accession"]]}
+    assert "RDDT" in scheduler.poller().queue.load().entries
+
+
+def test_download_lagging_behind_filing_is_retried(scheduler, monkeypatch):
+    stored_document(monkeypatch, ["0001713445-24-000001"])
+    job = run_poll(scheduler)
+    lagging_polls = scheduler.poller().queue.load().entries["RDDT"]["lagging_polls"]
+
+    assert not scheduler.run_job(job)
+
+    assert scheduler.queue.get(job["id"])["status"] == STATUS_PENDING
+    assert "RDDT" in scheduler.poller().queue.load().entries
+
+    # The next poll counts the lag and queues the download again
+    scheduler.queue.complete(job["id"])
+    assert run_poll(scheduler)["key"] == "RDDT"
+    assert scheduler.poller().queue.load().entries["RDDT"]["lagging_polls"] == lagging_polls + 1
+
+
+def test_download_with_filing_completes_change_queue_entry(scheduler, monkeypatch):
+    stored_document(monkeypatch, ["0001713445-24-000001", FILING["accession"]])
+    job = run_poll(scheduler)
+
+    assert scheduler.run_job(job)
+
+    assert scheduler.queue.get(job["id"])["status"] == STATUS_DONE
+    assert not scheduler.poller().queue.load().entries
@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+
+from models.fact import Fact
+from retrievers.derivation_engine import DerivationPlan
+from retrievers.extraction_engine import ExtractionEngine, FactType
+from storage.raw_store import DATA_ROOT, load_raw
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+REVENUE_TAG = "RevenueFromContractWithCustomerExcludingAssessedTax"
+
+
+def spec(derivation_type, derived_from):
+    return {"statement": "income_statement", "derivation_type": derivation_type, "derived_from": derived_from}
+
+
+@pytest.fixture(scope="module")
+def rddt():
+    logging.disable(logging.CRITICAL)
+    companyfacts = load_raw(DATA_ROOT / "RDDT" / "raw" / "company_facts.json")
+    extracted = ExtractionEngine(REGISTRY_PATH).extract("RDDT", companyfacts)[FactType.INCOME_STATEMENT]
+    logging.disable(logging.NOTSET)
+    return companyfacts, extracted
+
+
+def reported(companyfacts, start, end):
+    """Value SEC filings report for RDDT revenue over exactly [start, end], latest filing first"""
+    facts = companyfacts["facts"]["us-gaap"][REVENUE_TAG]["units"]["USD"]
+    matches = sorted((f for f in facts if f.get("start") == start and f["end"] == end), key=lambda f: f["filed"])
+    return matches[-1]["val"]
+
+
+def evaluate(rddt, registry):
+    _, extracted = rddt
+    derived = DerivationPlan(registry).evaluate("RDDT", extracted["normalized"], extracted["periods"])
+    return {(fact.concept, fact.period): fact for fact in derived}
+
+
+def test_ttm_matches_annual_filings(rddt):
+    companyfacts, _ = rddt
+    derived = evaluate(rddt, {"ttm_revenue": spec("ttm", ["revenue"])})
+
+    for year in (2023, 2024):
+        fact = derived[("ttm_revenue", f"TTM-Q4-{year}")]
+        assert (fact.start, fact.end) == (f"{year}-01-01", f"{year}-12-31")
+        assert fact.value == reported(companyfacts, f"{year}-01-01", f"{year}-12-31")
+
+    # A TTM straddling fiscal years: FY2024 - Q1 2024 + Q1 2025
+    expected = (reported(companyfacts, "2024-01-01", "2024-12-31")
+                - reported(companyfacts, "2024-01-01", "2024-03-31")
+                + reported(companyfacts, "2025-01-01", "2025-03-31"))
+    assert derived[("ttm_revenue", "TTM-Q1-2025")].value == expected
+
+
+def test_yoy_growth_compares_dated_quarters(rddt):
+    companyfacts, _ = rddt
+    derived = evaluate(rddt, {"revenue_growth": spec("yoy_growth", ["revenue"])})
+
+    q1_2025 = reported(companyfacts, "2025-01-01", "2025-03-31")
+    q1_2024 = reported(companyfacts, "2024-01-01", "2024-03-31")
+    fact = derived[("revenue_growth", "Q1-2025")]
+    assert fact.value == pytest.approx((q1_2025 - q1_2024) / q1_2024)
+    assert fact.value == pytest.approx(0.615, abs=0.001)
+
+    # Q4 is decomposed from the annual value, so it has a growth rate too
+    q4 = lambda year: (reported(companyfacts, f"{year}-01-01", f"{year}-12-31")
+                       - reported(companyfacts, f"{year}-01-01", f"{year}-09-30"))
+    assert derived[("revenue_growth", "Q4-2024")].value == pytest.approx((q4(2024) - q4(2023)) / q4(2023))
+
+    # The first year has nothing to compare against
+    assert ("revenue_growth", "Q1-2023") not in derived
+
+
+def test_derived_from_ttm_stays_dated(rddt):
+    derived = evaluate(rddt, {
+        "ttm_revenue": spec("ttm", ["revenue"]),
+        "ttm_revenue_growth": spec("yoy_growth", ["ttm_revenue"]),
+        "ttm_gross_margin": spec("ratio", ["gross_profit", "ttm_revenue"])
+    })
+
+    growth = derived[("ttm_revenue_growth", "TTM-Q4-2024")]
+    assert growth.value == pytest.approx(derived[("ttm_revenue", "TTM-Q4-2024")].value
+                                         / derived[("ttm_revenue", "TTM-Q4-2023")].value - 1)
+    assert all(fact.start and fact.end for fact in derived.values())
+
+
+def test_label_concepts_unchanged_and_ttm_needs_periods():
+    facts = [Fact("T", "income_statement", concept, value, "USD", "FY-2024", True)
+             for concept, value in (("revenue", 100), ("cost_of_revenue", 60))]
+    plan = DerivationPlan({
+        "gross_profit": spec("binary_subtraction", ["revenue", "cost_of_revenue"]),
+        "ttm_revenue": spec("ttm", ["revenue"]),
+        "revenue_growth": spec("yoy_growth", ["revenue"])
+    })
+
+    derived = plan.evaluate("T", facts)
+
+    assert [(fact.concept, fact.period, fact.value, fact.start) for fact in derived] == [
+        ("gross_profit", "FY-2024", 40, None)
+    ]
@@ -0,0 +1,53 @@
+import copy
+import logging
+
+import pytest
+
+from retrievers.extraction_engine import ExtractionEngine
+from storage.raw_store import DATA_ROOT, load_raw
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+
+
+@pytest.fixture(scope="module")
+def companyfacts():
+    return load_raw(DATA_ROOT / "RDDT" / "raw" / "company_facts.json")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ExtractionEngine(REGISTRY_PATH)
+
+
+def without_latest_filings(companyfacts, count):
+    """The document as it stood before the latest `count` filings were added"""
+    facts = [f for tag in companyfacts["facts"]["us-gaap"].values() for unit in tag["units"].values() for f in unit]
+    dropped = {accn for accn, _ in sorted({(f["accn"], f["filed"]) for f in facts}, key=lambda a: a[1])[-count:]}
+
+    previous = copy.deepcopy(companyfacts)
+    for tag in previous["facts"]["us-gaap"].values():
+        for unit, unit_facts in tag["units"].items():
+            tag["units"][unit] = [f for f in unit_facts if f["accn"] not in dropped]
+    return previous
+
+
+# One 10-Q; then back across the 10-K, whose comparatives relabel earlier periods
+@pytest.mark.parametrize("new_filings", [1, 4])
+def test_incremental_matches_full_extraction(engine, companyfacts, tmp_path, new_filings):
+    logging.disable(logging.CRITICAL)
+    previous = without_latest_filings(companyfacts, new_filings)
+    normalized_dir, derived_dir = tmp_path / "normalized", tmp_path / "derived"
+    engine.write("RDDT", engine.extract("RDDT", previous), normalized_dir, derived_dir)
+
+    previous_facts = [f for tag in previous["facts"]["us-gaap"].values() for unit in tag["units"].values()
+                      for f in unit]
+    results, touched = engine.extract_incremental(
+        "RDDT", companyfacts, engine.load_stored(normalized_dir, derived_dir),
+        {f["accn"] for f in previous_facts}, max(f["filed"] for f in previous_facts)
+    )
+    logging.disable(logging.NOTSET)
+
+    # Untouched concepts really were copied over
+    assert any(len(concepts) < len(engine.direct_fact_registries[statement_type])
+               for statement_type, concepts in touched.items())
+    assert results == engine.extract("RDDT", companyfacts)
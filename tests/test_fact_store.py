@@ -0,0 +1,89 @@
+import json
+
+from retrievers.fetch_all_financial_statements import FetchAllFinancialStatements
+from storage import columnar
+from storage.fact_store import (STORAGE_FORMAT_COLUMNAR, read_statement, read_statement_columns, verify_statement,
+                                write_statement)
+
+PAYLOAD = {
+    "company": "T",
+    "statement": "income_statement",
+    "processed_date": "2025-01-01",
+    "facts": [{"company": "T", "statement": "income_statement", "concept": "revenue", "value": 100,
+               "currency": "USD", "period": "FY-2024", "reported": True}]
+}
+
+
+def test_json_statements_stay_standard_json(tmp_path):
+    path = write_statement(PAYLOAD, tmp_path)
+
+    with open(path) as f:
+        assert json.load(f) == PAYLOAD
+    assert verify_statement(tmp_path, "income_statement")
+    assert verify_statement(tmp_path, "income_statement", full=True)
+
+
+def test_truncated_json_fails_full_verification(tmp_path):
+    path = write_statement(PAYLOAD, tmp_path)
+    path.write_bytes(path.read_bytes()[:-20])
+
+    assert not verify_statement(tmp_path, "income_statement", full=True)
+
+
+def test_checksum_is_opt_in_for_json(tmp_path):
+    path = write_statement(PAYLOAD, tmp_path, checksum=True)
+
+    assert b"#checksum" in path.read_bytes()
+    assert read_statement(tmp_path, "income_statement") == PAYLOAD
+    path.write_bytes(path.read_bytes().replace(b"revenue", b"revenuE"))
+    assert not verify_statement(tmp_path, "income_statement", full=True)
+
+
+def test_columnar_statements_carry_checksum(tmp_path):
+    path = write_statement(PAYLOAD, tmp_path, STORAGE_FORMAT_COLUMNAR)
+
+    assert columnar.load_file(path) == PAYLOAD
+    assert verify_statement(tmp_path, "income_statement")
+    data = path.read_bytes()
+    path.write_bytes(data[:10] + bytes([data[10] ^ 0xFF]) + data[11:])
+    assert verify_statement(tmp_path, "income_statement")
+    assert not verify_statement(tmp_path, "income_statement", full=True)
+
+
+def test_columnar_round_trips_integers_beyond_int64(tmp_path):
+    facts = [dict(PAYLOAD["facts"][0], value=value) for value in (2 ** 63, -(2 ** 63) - 1, 2 ** 63 - 1, 1.5)]
+    payload = dict(PAYLOAD, facts=facts)
+
+    write_statement(payload, tmp_path, STORAGE_FORMAT_COLUMNAR)
+
+    assert read_statement(tmp_path, "income_statement") == payload
+
+
+def test_statement_columns_match_across_formats(tmp_path):
+    facts = PAYLOAD["facts"] + [{"company": "T", "statement": "income_statement", "concept": "margin",
+                                 "value": 0.25, "period": "FY-2024"}]
+    payload = dict(PAYLOAD, facts=facts)
+    fields = ("concept", "value", "reported")
+
+    (tmp_path / "json").mkdir()
+    (tmp_path / "colz").mkdir()
+    write_statement(payload, tmp_path / "json")
+    write_statement(payload, tmp_path / "colz", STORAGE_FORMAT_COLUMNAR)
+    from_json = read_statement_columns(tmp_path / "json", "income_statement", fields)
+    from_colz = read_statement_columns(tmp_path / "colz", "income_statement", fields)
+
+    assert from_json == from_colz
+    header, columns = from_colz
+    assert header == {"company": "T", "statement": "income_statement", "processed_date": "2025-01-01"}
+    assert columns == {"concept": ["revenue", "margin"], "value": [100, 0.25], "reported": [True, columnar.MISSING]}
+
+
+def test_fetch_columns_matches_fetched_facts():
+    fetched = FetchAllFinancialStatements.fetch_cash_flow_statement("RDDT")
+
+    columns = FetchAllFinancialStatements.fetch_columns("rddt", "cash_flow_statement", ("normalized", "derived"),
+                                                        ("concept", "period", "value"))
+
+    assert columns["processed_date"] == fetched["processed_date"]
+    assert columns["columns"] == {field: [fact[field] for fact in fetched["facts"]]
+                                  for field in ("concept", "period", "value")}
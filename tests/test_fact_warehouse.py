@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from retrievers.extraction_engine import ExtractionEngine
+from retrievers.fetch_all_financial_statements import FetchAllFinancialStatements
+from storage.fact_warehouse import STAGE_NORMALIZED, STAGE_PERIODS, get_warehouse, period_sort_key
+from storage.raw_store import DATA_ROOT, load_raw
+
+REGISTRY_PATH = "src/retrievers/registry/sec_facts_canonical_mappings_v1.json"
+STATEMENT = "income_statement"
+
+
+@pytest.fixture(scope="module")
+def warehouse_path(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("warehouse")
+    path = tmp_path / "facts.db"
+    logging.disable(logging.CRITICAL)
+    engine = ExtractionEngine(REGISTRY_PATH, warehouse_path=path)
+    results = engine.extract("RDDT", load_raw(DATA_ROOT / "RDDT" / "raw" / "company_facts.json"))
+    engine.write("RDDT", results, tmp_path / "normalized", tmp_path / "derived")
+    logging.disable(logging.NOTSET)
+    return path
+
+
+def test_period_labels_sort_by_period_end():
+    labels = ["FY-2024", "Q1-2025", "TTM-Q3-2024", "Q4-2024", "Q3-2024", "FY-2023", "odd"]
+
+    assert sorted(labels, key=period_sort_key) == ["FY-2023", "Q3-2024", "TTM-Q3-2024", "Q4-2024", "FY-2024",
+                                                   "Q1-2025", "odd"]
+
+
+def test_quarter_reads_its_period_stage_value(warehouse_path):
+    facts = FetchAllFinancialStatements.query_facts("RDDT", concept="revenue", period="Q1-2025",
+                                                    warehouse_path=warehouse_path)
+    by_stage = {}
+    for fact in facts:
+        by_stage.setdefault(fact["stage"], []).append(fact["value"])
+
+    # The normalized stage also labels Q1-2024, reported as a comparative, with its filing's fiscal year
+    assert by_stage == {STAGE_NORMALIZED: [242963000, 392361000], STAGE_PERIODS: [392361000]}
+    assert FetchAllFinancialStatements.query_facts("RDDT", concept="revenue", period="Q1-2025", stage=STAGE_PERIODS,
+                                                   warehouse_path=warehouse_path)[0]["value"] == 392361000
+
+    assert FetchAllFinancialStatements.fetch_cross_section(STATEMENT, "revenue", "Q1-2025",
+                                                           warehouse_path=warehouse_path) == {"RDDT": 392361000}
+    assert FetchAllFinancialStatements.fetch_cross_section(STATEMENT, "revenue", "Q1-2024",
+                                                           warehouse_path=warehouse_path) == {"RDDT": 242963000}
+    assert FetchAllFinancialStatements.fetch_cross_section(STATEMENT, "revenue", "Q1-2024", stage=STAGE_NORMALIZED,
+                                                           warehouse_path=warehouse_path) == {"RDDT": 163740000}
+
+
+def test_time_series_has_one_fact_per_period_in_period_order(warehouse_path):
+    series = FetchAllFinancialStatements.fetch_time_series("rddt", STATEMENT, "revenue",
+                                                           warehouse_path=warehouse_path)
+    periods = [fact["period"] for fact in series]
+
+    assert len(periods) == len(set(periods))
+    assert periods == sorted(periods, key=period_sort_key)
+    assert {fact["stage"] for fact in series if fact["period"].startswith(("Q", "TTM"))} == {STAGE_PERIODS}
+
+    normalized = get_warehouse(warehouse_path).time_series("RDDT", STATEMENT, "revenue", STAGE_NORMALIZED)
+    assert normalized and {fact["stage"] for fact in normalized} == {STAGE_NORMALIZED}
@@ -0,0 +1,91 @@
+import pytest
+
+from retrievers import batch_pipeline
+from storage import generations
+from storage.generations import (
+    begin_generation,
+    build_generation,
+    current_dir,
+    current_generation,
+    publish_generation
+)
+
+
+def write_stage(staging, content):
+    (staging / "normalized").mkdir(exist_ok=True)
+    (staging / "normalized" / "income_statement.json").write_text(content)
+    return content
+
+
+def read_stage(company_dir):
+    return (current_dir(company_dir) / "normalized" / "income_statement.json").read_text()
+
+
+def test_build_publishes_next_generation(tmp_path):
+    company_dir = tmp_path / "T"
+
+    build_generation(company_dir, lambda staging: write_stage(staging, "one"))
+    build_generation(company_dir, lambda staging: write_stage(staging, "two"))
+
+    assert current_generation(company_dir) == "gen-000002"
+    assert read_stage(company_dir) == "two"
+
+
+def test_nothing_built_leaves_no_directories(tmp_path):
+    company_dir = tmp_path / "T"
+
+    assert build_generation(company_dir, lambda staging: None) is None
+    assert not company_dir.exists()
+
+    with pytest.raises(RuntimeError):
+        build_generation(company_dir, lambda staging: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert not company_dir.exists()
+
+
+def test_existing_ticker_keeps_its_directory(tmp_path):
+    company_dir = tmp_path / "T"
+    (company_dir / "raw").mkdir(parents=True)
+
+    build_generation(company_dir, lambda staging: None)
+
+    assert sorted(p.name for p in company_dir.iterdir()) == ["raw"]
+
+
+def test_legacy_stage_directories_are_kept(tmp_path):
+    company_dir = tmp_path / "T"
+    (company_dir / "normalized").mkdir(parents=True)
+    (company_dir / "normalized" / "income_statement.json").write_text("legacy")
+
+    build_generation(company_dir, lambda staging: write_stage(staging, read_stage(company_dir) + "+new"))
+
+    assert read_stage(company_dir) == "legacy+new"
+    assert (company_dir / "normalized" / "income_statement.json").read_text() == "legacy"
+
+
+def test_current_never_moves_backwards(tmp_path, monkeypatch):
+    company_dir = tmp_path / "T"
+    older = begin_generation(company_dir)
+    write_stage(older, "older")
+    newer = begin_generation(company_dir)
+    write_stage(newer, "newer")
+
+    # The newer build is published while the older one is between its rename and CURRENT
+    fsync_directory = generations.fsync_directory
+
+    def interleave(directory):
+        fsync_directory(directory)
+        monkeypatch.setattr(generations, "fsync_directory", fsync_directory)
+        publish_generation(company_dir, newer)
+
+    monkeypatch.setattr(generations, "fsync_directory", interleave)
+    assert publish_generation(company_dir, older) == "gen-000001"
+
+    assert current_generation(company_dir) == "gen-000002"
+    assert read_stage(company_dir) == "newer"
+
+
+def test_unknown_ticker_creates_nothing():
+    result = batch_pipeline.process_ticker("ZZZQ")
+
+    assert result["status"] == batch_pipeline.STATUS_SKIPPED
+    assert not (batch_pipeline.PROJECT_ROOT / "data" / "ZZZQ").exists()
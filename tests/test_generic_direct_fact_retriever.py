@@ -0,0 +1,66 @@
+from retrievers.generic_direct_fact_retriever import FactType, GenericDirectFactRetriever
+
+REGISTRY = {"revenue": {"tag": "Revenues", "type": "duration", "retrieval": "direct"}}
+
+
+def raw(start, end, val, accn, fy, fp, form, filed):
+    return {"start": start, "end": end, "val": val, "accn": accn, "fy": fy, "fp": fp, "form": form, "filed": filed}
+
+
+# A January year end, as NVIDIA files it: SEC calls the year ending
+# 2025-01-26 fiscal 2025, and the 10-K repeats fiscal 2024 as a comparative
+NVDA_LIKE = [
+    raw("2023-01-30", "2023-04-30", 7192, "q1-24", 2024, "Q1", "10-Q", "2023-05-26"),
+    raw("2023-05-01", "2023-07-30", 13507, "q2-24", 2024, "Q2", "10-Q", "2023-08-28"),
+    raw("2023-07-31", "2023-10-29", 18120, "q3-24", 2024, "Q3", "10-Q", "2023-11-21"),
+    raw("2023-01-30", "2024-01-28", 60922, "k-25", 2025, "FY", "10-K", "2025-02-26"),
+    raw("2024-01-29", "2024-04-28", 26044, "q1-25", 2025, "Q1", "10-Q", "2024-05-29"),
+    raw("2024-04-29", "2024-07-28", 30040, "q2-25", 2025, "Q2", "10-Q", "2024-08-28"),
+    raw("2024-07-29", "2024-10-27", 35082, "q3-25", 2025, "Q3", "10-Q", "2024-11-20"),
+    raw("2024-01-29", "2025-01-26", 130497, "k-25", 2025, "FY", "10-K", "2025-02-26"),
+    raw("2025-01-27", "2025-04-27", 44062, "q1-26", 2026, "Q1", "10-Q", "2025-05-28"),
+    # Comparative of the 10-Q above, tagged with its filing's fy
+    raw("2024-01-29", "2024-04-28", 26044, "q1-26", 2026, "Q1", "10-Q", "2025-05-28"),
+]
+
+
+def quarter_labels(raw_facts):
+    retriever = GenericDirectFactRetriever("T", FactType.INCOME_STATEMENT, REGISTRY)
+    return {(fact.start, fact.end): fact.period for fact in retriever.normalize_periods("revenue", raw_facts)
+            if not fact.period.startswith("TTM")}
+
+
+def test_labels_follow_sec_fiscal_year():
+    labels = quarter_labels(NVDA_LIKE)
+
+    assert labels[("2024-01-29", "2024-04-28")] == "Q1-2025"
+    assert labels[("2024-10-28", "2025-01-26")] == "Q4-2025"
+    assert labels[("2023-10-30", "2024-01-28")] == "Q4-2024"
+    assert labels[("2025-01-27", "2025-04-27")] == "Q1-2026"
+
+
+def test_labels_without_fy_fall_back_to_year_end_month():
+    labels = quarter_labels([{key: value for key, value in fact.items() if key != "fy"} for fact in NVDA_LIKE])
+
+    assert labels[("2024-10-28", "2025-01-26")] == "Q4-2024"
+
+
+def test_calendar_year_labels():
+    # Every 2024 filing repeats the same 2023 period as a comparative
+    facts = [
+        raw("2024-01-01", "2024-03-31", 3, "q1", 2024, "Q1", "10-Q", "2024-05-01"),
+        raw("2023-01-01", "2023-03-31", 2, "q1", 2024, "Q1", "10-Q", "2024-05-01"),
+        raw("2024-01-01", "2024-06-30", 6, "q2", 2024, "Q2", "10-Q", "2024-08-01"),
+        raw("2023-01-01", "2023-06-30", 4, "q2", 2024, "Q2", "10-Q", "2024-08-01"),
+        raw("2024-01-01", "2024-09-30", 9, "q3", 2024, "Q3", "10-Q", "2024-11-01"),
+        raw("2023-01-01", "2023-09-30", 6, "q3", 2024, "Q3", "10-Q", "2024-11-01"),
+        raw("2024-01-01", "2024-12-31", 12, "k", 2024, "FY", "10-K", "2025-02-15"),
+        raw("2023-01-01", "2023-12-31", 8, "k", 2024, "FY", "10-K", "2025-02-15"),
+    ]
+
+    labels = quarter_labels(facts)
+
+    assert labels[("2024-01-01", "2024-03-31")] == "Q1-2024"
+    assert labels[("2023-01-01", "2023-03-31")] == "Q1-2023"
+    assert labels[("2023-10-01", "2023-12-31")] == "Q4-2023"
+    assert labels[("2024-10-01", "2024-12-31")] == "Q4-2024"
@@ -0,0 +1,102 @@
+import pytest
+
+import job_queue
+from job_queue import (PRIORITY_NORMAL, PRIORITY_ON_DEMAND, STATUS_DONE, STATUS_FAILED, STATUS_PENDING,
+                       STATUS_RUNNING, STATUS_SUPERSEDED, JobQueue)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "scheduler.db")
+    yield queue
+    queue.close()
+
+
+def test_duplicate_pending_job_is_merged(queue):
+    job_id, created = queue.enqueue("extract", "AAPL", {"accessions": ["a"]})
+    again, created_again = queue.enqueue("extract", "AAPL", {"accessions": ["b"]}, priority=PRIORITY_ON_DEMAND)
+
+    assert created and not created_again and again == job_id
+    job = queue.get(job_id)
+    assert job["payload"] == {"accessions": ["a"]}
+    assert job["priority"] == PRIORITY_ON_DEMAND
+    assert queue.counts() == {STATUS_PENDING: 1}
+
+
+def test_claim_takes_priority_then_age(queue):
+    first, _ = queue.enqueue("extract", "AAPL")
+    second, _ = queue.enqueue("extract", "MSFT")
+    urgent, _ = queue.enqueue("download_companyfacts", "RDDT", priority=PRIORITY_ON_DEMAND)
+    queue.enqueue("extract", "LATER", delay=3600)
+
+    claimed = [queue.claim("w")["id"] for _ in range(3)]
+
+    assert claimed == [urgent, first, second]
+    assert queue.claim("w") is None
+    job = queue.get(urgent)
+    assert job["status"] == STATUS_RUNNING and job["attempts"] == 1 and job["worker"] == "w"
+
+
+def test_claim_filters_job_types(queue):
+    queue.enqueue("extract", "AAPL")
+    download, _ = queue.enqueue("download_companyfacts", "AAPL", priority=PRIORITY_NORMAL + 1)
+
+    assert queue.claim("w", job_types=["download_companyfacts"])["id"] == download
+
+
+def test_failed_job_backs_off_then_fails(queue, monkeypatch):
+    job_id, _ = queue.enqueue("extract", "AAPL", max_attempts=2)
+    now = job_queue.time.time()
+
+    queue.claim("w")
+    assert queue.fail(job_id, "boom") == STATUS_PENDING
+    job = queue.get(job_id)
+    assert job["run_after"] >= now + job_queue.backoff_seconds(1)
+    assert job["last_error"] == "boom"
+    assert queue.claim("w") is None
+
+    monkeypatch.setattr(job_queue.time, "time", lambda: now + job_queue.BACKOFF_MAX_SECONDS)
+    assert queue.claim("w")["id"] == job_id
+    assert queue.fail(job_id, "boom again") == STATUS_FAILED
+
+
+def test_retry_is_superseded_by_job_queued_while_running(queue):
+    job_id, _ = queue.enqueue("extract", "AAPL")
+    queue.claim("w")
+    newer, created = queue.enqueue("extract", "AAPL")
+
+    assert created
+    assert queue.fail(job_id, "boom") == STATUS_SUPERSEDED
+    assert queue.get(newer)["status"] == STATUS_PENDING
+
+
+def test_recover_requeues_interrupted_jobs(queue):
+    interrupted, _ = queue.enqueue("extract", "AAPL")
+    duplicated, _ = queue.enqueue("extract", "MSFT")
+    queue.claim("w")
+    queue.claim("w")
+    newer, _ = queue.enqueue("extract", "MSFT")
+
+    assert queue.recover() == 1
+
+    assert queue.get(interrupted)["status"] == STATUS_PENDING
+    assert queue.get(duplicated)["status"] == STATUS_SUPERSEDED
+    assert queue.get(newer)["status"] == STATUS_PENDING
+
+
+def test_complete_and_purge(queue):
+    job_id, _ = queue.enqueue("extract", "AAPL")
+    queue.claim("w")
+    queue.complete(job_id)
+
+    assert queue.get(job_id)["status"] == STATUS_DONE
+    assert queue.purge(3600) == 0
+    assert queue.purge(-1) == 1
+    assert queue.get(job_id) is None
+
+
+def test_schedule_state(queue):
+    assert queue.next_run("poll_filings") is None
+    queue.set_next_run("poll_filings", 100.0)
+    queue.set_next_run("poll_filings", 200.0)
+    assert queue.next_run("poll_filings") == 200.0
@@ -0,0 +1,48 @@
+import tracemalloc
+
+from agents.fundametals.raw_facts_cache import RawFactsCache, estimate_memory
+from storage import serialization
+from storage.raw_store import DATA_ROOT, read_raw
+
+
+def test_estimate_tracks_parsed_size():
+    encoded = serialization.dumps(serialization.loads(read_raw(DATA_ROOT / "RDDT" / "raw" / "company_facts.json")))
+
+    tracemalloc.start()
+    document = serialization.loads(encoded)
+    resident, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert document
+    assert 0.8 <= estimate_memory(encoded) / resident <= 1.5
+
+
+def test_budget_counts_parsed_size():
+    document = {"facts": {"us-gaap": {f"Tag{i}": {"units": {"USD": [{"val": i}]}} for i in range(100)}}}
+    size = estimate_memory(serialization.dumps(document))
+    cache = RawFactsCache(max_bytes=2 * size)
+
+    for ticker in ("A", "B", "C"):
+        cache.put(ticker, document)
+
+    assert cache.get("A") is None
+    assert cache.get("C") is document
+    assert cache.stats()["bytes"] == 2 * size
+    assert cache.evictions == 1
+
+
+def test_spill_keeps_fetch_time_and_leaves_no_temporary_files(tmp_path):
+    document = {"facts": {"us-gaap": {"Revenues": {"units": {"USD": [{"val": 1}]}}}}}
+    now = [1000.0]
+    writer = RawFactsCache(max_bytes=1, ttl_seconds=60, spill_dir=tmp_path, clock=lambda: now[0])
+
+    writer.put("RDDT", document, stored_at=990.0)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["RDDT.json.gz"]
+    assert (tmp_path / "RDDT.json.gz").stat().st_mtime == 990.0
+
+    # Another process sharing the directory sees the original fetch time
+    reader = RawFactsCache(max_bytes=1, ttl_seconds=60, spill_dir=tmp_path, clock=lambda: now[0])
+    assert reader.get("RDDT") == document
+    now[0] = 1051.0
+    assert reader.get("RDDT") is None
@@ -0,0 +1,75 @@
+import json
+import tracemalloc
+
+import pytest
+
+from retrievers.streaming_companyfacts_parser import (load_companyfacts_selective, parse_companyfacts_chunks,
+                                                      parse_companyfacts_selective)
+from storage import raw_store
+from storage.raw_store import CODEC_GZIP, CODEC_JSON, DATA_ROOT, load_raw, read_raw, write_raw
+
+RDDT_RAW = DATA_ROOT / "RDDT" / "raw" / "company_facts.json"
+TAGS = ["Revenues", "NetIncomeLoss", "Assets", "StockholdersEquity"]
+
+
+@pytest.fixture(scope="module")
+def content():
+    return read_raw(RDDT_RAW)
+
+
+def stored(tmp_path, content, codec):
+    raw_dir = tmp_path / codec / "raw"
+    raw_dir.mkdir(parents=True)
+    write_raw(raw_dir, content, codec)
+    return raw_dir / "company_facts.json"
+
+
+def test_compressed_round_trip(tmp_path, content):
+    path = stored(tmp_path, content, CODEC_GZIP)
+
+    assert read_raw(path) == content
+    assert load_raw(path) == json.loads(content)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096, 1 << 20])
+def test_chunked_parse_matches_mapped_parse(content, chunk_size):
+    chunks = (bytes(content[i:i + chunk_size]) for i in range(0, len(content), chunk_size))
+
+    assert parse_companyfacts_chunks(chunks, TAGS + ["NotATag"]) == parse_companyfacts_selective(content, TAGS)
+
+
+def test_selective_load_matches_across_codecs(tmp_path, content):
+    expected = load_companyfacts_selective(stored(tmp_path, content, CODEC_JSON), TAGS)
+
+    assert expected["facts"]["us-gaap"]
+    assert load_companyfacts_selective(stored(tmp_path, content, CODEC_GZIP), TAGS) == expected
+
+
+def test_selective_load_does_not_buffer_compressed_document(tmp_path, content, monkeypatch):
+    # Chunks smaller than the document, as they are for the large filers
+    monkeypatch.setattr(raw_store, "READ_CHUNK_BYTES", 64 * 1024)
+    path = stored(tmp_path, content, CODEC_GZIP)
+
+    tracemalloc.start()
+    load_companyfacts_selective(path, TAGS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < len(content) / 2
+
+
+def test_corrupt_compressed_document(tmp_path, content):
+    path = stored(tmp_path, content, CODEC_GZIP)
+    compressed = path.with_suffix(".json.gz")
+    compressed.write_bytes(compressed.read_bytes()[:compressed.stat().st_size // 2])
+
+    with pytest.raises(json.JSONDecodeError):
+        load_raw(path)
+    with pytest.raises(json.JSONDecodeError):
+        load_companyfacts_selective(path, TAGS)
+
+
+@pytest.mark.parametrize("cut", [0.2, 0.999])
+def test_truncated_document_in_chunks(content, cut):
+    with pytest.raises(json.JSONDecodeError):
+        parse_companyfacts_chunks([bytes(content[:int(len(content) * cut)])], TAGS)
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from agents.fundametals import utils
+from sec_client import SecClient, TokenBucket, parse_retry_after
+from storage import serialization
+
+
+def make_client(stub_server, **kwargs):
+    options = dict(rate_limit=1000, backoff_factor=0.01, max_backoff=2,
+                   data_base_url=stub_server.url, www_base_url=stub_server.url)
+    options.update(kwargs)
+    return SecClient(**options)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+# =========================
+# TOKEN BUCKET
+# =========================
+
+def test_token_bucket_allows_burst_then_paces_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        bucket.acquire()
+    assert clock.now == 0
+
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_client_requests_are_rate_limited(stub_server):
+    stub_server.route("/files/company_tickers.json", (200, {}, b"{}"))
+    client = make_client(stub_server, rate_limit=20)
+
+    for _ in range(30):
+        client.get_company_tickers()
+
+    hits = stub_server.hits("/files/company_tickers.json")
+    # 20 burst tokens, then 10 more at 20/s
+    assert hits[-1][0] - hits[0][0] >= 0.45
+
+
+# =========================
+# BACKOFF AND RETRY-AFTER
+# =========================
+
+def test_retries_server_errors_with_backoff(stub_server):
+    path = "/api/xbrl/companyfacts/CIK0000000001.json"
+    stub_server.route(path, (503, {}, b""), (429, {}, b""), (200, {}, b'{"cik": 1}'))
+    client = make_client(stub_server)
+
+    assert client.get_companyfacts(1) == {"cik": 1}
+    assert len(stub_server.hits(path)) == 3
+
+
+def test_gives_up_after_max_retries(stub_server):
+    path = "/api/xbrl/companyfacts/CIK0000000001.json"
+    stub_server.route(path, (500, {}, b""))
+    client = make_client(stub_server, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get_companyfacts(1)
+    assert len(stub_server.hits(path)) == 3
+
+
+def test_client_errors_are_not_retried(stub_server):
+    path = "/api/xbrl/companyfacts/CIK0000000001.json"
+    stub_server.route(path, (403, {}, b""))
+    client = make_client(stub_server)
+
+    with pytest.raises(requests.HTTPError):
+        client.get_companyfacts(1)
+    assert len(stub_server.hits(path)) == 1
+
+
+def test_honours_retry_after_seconds(stub_server):
+    path = "/api/xbrl/companyfacts/CIK0000000001.json"
+    stub_server.route(path, (429, {"Retry-After": "1"}, b""), (200, {}, b"{}"))
+    client = make_client(stub_server)
+
+    client.get_companyfacts(1)
+    (first, _), (second, _) = stub_server.hits(path)
+    assert second - first >= 0.95
+
+
+def test_honours_retry_after_http_date(stub_server):
+    path = "/api/xbrl/companyfacts/CIK0000000001.json"
+
+    def rate_limited(handler):
+        # Whole seconds: the header has one-second resolution
+        retry_at = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(seconds=2)
+        return 503, {"Retry-After": format_datetime(retry_at, usegmt=True)}, b""
+
+    stub_server.route(path, rate_limited, (200, {}, b"{}"))
+    client = make_client(stub_server)
+
+    client.get_companyfacts(1)
+    (first, _), (second, _) = stub_server.hits(path)
+    assert second - first >= 1.0
+
+
+def test_parse_retry_after_forms():
+    now = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 01 Jan 2025 12:00:30 GMT", now) == 30
+    assert parse_retry_after("Wed, 01 Jan 2025 11:00:00 GMT", now) == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_caps_retry_after(stub_server):
+    client = make_client(stub_server, max_backoff=5)
+    response = requests.Response()
+    response.headers["Retry-After"] = "3600"
+    assert client.backoff_delay(0, response) == 5
+
+
+# =========================
+# BULK DOWNLOAD
+# =========================
+
+def test_bulk_download_yields_every_share_class(stub_server, monkeypatch):
+    ciks = {"GOOG": 1652044, "GOOGL": 1652044, "RDDT": 1713445}
+
+    def get_cik(ticker):
+        if ticker not in ciks:
+            raise ValueError(f"Unknown ticker {ticker}")
+        return ciks[ticker]
+
+    monkeypatch.setattr(utils, "get_cik_for_ticker", get_cik)
+    for cik in set(ciks.values()):
+        stub_server.route(f"/api/xbrl/companyfacts/CIK{cik:010d}.json",
+                          (200, {}, serialization.dumps({"cik": cik})))
+    client = make_client(stub_server)
+
+    results = {ticker: (facts, error)
+               for ticker, facts, error in utils.download_companyfacts_bulk(["GOOG", "googl", "RDDT", "NOPE"], client)}
+
+    assert results["GOOG"] == ({"cik": 1652044}, None)
+    assert results["GOOGL"] == ({"cik": 1652044}, None)
+    assert results["RDDT"] == ({"cik": 1713445}, None)
+    assert isinstance(results["NOPE"][1], ValueError)
+    # One request per CIK
+    assert len(stub_server.hits("/api/xbrl/companyfacts/CIK0001652044.json")) == 1
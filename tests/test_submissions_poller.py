@@ -0,0 +1,150 @@
+from datetime import date
+
+import pytest
+
+from sec_client import SecClient
+from storage import serialization
+import submissions_poller
+from submissions_poller import SubmissionsPoller
+
+RDDT_CIK = 1713445
+CIK_TICKER_MAP = {RDDT_CIK: "RDDT", 320193: "AAPL"}
+
+INDEX_TEMPLATE = """Description:           Daily Index of EDGAR Dissemination Feed by Form Type
+Last Data Received:    {day:%B %d, %Y}
+Comments:              webmaster@sec.gov
+Anonymous FTP:         ftp://ftp.sec.gov/edgar/
+
+Form Type   Company Name                                                  CIK         Date Filed  File Name
+---------------------------------------------------------------------------------------------------------------------------------------------
+{rows}
+"""
+
+
+def index_body(day, filings):
+    rows = "\n".join(f"{form:<12} {company:<62} {cik:<11} {day:%Y%m%d}    edgar/data/{cik}/{accession}.txt"
+                     for form, company, cik, accession in filings)
+    return INDEX_TEMPLATE.format(day=day, rows=rows).encode("latin-1")
+
+
+def index_path(day):
+    return f"/Archives/edgar/daily-index/{day.year}/QTR{(day.month - 1) // 3 + 1}/form.{day:%Y%m%d}.idx"
+
+
+@pytest.fixture
+def poller(stub_server, tmp_path):
+    client = SecClient(rate_limit=1000, max_retries=0,
+                       data_base_url=stub_server.url, www_base_url=stub_server.url)
+    state_path = tmp_path / "submissions_state.json"
+    serialization.dump_file({"last_polled_day": "2025-02-13", "seen_accessions": {}}, state_path)
+    return SubmissionsPoller(client, state_path, tmp_path / "change_queue.json", dict(CIK_TICKER_MAP))
+
+
+FRIDAY = date(2025, 2, 14)
+MONDAY = date(2025, 2, 17)
+FRIDAY_FILINGS = [
+    ("10-Q", "REDDIT, INC.", RDDT_CIK, "0001713445-25-000010"),
+    ("8-K", "APPLE INC", 320193, "0000320193-25-000020"),
+    ("10-K", "UNTRACKED CO", 999999, "0000999999-25-000001")
+]
+
+
+def test_polls_every_day_since_last_poll(poller, stub_server):
+    stub_server.route(index_path(FRIDAY), (200, {}, index_body(FRIDAY, FRIDAY_FILINGS)))
+    stub_server.route(index_path(MONDAY), (200, {}, index_body(MONDAY, [
+        ("10-K/A", "APPLE INC", 320193, "0000320193-25-000030")
+    ])))
+
+    assert poller.poll_daily_index(today=MONDAY) == 2
+
+    # Weekend indexes are not published (404) and are skipped
+    assert poller.load_state()["last_polled_day"] == "2025-02-17"
+    queue = poller.queue.load().entries
+    assert set(queue) == {"RDDT", "AAPL"}
+    assert queue["RDDT"]["filings"] == [{"accession": "0001713445-25-000010", "form": "10-Q", "filed": "2025-02-14"}]
+    assert queue["AAPL"]["filings"][0]["form"] == "10-K/A"
+
+
+def test_unpublished_today_is_retried(poller, stub_server):
+    stub_server.route(index_path(FRIDAY), (200, {}, index_body(FRIDAY, FRIDAY_FILINGS)))
+
+    assert poller.poll_daily_index(today=MONDAY) == 1
+    assert poller.load_state()["last_polled_day"] == "2025-02-16"
+
+
+@pytest.mark.parametrize("status", [403, 429, 500])
+def test_failed_download_does_not_advance(poller, stub_server, status):
+    stub_server.route(index_path(FRIDAY), (status, {}, b""), (200, {}, index_body(FRIDAY, FRIDAY_FILINGS)))
+
+    assert poller.poll_daily_index(today=MONDAY) == 0
+    assert poller.load_state()["last_polled_day"] == "2025-02-13"
+    # Monday was never requested
+    assert not stub_server.hits(index_path(MONDAY))
+
+    # Once SEC answers again the day's filings are picked up
+    assert poller.poll_daily_index(today=MONDAY) == 1
+    assert "RDDT" in poller.queue.load().entries
+
+
+def test_poll_submissions_queues_only_unseen_filings(poller, stub_server):
+    path = f"/submissions/CIK{RDDT_CIK:010d}.json"
+
+    def submissions(*accessions):
+        recent = {"accessionNumber": list(accessions), "filingDate": ["2025-02-14"] * len(accessions),
+                  "form": ["10-Q"] * len(accessions)}
+        return 200, {}, serialization.dumps({"cik": str(RDDT_CIK), "filings": {"recent": recent}})
+
+    stub_server.route(path, submissions("0001713445-24-000001"), submissions("0001713445-25-000010",
+                                                                            "0001713445-24-000001"))
+
+    # The first poll only records history
+    assert poller.poll_submissions(["RDDT"]) == 0
+    assert poller.poll_submissions(["RDDT"]) == 1
+    assert [f["accession"] for f in poller.queue.load().entries["RDDT"]["filings"]] == ["0001713445-25-000010"]
+
+
+def queue_filing(poller, accession, ticker="RDDT"):
+    with poller.queue.lock:
+        poller.queue.load()
+        poller.queue.add(ticker, {"cik": RDDT_CIK, "accession": accession, "form": "10-Q", "filed": "2025-02-14"})
+        poller.queue.save()
+
+
+def test_filings_queued_during_refresh_stay_queued(poller):
+    queue_filing(poller, "0001713445-25-000010")
+
+    def refresh(ticker):
+        # A concurrent poll queues an amendment the downloaded document may not have
+        queue_filing(poller, "0001713445-25-000011")
+        return True
+
+    report = poller.process_queue(refresh=refresh)
+
+    assert report["refreshed"] == ["RDDT"] and report["pending"] == ["RDDT"]
+    entry = poller.queue.load().entries["RDDT"]
+    assert [f["accession"] for f in entry["filings"]] == ["0001713445-25-000011"]
+
+    assert poller.process_queue(refresh=lambda ticker: True)["refreshed"] == ["RDDT"]
+    assert not poller.queue.load().entries
+
+
+def test_xbrl_lag_does_not_use_up_refresh_attempts(poller):
+    queue_filing(poller, "0001713445-25-000010")
+
+    for _ in range(submissions_poller.MAX_REFRESH_ATTEMPTS + 1):
+        assert poller.process_queue(refresh=lambda ticker: False)["pending"] == ["RDDT"]
+
+    entry = poller.queue.load().entries["RDDT"]
+    assert entry["attempts"] == 0
+    assert entry["lagging_polls"] == submissions_poller.MAX_REFRESH_ATTEMPTS + 1
+
+
+def test_failing_refresh_is_dropped(poller):
+    queue_filing(poller, "0001713445-25-000010")
+
+    def refresh(ticker):
+        raise RuntimeError("boom")
+
+    for _ in range(submissions_poller.MAX_REFRESH_ATTEMPTS - 1):
+        assert poller.process_queue(refresh=refresh)["pending"] == ["RDDT"]
+    assert poller.process_queue(refresh=refresh)["dropped"] == ["RDDT"]
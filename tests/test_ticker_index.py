@@ -0,0 +1,62 @@
+import os
+
+from storage import serialization
+from storage.ticker_index import (TickerIndex, build_ticker_index, index_path_for, load_ticker_index,
+                                  refresh_ticker_index)
+
+COMPANY_TICKERS = {
+    "0": {"cik_str": 1652044, "ticker": "GOOGL", "title": "Alphabet Inc."},
+    "1": {"cik_str": 1713445, "ticker": "RDDT", "title": "Reddit, Inc."},
+    "2": {"cik_str": 1652044, "ticker": "GOOG", "title": "Alphabet Inc."},
+    "3": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    "4": {"cik_str": 1067983, "ticker": "BRK-B", "title": "BERKSHIRE HATHAWAY INC"}
+}
+
+
+def test_lookups_and_share_classes():
+    index = TickerIndex.from_company_tickers(COMPANY_TICKERS)
+
+    assert index.cik_for("rddt") == 1713445 and "Rddt" in index
+    assert index.cik_for("GOOG") == index.cik_for("GOOGL") == 1652044
+    # A CIK maps back to the class SEC lists first
+    assert index.ticker_for("1652044") == "GOOGL"
+    assert index.title_for("brk-b") == "BERKSHIRE HATHAWAY INC"
+    assert index.cik_for("MSFT") is None and index.ticker_for(789019) is None
+    assert index.tickers() == ["GOOGL", "RDDT", "GOOG", "AAPL", "BRK-B"]
+
+
+def test_search_by_name_prefix():
+    index = TickerIndex.from_company_tickers(COMPANY_TICKERS)
+
+    assert [match["ticker"] for match in index.search("alpha")] == ["GOOG", "GOOGL"]
+    assert index.search("Re") == [{"ticker": "RDDT", "cik": 1713445, "title": "Reddit, Inc."}]
+    assert len(index.search("a", limit=2)) == 2
+    assert index.search("zzz") == []
+
+
+def test_pickle_round_trip_and_staleness(tmp_path):
+    tickers_path = tmp_path / "company_tickers.json"
+    serialization.dump_file(COMPANY_TICKERS, tickers_path)
+
+    built = build_ticker_index(tickers_path)
+    mtime_ns = tickers_path.stat().st_mtime_ns
+    loaded = TickerIndex.load(index_path_for(tickers_path), mtime_ns)
+    assert loaded.ticker_to_cik == built.ticker_to_cik and loaded.search("re") == built.search("re")
+
+    # A newer ticker list makes the pickle stale; it is rebuilt on load
+    serialization.dump_file({"0": {"cik_str": 1326801, "ticker": "META", "title": "Meta Platforms, Inc."}},
+                            tickers_path)
+    os.utime(tickers_path, ns=(mtime_ns + 1_000_000_000, mtime_ns + 1_000_000_000))
+    assert TickerIndex.load(index_path_for(tickers_path), tickers_path.stat().st_mtime_ns) is None
+    assert load_ticker_index(tickers_path).tickers() == ["META"]
+    assert TickerIndex.load(index_path_for(tickers_path), tickers_path.stat().st_mtime_ns) is not None
+
+
+def test_unreadable_pickle_is_rebuilt(tmp_path):
+    tickers_path = tmp_path / "company_tickers.json"
+    serialization.dump_file(COMPANY_TICKERS, tickers_path)
+    index_path_for(tickers_path).write_bytes(b"not a pickle")
+
+    assert TickerIndex.load(index_path_for(tickers_path)) is None
+    assert "RDDT" in load_ticker_index(tickers_path)
+    assert refresh_ticker_index(tickers_path).cik_for("AAPL") == 320193
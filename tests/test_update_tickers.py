@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from storage import serialization
+from storage.ticker_index import TickerIndex
+import update_tickers
+from update_tickers import compute_delta, delta_is_empty, list_snapshots, take_snapshot
+
+
+def tickers(*rows):
+    return {str(position): {"cik_str": cik, "ticker": ticker, "title": f"{ticker} INC"}
+            for position, (ticker, cik) in enumerate(rows)}
+
+
+def delta(old, new):
+    return compute_delta(TickerIndex.from_company_tickers(old), TickerIndex.from_company_tickers(new))
+
+
+def test_unchanged_list_has_empty_delta():
+    listed = tickers(("RDDT", 1713445), ("AAPL", 320193))
+
+    assert delta_is_empty(delta(listed, dict(listed)))
+
+
+def test_rename_is_not_added_and_removed():
+    changes = delta(tickers(("FB", 1326801), ("AAPL", 320193)), tickers(("META", 1326801), ("AAPL", 320193)))
+
+    assert changes["renamed"] == [{"cik": 1326801, "old": "FB", "new": "META"}]
+    assert not changes["added"] and not changes["removed"] and not changes["new_ciks"]
+
+
+def test_cik_change_and_new_cik():
+    changes = delta(tickers(("ABC", 100), ("AAPL", 320193)), tickers(("ABC", 200), ("AAPL", 320193)))
+
+    assert changes["cik_changed"] == [{"ticker": "ABC", "old_cik": 100, "new_cik": 200}]
+    assert changes["new_ciks"] == [200]
+    assert not changes["added"] and not changes["removed"] and not changes["renamed"]
+
+
+def test_share_classes_are_tickers_of_their_own():
+    old = tickers(("GOOGL", 1652044), ("AAPL", 320193))
+
+    added = delta(old, tickers(("GOOGL", 1652044), ("GOOG", 1652044), ("AAPL", 320193)))
+    assert added["added"] == [{"ticker": "GOOG", "cik": 1652044}]
+    assert not added["renamed"] and not added["new_ciks"]
+
+    # SEC listing another class first changes the primary ticker, but nothing was renamed
+    reordered = delta(tickers(("GOOGL", 1652044), ("GOOG", 1652044)), tickers(("GOOG", 1652044), ("GOOGL", 1652044)))
+    assert delta_is_empty(reordered)
+
+    dropped = delta(tickers(("GOOGL", 1652044), ("GOOG", 1652044)), tickers(("GOOG", 1652044)))
+    assert dropped["removed"] == [{"ticker": "GOOGL", "cik": 1652044}]
+    assert not dropped["renamed"] and not dropped["added"]
+
+
+def test_snapshots_are_taken_per_interval_and_pruned(tmp_path):
+    start = datetime(2025, 1, 1)
+    listed = tickers(("RDDT", 1713445))
+
+    taken = [take_snapshot(listed, tmp_path, now=start + timedelta(days=day), keep=2) for day in (0, 3, 7, 14, 21)]
+
+    # Day 3 is within a week of day 0
+    assert taken[1] is None
+    assert list_snapshots(tmp_path) == taken[3:]
+    assert serialization.load_file(taken[-1]) == listed
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    output_file = tmp_path / "company_tickers.json"
+    serialization.dump_file(tickers(("FB", 1326801)), output_file)
+    monkeypatch.setattr(update_tickers, "download_tickers",
+                        lambda url, header: tickers(("META", 1326801), ("RDDT", 1713445)))
+    return {"output_file": output_file, "change_log": tmp_path / "ticker_changes.jsonl",
+            "backup_dir": tmp_path / "backups", "create_backup_flag": False}
+
+
+def test_failed_handler_keeps_old_list_and_retries_delta(paths):
+    def failing(delta):
+        raise RuntimeError("queue unavailable")
+
+    assert not update_tickers.update_tickers(on_delta=failing, **paths)
+    assert serialization.load_file(paths["output_file"]) == tickers(("FB", 1326801))
+    assert not paths["change_log"].exists()
+
+    handled = []
+    assert update_tickers.update_tickers(on_delta=handled.append, **paths)
+    assert handled[0]["renamed"] == [{"cik": 1326801, "old": "FB", "new": "META"}]
+    assert handled[0]["added"] == [{"ticker": "RDDT", "cik": 1713445}]
+    assert len(paths["change_log"].read_bytes().splitlines()) == 1
+    assert serialization.load_file(paths["output_file"]) == tickers(("META", 1326801), ("RDDT", 1713445))